@@ -0,0 +1,90 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from app.analysis_models.combined_analyzer import CombinedAnalyzer
+
+# Süreç genelinde tek havuz (ilk kullanımda veya uygulama açılışında oluşturulur)
+_analyzer_pool = None
+_analyzer_pool_lock = threading.Lock()
+
+
+class AnalyzerPool:
+    """
+    Önceden ısıtılmış CombinedAnalyzer nesnelerini istekler arasında paylaştırır.
+    Modeller (Haar cascade vb.) her istekte yeniden yüklenmez; sayaçlar her oturumun
+    kendi AnalysisSession nesnesinde tutulduğu için analizörler güvenle yeniden kullanılır.
+    Bir analizör aynı anda tek isteğe verilir; havuz doluysa istek boşa çıkanı bekler.
+    """
+
+    def __init__(self, size: int, factory=CombinedAnalyzer):
+        self.size = max(1, size)
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._config = None
+
+    def _create(self) -> CombinedAnalyzer:
+        analyzer = self.factory()
+        analyzer.warm_up()
+        self._config = analyzer.config()
+        return analyzer
+
+    def config(self) -> dict:
+        """Havuzdaki analizörlerin ortak ayarları (hepsi aynı fabrikadan oluşturulur)."""
+        if self._config is None:
+            with self.acquire():
+                pass
+        return self._config
+
+    def warm_up(self):
+        """Havuzu baştan doldurur (uygulama açılışında çağrılır)."""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            self._idle.put(self._create())
+
+    def _take(self, timeout=None) -> CombinedAnalyzer:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._create()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get(timeout=timeout)
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """with pool.acquire() as analyzer: ... bloğu boyunca analizörü bu isteğe ayırır."""
+        analyzer = self._take(timeout)
+        try:
+            yield analyzer
+        finally:
+            self._idle.put(analyzer)
+
+    def stats(self):
+        return {"size": self.size, "created": self._created, "idle": self._idle.qsize()}
+
+
+def get_analyzer_pool() -> AnalyzerPool:
+    """Süreç genelindeki analizör havuzu (.env: ANALYZER_POOL_SIZE, varsayılan CPU sayısı)."""
+    global _analyzer_pool
+    with _analyzer_pool_lock:
+        if _analyzer_pool is None:
+            size = int(os.getenv("ANALYZER_POOL_SIZE", str(os.cpu_count() or 2)))
+            _analyzer_pool = AnalyzerPool(size)
+        return _analyzer_pool
@@ -0,0 +1,160 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class ArtifactStore:
+    """
+    Aşama bazlı ara sonuç önbelleği. Her aşamanın çıktısı (kare dizisi, transkript, prozodi
+    istatistikleri) ayrı bir dosya olarak, (içerik özeti, aşama adı, aşama sürümü + ayarları)
+    anahtarıyla saklanır. Yeniden çalıştırmada yalnızca sürümü veya girdisi değişen aşamalar hesaplanır;
+    puanlama her zaman bu ara sonuçlardan yeniden üretilir.
+    Toplam boyut max_bytes'ı aşınca en uzun süre kullanılmayanlar silinir (LRU).
+    Klasör birden çok süreç tarafından paylaşılabilir (Örn: batch_analyze işçileri): yazımlar benzersiz
+    geçici dosya üzerinden yapılır, başka sürecin sildiği dosya hata sayılmaz.
+    """
+
+    # Temizlik, toplam boyut bu orana inene kadar siler; sınırın hemen altında her yazımda taranmaz
+    EVICT_TO = 0.9
+
+    def __init__(self, root: str, max_bytes: int = 2048 * 1024 ** 2):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bu sürecin bildiği toplam boyut (ilk yazımda taranır); sınırı aşınca klasör yeniden taranır
+        self._total = None
+        os.makedirs(root, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(content_hash: str, params: Dict) -> str:
+        payload = json.dumps({"content": content_hash, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _base(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, key)
+
+    def get(self, stage: str, content_hash: str, params: Dict) -> Optional[Any]:
+        """Aşama çıktısını döner (NumPy dizisi veya JSON nesnesi); yoksa None."""
+        if not self.enabled:
+            return None
+        base = self._base(stage, self.make_key(content_hash, params))
+        for path, loader in ((base + ".npy", np.load), (base + ".json", self._load_json)):
+            if os.path.exists(path):
+                try:
+                    value = loader(path)
+                    # LRU: son kullanım zamanı güncellenir
+                    os.utime(path)
+                    return value
+                except (OSError, ValueError):
+                    return None
+        return None
+
+    @staticmethod
+    def _load_json(path):
+        with open(path) as f:
+            return json.load(f)
+
+    def put(self, stage: str, content_hash: str, params: Dict, value: Any):
+        if not self.enabled:
+            return
+        base = self._base(stage, self.make_key(content_hash, params))
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        is_array = isinstance(value, np.ndarray)
+        path = base + (".npy" if is_array else ".json")
+        # Yarım yazılmış dosya okunmasın diye benzersiz geçici ada yazılıp taşınır
+        # (aynı anahtarı yazan başka süreç geçici dosyayı ezemez)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(base), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb" if is_array else "w") as f:
+                if is_array:
+                    np.save(f, value)
+                else:
+                    json.dump(value, f, ensure_ascii=False)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan()[1]
+            else:
+                self._total += size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """Klasördeki girdiler ((son kullanım, boyut, yol) listesi) ve toplam boyut."""
+        entries = []
+        total = 0
+        for path in glob.glob(os.path.join(self.root, "*", "*.npy")) + glob.glob(os.path.join(self.root, "*", "*.json")):
+            try:
+                size = os.path.getsize(path)
+                entries.append((os.path.getmtime(path), size, path))
+            except OSError:
+                # Tarama sırasında başka süreç silmiş olabilir
+                continue
+            total += size
+        return entries, total
+
+    def _evict(self):
+        """Kilit tutulurken: toplam boyutu max_bytes * EVICT_TO altına indirir."""
+        entries, total = self._scan()
+        entries.sort()
+        while entries and total > self.max_bytes * self.EVICT_TO:
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total = total
+
+
+class StageCache:
+    """
+    Tek bir dosyanın (content_hash) aşamalarına erişim. Hangi aşamanın önbellekten geldiği,
+    hangisinin yeniden hesaplandığı report içinde tutulur (sonuçta "stages" olarak döner).
+    """
+
+    def __init__(self, store: ArtifactStore, content_hash: str):
+        self.store = store
+        self.content_hash = content_hash
+        self.report = {}
+
+    def get(self, stage: str, params: Dict):
+        value = self.store.get(stage, self.content_hash, params)
+        self.report[stage] = "cached" if value is not None else "computed"
+        return value
+
+    def put(self, stage: str, params: Dict, value):
+        self.store.put(stage, self.content_hash, params, value)
+
+
+_artifact_store = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """.env: ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_MB (0 = kapalı)"""
+    global _artifact_store
+    with _artifact_store_lock:
+        if _artifact_store is None:
+            # Varsayılan klasör /uploads statik sunumunun dışında: transkript aşaması da burada tutulur
+            _artifact_store = ArtifactStore(
+                os.getenv("ARTIFACT_CACHE_DIR", "cache/stages"),
+                max_bytes=int(float(os.getenv("ARTIFACT_CACHE_MAX_MB", "2048")) * 1024 ** 2)
+            )
+        return _artifact_store
@@ -1,16 +1,241 @@
 import cv2
 import os
+import multiprocessing
 import numpy as np
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from app.analysis_models.eye_tracker import EyeTracker
 from app.analysis_models.pose_detector import PoseDetector
 from app.analysis_models.speech_analyzer import SpeechAnalyzer # Dosya ismine dikkat (analyzer.py)
+from app.analysis_models.frame_context import FrameContext
+from app.analysis_models.frame_sampler import FrameSampler, iter_sampled_frames
+from app.analysis_models.frame_pipeline import FramePipeline
+from app.analysis_models.artifact_store import StageCache, get_artifact_store
+from app.analysis_models.scoring import FEATURE_KEYS, get_scoring_engine
+from app.utils.timeline_store import TimelineWriter, save_timeline
+from app.utils.audio_buffer import AudioBuffer
+
+# Segment bazlı paralel analiz için süreç havuzu (ilk kullanımda bir kez oluşturulur)
+_process_pool = None
+_process_pool_size = 0
+_process_pool_lock = threading.Lock()
+# Havuz -> onu o an kullanan analiz sayısı; kullanımdaki havuz boyut değişse de kapatılmaz
+_process_pool_users = defaultdict(int)
+
+# Segmentlere bölmek için bir segmentin en az kaç saniye olması gerektiği
+MIN_SEGMENT_SECONDS = 10
+
+# Puanlama eşikleri gibi kod dışı bir değişiklikte elle artırılır; önbellekteki eski sonuçlar geçersiz olur
+ANALYZER_VERSION = "1"
+
+
+@contextmanager
+def _borrow_process_pool(workers: int):
+    """
+    Segment analizi için süreç havuzunu ödünç verir. Başka boyutta bir havuz istenirse yenisi açılır;
+    eskisi, onu kullanan son analiz bitince kapatılır (eşzamanlı analizlerin işleri yarıda kalmaz).
+    """
+    global _process_pool, _process_pool_size
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_size != workers:
+            old = _process_pool
+            # 'spawn': Çok iş parçacıklı sunucu içinden güvenli süreç başlatmak için
+            _process_pool = ProcessPoolExecutor(max_workers=workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+            _process_pool_size = workers
+            if old is not None and not _process_pool_users[old]:
+                _process_pool_users.pop(old, None)
+                old.shutdown(wait=False)
+        pool = _process_pool
+        _process_pool_users[pool] += 1
+    try:
+        yield pool
+    finally:
+        with _process_pool_lock:
+            _process_pool_users[pool] -= 1
+            if not _process_pool_users[pool]:
+                del _process_pool_users[pool]
+                if pool is not _process_pool:
+                    pool.shutdown(wait=False)
+
+
+def compute_overall_score(results):
+    """Göz, beden ve (varsa) ses canlılığı puanlarından genel puan (canlı prova da aynısını kullanır)."""
+    # Ağırlıklar scoring.DEFAULT_SCORING["overall"] içinde; varsayılan: basit ortalama,
+    # ses canlılığı yalnızca ölçülebildiyse (> 0) katılır
+    monotony = results["speech_data"].get("audio_features", {}).get("monotony_score", 0)
+    return float(get_scoring_engine().overall_scores(results["eye_score"], results["body_score"], monotony))
+
+
+def collect_features(eye_summary, pose_summary, speech_data):
+    """Yeniden puanlama için saklanan ham özellikler (bkz. scoring.FEATURE_KEYS)."""
+    features = {key: eye_summary.get(key, 0) for key in ("total_frames", "face_detected_frames", "eye_contact_frames")}
+    features["movement_mean"] = pose_summary.get("movement_mean", 0.0)
+    features.update(speech_data.get("features", {}))
+    return {key: features.get(key) for key in FEATURE_KEYS}
+
+
+def run_frame_loop(frames, analyzer, session, extra_analyzers=()):
+    """
+    Örneklenmiş kareleri K'lık bloklar halinde işler: göz takibi kare kare,
+    hareket analizi blok başına tek vektörel çağrıyla yapılır.
+    Adaptif örnekleme her karenin sonucuna göre karar verdiği için blok boyu 1'e iner.
+    Sayaçlar analizörde değil, oturumun (session) kendi durum nesnelerinde birikir.
+    """
+    sampler = session.sampler
+    batch_size = 1 if sampler.mode == "adaptive" else analyzer.batch_size
+
+    def flush(batch):
+        pose_metrics = analyzer.pose_detector.analyze_batch(batch, session.pose)
+        for ctx, movement in zip(batch, pose_metrics):
+            frame_metrics = {}
+            frame_metrics.update(analyzer.eye_tracker.analyze_frame(ctx, session.eye)[1])
+            frame_metrics.update(movement)
+            for extra in extra_analyzers:
+                frame_metrics.update(extra.analyze_frame(ctx)[1])
+            sampler.observe(ctx.index, frame_metrics)
+            session.timeline.append(ctx.timestamp_ms, frame_metrics)
+
+    batch = []
+    for ctx in frames:
+        batch.append(ctx)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+# Segment süreçlerinde her istekte model yüklenmesin diye süreç başına tek analizör tutulur
+_segment_analyzers = {}
+
+
+def _get_segment_analyzer(tracking, batch_size):
+    key = (tracking, batch_size)
+    if key not in _segment_analyzers:
+        analyzer = CombinedAnalyzer(tracking=tracking, workers=1)
+        analyzer.batch_size = batch_size
+        _segment_analyzers[key] = analyzer
+    return _segment_analyzers[key]
+
+
+def _analyze_segment(video_path, start, end, sampler_spec, tracking, batch_size):
+    """
+    Videonun [start, end) kare aralığını ayrı bir süreçte analiz eder.
+    Hareket farkı segment sınırında kopmasın diye start-1. kare referans olarak yüklenir.
+    """
+    analyzer = _get_segment_analyzer(tracking, batch_size)
+    session = AnalysisSession(analyzer, FrameSampler.from_spec(sampler_spec))
+
+    cap = cv2.VideoCapture(video_path)
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start - 1)
+        ret, frame = cap.read()
+        if ret:
+            analyzer.pose_detector.prime(frame, session.pose)
+
+    run_frame_loop(iter_sampled_frames(cap, session.sampler, start_index=start, end_index=end),
+                   analyzer, session)
+    cap.release()
+
+    return {
+        "start": start,
+        "eye": analyzer.eye_tracker.get_state(session.eye),
+        "pose": analyzer.pose_detector.get_state(session.pose),
+        "timeline": session.timeline.to_array(),
+        "frames_seen": session.sampler.frames_seen,
+        "frames_analyzed": session.sampler.frames_analyzed
+    }
+
+
+class AnalysisSession:
+    """
+    Tek bir analiz isteğine ait değişken durum: göz/hareket sayaçları, örnekleyici ve zaman çizelgesi.
+    Analizörün kaynakları (Haar modeli, ayarlar) oturumlar arasında paylaşılır, bu nesne paylaşılmaz.
+    """
+
+    def __init__(self, analyzer, sampler: FrameSampler = None):
+        # Örnekleyici adım/sayaç tuttuğu için her oturum kendi kopyasıyla çalışır
+        self.sampler = sampler or FrameSampler.from_spec(analyzer.sampler.spec)
+        self.sampler.reset()
+        self.eye = analyzer.eye_tracker.new_state()
+        self.pose = analyzer.pose_detector.new_state()
+        self.timeline = TimelineWriter()
+        self.stage_report = None
+
 
 class CombinedAnalyzer:
-    def __init__(self):
-        self.eye_tracker = EyeTracker()
+    """
+    Analiz kaynaklarını (modeller, ayarlar) bir kez yükler; her analyze_session çağrısı
+    kendi AnalysisSession durumunu kullandığı için aynı nesne istekler arasında yeniden kullanılabilir.
+    Aynı anda tek bir iş parçacığı kullanmalıdır (bkz. AnalyzerPool).
+    """
+
+    def __init__(self, sampler: FrameSampler = None, workers: int = None, tracking: bool = None):
+        # Kare örnekleme politikası (.env: ANALYSIS_SAMPLING=all | every:3 | fps:5 | adaptive)
+        self.sampler = sampler or FrameSampler.from_spec(os.getenv("ANALYSIS_SAMPLING", "all"))
+
+        # Yüz takip modu (.env: ANALYSIS_FACE_TRACKING=1); kapalıyken her karede tam tespit yapılır
+        if tracking is None:
+            tracking = os.getenv("ANALYSIS_FACE_TRACKING", "0") == "1"
+        self.eye_tracker = EyeTracker(tracking=tracking)
         self.pose_detector = PoseDetector()
         self.speech_analyzer = SpeechAnalyzer()
 
+        # Hareket analizinin tek vektörel çağrıda işleyeceği kare sayısı (.env: ANALYSIS_BATCH_SIZE)
+        self.batch_size = int(os.getenv("ANALYSIS_BATCH_SIZE", "8"))
+
+        # Çözme ve analiz aşamalarını ayrı iş parçacıklarında örtüştür (.env: ANALYSIS_PIPELINE=1)
+        self.pipelined = os.getenv("ANALYSIS_PIPELINE", "0") == "1"
+
+        # Uzun videoları zaman segmentlerine bölüp paralel işleyecek süreç sayısı (.env: ANALYSIS_WORKERS)
+        self.workers = workers or int(os.getenv("ANALYSIS_WORKERS", "1"))
+
+        # Her kareyi okuyacak görüntü analizörleri (Aynı FrameContext hepsine paylaştırılır)
+        self.frame_analyzers = [self.eye_tracker, self.pose_detector]
+
+    def config(self) -> dict:
+        """
+        Sonucu etkileyen ayarlar (önbellek anahtarının parçası). Boru hattı, blok boyu ve
+        işçi sayısı yalnızca hızı etkilediği için dahil edilmez.
+        """
+        return {
+            "version": ANALYZER_VERSION,
+            "sampling": self.sampler.spec,
+            "face_tracking": self.eye_tracker.tracking,
+            "transcription": self.speech_analyzer.transcriber.backend.name,
+            "language": self.speech_analyzer.language,
+            # Puanlama eşikleri/ağırlıkları değişince önbellekteki sonuçlar geçersiz olur
+            "scoring": get_scoring_engine().fingerprint
+        }
+
+    def frame_stage_params(self) -> dict:
+        """Kare aşaması (yüz tespiti + hareket; tek çözme geçişinde birlikte üretilir) önbellek anahtarı."""
+        return {
+            "eye": EyeTracker.STAGE_VERSION,
+            "pose": PoseDetector.STAGE_VERSION,
+            "sampling": self.sampler.spec,
+            "face_tracking": self.eye_tracker.tracking,
+            "detect_scale": self.eye_tracker.detect_scale if self.eye_tracker.tracking else None,
+            "pose_scale": self.pose_detector.scale
+        }
+
+    def new_session(self) -> AnalysisSession:
+        return AnalysisSession(self)
+
+    def warm_up(self):
+        """İlk isteğin tembel başlatma maliyetini (OpenCV tespit, numpy) önceden öder."""
+        session = self.new_session()
+        blank = np.zeros((240, 320, 3), dtype=np.uint8)
+        run_frame_loop([FrameContext(blank, 0), FrameContext(blank.copy(), 1, 33.0)], self, session)
+
+    def register_frame_analyzer(self, analyzer):
+        """analyze_frame(ctx) metodu olan yeni bir analizörü kare döngüsüne ekler."""
+        self.frame_analyzers.append(analyzer)
+
     def clean_numpy(self, data):
         """NumPy verilerini JSON formatına uygun hale getirir."""
         if isinstance(data, dict):
@@ -25,56 +250,199 @@ class CombinedAnalyzer:
             return bool(data)
         return data
 
-    def analyze_session(self, video_path, audio_path):
-        print("🚀 CombinedAnalyzer Çalışıyor...")
-        
-        results = {
-            "eye_score": 0,
-            "body_score": 0,
-            "speech_data": {}, # Transkript ve ses verileri buraya
-            "overall_score": 0
+    def plan_segments(self, video_path):
+        """
+        Videoyu işçi sayısı kadar kare aralığına böler.
+        Kare sayısı/FPS güvenilir değilse (Örn: tarayıcı webm kayıtları) None döner.
+        """
+        cap = cv2.VideoCapture(video_path)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+
+        if frame_count <= 0 or not (0 < fps <= 240):
+            return None
+
+        count = min(self.workers, max(1, int(frame_count / (fps * MIN_SEGMENT_SECONDS))))
+        if count < 2:
+            return None
+
+        bounds = np.linspace(0, frame_count, count + 1).astype(int)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _run_pipeline(self, cap, extra, session):
+        """Kare döngüsünü çözücü + analizör başına iş parçacığı olarak çalıştırır."""
+        stages = {
+            "eye": lambda batch: [self.eye_tracker.analyze_frame(ctx, session.eye)[1] for ctx in batch],
+            "pose": lambda batch: self.pose_detector.analyze_batch(batch, session.pose),
         }
+        for i, analyzer in enumerate(extra):
+            stages[f"extra_{i}"] = lambda batch, a=analyzer: [a.analyze_frame(ctx)[1] for ctx in batch]
+
+        def on_frame(ctx, frame_metrics):
+            session.sampler.observe(ctx.index, frame_metrics)
+            session.timeline.append(ctx.timestamp_ms, frame_metrics)
+
+        pipeline = FramePipeline(session.sampler, stages, batch_sizes={"pose": self.batch_size})
+        pipeline.run(cap, on_frame)
+        report = session.stage_report = pipeline.report()
+        print(f"🧵 Boru hattı darboğazı: {report['bottleneck']} "
+              f"({report['stages'][report['bottleneck']]['utilization'] * 100:.0f}% dolu)")
+
+    def analyze_vision(self, video_path, session: AnalysisSession = None) -> AnalysisSession:
+        """Göz ve beden analizini (mümkünse segmentlere bölüp paralel) çalıştırır; oturum durumunu döner."""
+        session = session or self.new_session()
+        sampler = session.sampler
+
+        # Sonradan kaydedilmiş analizörler süreçlere taşınamadığı için o durumda seri çalışılır
+        parallel = self.workers > 1 and self.frame_analyzers == [self.eye_tracker, self.pose_detector]
+        segments = self.plan_segments(video_path) if parallel else None
+
+        if segments:
+            print(f"⚡ Video {len(segments)} segmentte paralel analiz ediliyor...")
+            sampler.reset()
+            with _borrow_process_pool(self.workers) as pool:
+                futures = [pool.submit(_analyze_segment, video_path, int(start), int(end),
+                                       sampler.spec, self.eye_tracker.tracking, self.batch_size)
+                           for start, end in segments]
+                # İş durumu sorgusu kare ilerlemesini oturumun örnekleyicisinden okur; her segment bitince eklenir
+                for future in as_completed(futures):
+                    state = future.result()
+                    sampler.frames_seen += state["frames_seen"]
+                    sampler.frames_analyzed += state["frames_analyzed"]
 
-        # 1. GÖRÜNTÜ ANALİZİ (OpenCV)
+            # Hareket ölçümleri zaman sırasıyla birleşsin diye segment sırasıyla topla
+            for future in futures:
+                state = future.result()
+                self.eye_tracker.merge_state(state["eye"], session.eye)
+                self.pose_detector.merge_state(state["pose"], session.pose)
+                session.timeline.extend(state["timeline"])
+            print(f"🎞️ {sampler.frames_analyzed}/{sampler.frames_seen} kare analiz edildi ({sampler.spec})")
+            return session
+
+        # Seçilen her kare bir kez çözülür; gri/bulanık görünümler FrameContext içinde paylaşılır.
+        # Örneklenmeyen kareler grab() ile atlanır.
+        sampler.reset()
         cap = cv2.VideoCapture(video_path)
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret: break
-            self.eye_tracker.analyze_frame(frame)
-            self.pose_detector.analyze_frame(frame)
+        extra = [a for a in self.frame_analyzers if a not in (self.eye_tracker, self.pose_detector)]
+        # Adaptif örnekleme her karenin sonucunu beklediği için boru hattında çalışmaz
+        if self.pipelined and sampler.mode != "adaptive":
+            self._run_pipeline(cap, extra, session)
+        else:
+            run_frame_loop(iter_sampled_frames(cap, sampler), self, session, extra)
         cap.release()
+        print(f"🎞️ {sampler.frames_analyzed}/{sampler.frames_seen} kare analiz edildi ({sampler.spec})")
+        return session
+
+    def analyze_speech(self, audio, timings, stages: StageCache = None):
+        """
+        Ses dalı: (gerekirse) sesi çıkarır ve konuşma analizini yapar.
+        Transkript ve prozodi aşamaları önbellekte varsa ses hiç çözülmez; yalnızca puanlama yeniden yapılır.
+        """
+        start = time.perf_counter()
+        params = self.speech_analyzer.stage_params()
+        transcription = stages.get("transcript", params["transcript"]) if stages else None
+        prosody = stages.get("prosody", params["prosody"]) if stages else None
 
-        eye_summary = self.eye_tracker.get_summary()
-        pose_summary = self.pose_detector.get_summary()
+        if transcription is not None and prosody is not None:
+            speech_results = self.speech_analyzer.score(transcription, prosody, prosody["duration"])
+            timings["speech_sec"] = round(time.perf_counter() - start, 3)
+            return speech_results
 
-        results["eye_score"] = eye_summary.get("overall_eye_contact_score", 0)
-        results["body_score"] = pose_summary.get("overall_body_language_score", 0)
+        if callable(audio):
+            # Ses çıkarma da bu dalda yapılır; görüntü analiziyle aynı anda ilerler
+            audio = audio()
+            timings["audio_extract_sec"] = round(time.perf_counter() - start, 3)
 
-        # 2. SES ANALİZİ (Librosa & SR)
-        if audio_path and os.path.exists(audio_path):
+        has_audio = isinstance(audio, AudioBuffer) or (audio and os.path.exists(audio))
+        if has_audio:
             print("🎤 SpeechAnalyzer devreye girdi...")
-            speech_results = self.speech_analyzer.analyze_audio(audio_path)
-            results["speech_data"] = speech_results
+        buffer = self.speech_analyzer.load(audio) if has_audio else None
+
+        if buffer is not None:
+            if transcription is None:
+                transcription = self.speech_analyzer.transcribe(buffer)
+                # Geçici servis hatasıyla eksik kalan transkript saklanmaz
+                if stages and transcription is not None and not transcription["failed_chunks"]:
+                    stages.put("transcript", params["transcript"], transcription)
+            if prosody is None:
+                prosody = self.speech_analyzer.measure_prosody(buffer)
+                if stages and prosody is not None:
+                    stages.put("prosody", params["prosody"], prosody)
+            speech_results = self.speech_analyzer.score(transcription, prosody, buffer.duration)
+        elif has_audio:
+            speech_results = self.speech_analyzer.empty_result()
         else:
             print("⚠️ Ses dosyası bulunamadı!")
-            results["speech_data"] = {
+            speech_results = {
                 "transcript": "",
                 "speaking_rate": {"words_per_minute": 0},
                 "filler_words": {"count": 0, "list": []},
                 "audio_features": {"monotony_score": 0}
             }
+        timings["speech_sec"] = round(time.perf_counter() - start, 3)
+        return speech_results
 
-        # 3. GENEL PUAN HESAPLAMA
-        # Ağırlıklar: Göz %30, Beden %20, Ses/İçerik %50 (Basit bir mantık)
-        # Şimdilik dolgu kelime cezası vb. router tarafında veya burada yapılabilir.
-        # Biz basit ortalama alalım:
-        avg_score = (results["eye_score"] + results["body_score"]) / 2
+    def analyze_session(self, video_path, audio, timeline_path=None, session: AnalysisSession = None,
+                        content_hash: str = None):
+        """
+        audio: bellekteki AudioBuffer, ses dosyası yolu veya sesi çıkarıp döndüren bir fonksiyon.
+        session: dışarıdan verilirse ilerleme (işlenen kare sayısı) analiz sürerken okunabilir.
+        content_hash: verilirse aşama çıktıları (kare dizisi, transkript, prozodi) önbellekten okunur/yazılır;
+        yalnızca sürümü veya girdisi değişen aşamalar yeniden hesaplanır, puanlama her seferinde yapılır.
+        Görüntü ve ses dalları birbirinden bağımsız olduğu için eşzamanlı çalışır;
+        toplam süre iki dalın toplamı değil, uzun olanı kadardır.
+        """
+        print("🚀 CombinedAnalyzer Çalışıyor...")
         
-        # Ses canlılığı varsa onu da katalım
-        monotony = results["speech_data"].get("audio_features", {}).get("monotony_score", 0)
-        if monotony > 0:
-            avg_score = (results["eye_score"] + results["body_score"] + monotony) / 3
+        results = {
+            "eye_score": 0,
+            "body_score": 0,
+            "speech_data": {}, # Transkript ve ses verileri buraya
+            "overall_score": 0
+        }
+        timings = {}
+        session_start = time.perf_counter()
+        store = get_artifact_store()
+        stages = StageCache(store, content_hash) if content_hash and store.enabled else None
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # 2. SES ANALİZİ (Librosa & SR) - ayrı iş parçacığında başlar
+            speech_future = executor.submit(self.analyze_speech, audio, timings, stages)
+
+            # 1. GÖRÜNTÜ ANALİZİ (OpenCV) - bu iş parçacığında
+            vision_start = time.perf_counter()
+            frame_params = self.frame_stage_params()
+            rows = stages.get("frames", frame_params) if stages else None
+            if rows is None:
+                session = self.analyze_vision(video_path, session)
+                rows = session.timeline.to_array()
+                if stages:
+                    stages.put("frames", frame_params, rows)
+                eye_summary = self.eye_tracker.get_summary(session.eye)
+                pose_summary = self.pose_detector.get_summary(session.pose)
+            else:
+                # Kare aşaması önbellekte: video çözülmez, skorlar kayıtlı kare dizisinden hesaplanır
+                eye_summary = self.eye_tracker.summarize_timeline(rows)
+                pose_summary = self.pose_detector.summarize_timeline(rows)
+            if timeline_path:
+                save_timeline(timeline_path, rows)
+            timings["vision_sec"] = round(time.perf_counter() - vision_start, 3)
 
-        results["overall_score"] = round(avg_score, 1)
+            results["eye_score"] = eye_summary.get("overall_eye_contact_score", 0)
+            results["body_score"] = pose_summary.get("overall_body_language_score", 0)
+
+            results["speech_data"] = speech_future.result()
+            results["features"] = collect_features(eye_summary, pose_summary, results["speech_data"])
+
+        timings["total_sec"] = round(time.perf_counter() - session_start, 3)
+        results["timings"] = timings
+        if stages:
+            results["stages"] = stages.report
+            print(f"🗂️ Aşamalar: {stages.report}")
+        print(f"⏱️ Görüntü {timings['vision_sec']} sn, ses {timings['speech_sec']} sn, toplam {timings['total_sec']} sn")
+
+        # 3. GENEL PUAN HESAPLAMA
+        results["overall_score"] = compute_overall_score(results)
 
         return self.clean_numpy(results)
\ No newline at end of file
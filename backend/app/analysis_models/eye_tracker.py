@@ -1,87 +1,218 @@
+import threading
+
 import cv2
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Union
+from app.analysis_models.frame_context import FrameContext
+from app.analysis_models.frame_sampler import FrameSampler, iter_sampled_frames
+from app.analysis_models.scoring import get_scoring_engine
+
+# Haar modeli iş parçacığı başına bir kez yüklenir; aynı model eşzamanlı detectMultiScale
+# çağrılarında güvenle paylaşılamadığı için tüm EyeTracker nesneleri bu önbelleği kullanır
+_cascades = threading.local()
 
-class EyeTracker:
-    def __init__(self):
-        # Yüz tespiti için OpenCV'nin hazır modelini kullanıyoruz
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
 
+def _face_cascade() -> cv2.CascadeClassifier:
+    cascade = getattr(_cascades, "face", None)
+    if cascade is None:
+        cascade = _cascades.face = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    return cascade
+
+
+class EyeTrackerState:
+    """Bir analiz oturumuna ait değişken durum (sayaçlar ve yüz takibi)."""
+
+    def __init__(self):
         self.metrics = {
             'total_frames': 0,
             'face_detected_frames': 0,
             'eye_contact_frames': 0
         }
+        self.track_box = None
+        self.frames_since_detect = 0
 
-    def analyze_video(self, video_path):
-        """Video dosyasını kare kare analiz eder."""
-        cap = cv2.VideoCapture(video_path)
 
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret: break
+class EyeTracker:
+    """
+    Kaynaklar (Haar modeli, ayarlar) bu nesnede, oturum sayaçları EyeTrackerState içinde tutulur.
+    Metotlara state verilmezse nesnenin kendi varsayılan durumu (self.state) kullanılır.
+    """
+
+    # Yüz tespiti çıktısını değiştiren bir değişiklikte artırılır (aşama önbelleği, bkz. ArtifactStore)
+    STAGE_VERSION = 2
+
+    # Yüz merkezinin kare merkezinden en fazla bu oranda (genişliğe göre) uzak olduğu kareler göz teması sayılır
+    EYE_CONTACT_TOLERANCE = 0.30
+
+    def __init__(self, tracking: bool = False, detect_scale: float = 0.5,
+                 redetect_interval: int = 15, roi_padding: float = 0.5):
+        # Takip modu: Tam kare tespiti küçültülmüş karede ve sadece her N karede bir yapılır,
+        # aradaki karelerde yalnızca son yüz kutusunun etrafındaki pencere taranır.
+        # Kare başına dedektöre göre göz teması skoru tipik olarak ±2 puan içinde kalır
+        # (benchmark.py tracking ile ölçülebilir). detect_scale=0.5 iken ~48px altı yüzler kaçabilir.
+        self.tracking = tracking
+        self.detect_scale = detect_scale
+        self.redetect_interval = redetect_interval
+        self.roi_padding = roi_padding
+
+        self.state = self.new_state()
+
+    @property
+    def face_cascade(self) -> cv2.CascadeClassifier:
+        # Yüz tespiti için OpenCV'nin hazır modelini kullanıyoruz (iş parçacığı başına bir kez yüklenir)
+        return _face_cascade()
+
+    def new_state(self) -> EyeTrackerState:
+        return EyeTrackerState()
+
+    @property
+    def metrics(self) -> Dict:
+        return self.state.metrics
+
+    def analyze_video(self, video_path, sampler: FrameSampler = None):
+        """Video dosyasını kare kare (veya örnekleyicinin seçtiği karelerle) analiz eder."""
+        if sampler:
+            sampler.reset()
+        cap = cv2.VideoCapture(video_path)
 
-            self.analyze_frame(frame)
+        for ctx in iter_sampled_frames(cap, sampler):
+            _, frame_metrics = self.analyze_frame(ctx)
+            if sampler:
+                sampler.observe(ctx.index, frame_metrics)
 
         cap.release()
         return self.get_summary()
 
-    def analyze_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Dict]:
-        self.metrics['total_frames'] += 1
+    def analyze_frame(self, frame: Union[np.ndarray, FrameContext],
+                      state: EyeTrackerState = None) -> Tuple[np.ndarray, Dict]:
+        state = state or self.state
+        state.metrics['total_frames'] += 1
 
-        # Siyah beyaz yap (Daha hızlı tespit için)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Siyah beyaz kare ortak bağlamdan gelir (Her kare için bir kez hesaplanır)
+        ctx = FrameContext.wrap(frame)
+        frame = ctx.frame
 
         # Yüzleri ara
         # scaleFactor=1.1, minNeighbors=5 standart iyi değerlerdir
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(30, 30))
+        if self.tracking:
+            faces = self._track_faces(ctx, state)
+        else:
+            faces = self.face_cascade.detectMultiScale(ctx.gray, 1.1, 5, minSize=(30, 30))
 
         frame_metrics = {'eye_contact': False, 'face_detected': False}
 
         if len(faces) > 0:
-            self.metrics['face_detected_frames'] += 1
+            state.metrics['face_detected_frames'] += 1
             frame_metrics['face_detected'] = True
 
             # En büyük yüzü al (Kameraya en yakın kişi)
-            faces = sorted(faces, key=lambda x: x[2] * x[3], reverse=True)
-            (x, y, w, h) = faces[0]
+            (x, y, w, h) = max(faces, key=lambda f: f[2] * f[3])
 
             # Yüzün merkezini bul
             face_center_x = x + (w // 2)
             frame_center_x = frame.shape[1] // 2
 
             # Yüz, ekranın merkezine yakın mı? (Tolerans %30)
-            threshold = frame.shape[1] * 0.30
+            threshold = frame.shape[1] * self.EYE_CONTACT_TOLERANCE
+            frame_metrics['face_offset'] = (face_center_x - frame_center_x) / frame.shape[1]
 
             if abs(frame_center_x - face_center_x) < threshold:
                 frame_metrics['eye_contact'] = True
-                self.metrics['eye_contact_frames'] += 1
+                state.metrics['eye_contact_frames'] += 1
 
-            # Görselleştirme (Kare içine al)
-            color = (0, 255, 0) if frame_metrics['eye_contact'] else (0, 0, 255)
-            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-            cv2.putText(frame, "ODAK", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2)
+            # Kare üzerine çizim yapılmaz (headless); kutu isteğe bağlı overlay aşaması için döner
+            frame_metrics['face_box'] = (int(x), int(y), int(w), int(h))
 
         return frame, frame_metrics
 
-    def get_summary(self) -> Dict:
+    def _detect_scaled(self, gray: np.ndarray, scale: float, offset=(0, 0), min_size: int = 30):
+        """Küçültülmüş gri görüntüde tespit yapar, kutuları tam çözünürlüğe çevirir."""
+        side = max(1, int(min_size * scale))
+        faces = self.face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(side, side))
+        return [(int(fx / scale) + offset[0], int(fy / scale) + offset[1], int(fw / scale), int(fh / scale))
+                for (fx, fy, fw, fh) in faces]
+
+    def _track_faces(self, ctx: FrameContext, state: EyeTrackerState):
+        scale = self.detect_scale
+        faces = []
+
+        # 1. Takip varsa sadece son kutunun etrafındaki pencerede ara
+        if state.track_box is not None and state.frames_since_detect < self.redetect_interval:
+            x, y, w, h = state.track_box
+            pad_w, pad_h = int(w * self.roi_padding), int(h * self.roi_padding)
+            height, width = ctx.shape[:2]
+            x0, y0 = max(0, x - pad_w), max(0, y - pad_h)
+            x1, y1 = min(width, x + w + pad_w), min(height, y + h + pad_h)
+
+            sx0, sy0 = int(x0 * scale), int(y0 * scale)
+            roi = ctx.downscaled(scale)[sy0:int(y1 * scale), sx0:int(x1 * scale)]
+            if roi.size > 0:
+                # Yüz boyutu kareler arasında az değişir; küçük ölçekleri taramaya gerek yok
+                faces = self._detect_scaled(roi, scale, offset=(int(sx0 / scale), int(sy0 / scale)),
+                                            min_size=max(30, w // 2))
+            state.frames_since_detect += 1
+
+        # 2. Takip yoksa, kaybolduysa veya süre dolduysa tam kareyi (küçültülmüş) tara
+        if len(faces) == 0:
+            faces = self._detect_scaled(ctx.downscaled(scale), scale)
+            state.frames_since_detect = 0
+
+        state.track_box = max(faces, key=lambda f: f[2] * f[3]) if faces else None
+        return faces
+
+    def get_state(self, state: EyeTrackerState = None) -> Dict:
+        """Segment bazlı paralel analizde süreçler arası taşınacak sayaçlar."""
+        return dict((state or self.state).metrics)
+
+    def merge_state(self, segment_metrics: Dict, state: EyeTrackerState = None):
+        """Başka bir segmentin sayaçlarını verilen oturum durumuna ekler."""
+        metrics = (state or self.state).metrics
+        for key, value in segment_metrics.items():
+            metrics[key] = metrics.get(key, 0) + value
+
+    def summarize_timeline(self, rows: np.ndarray) -> Dict:
+        """
+        Kaydedilmiş kare dizisinden (TimelineWriter satırları) özet üretir; göz teması güncel
+        eşikle yüz konumundan yeniden hesaplanır. Videoyu yeniden çözmeden puanlama değişikliği içindir.
+        """
+        face = rows["face"].astype(bool)
+        if "face_dx" in rows.dtype.names:
+            eye = face & (np.abs(rows["face_dx"]) < self.EYE_CONTACT_TOLERANCE)
+        else:
+            eye = rows["eye"].astype(bool)
+        return self.get_summary(metrics={
+            'total_frames': len(rows),
+            'face_detected_frames': int(np.count_nonzero(face)),
+            'eye_contact_frames': int(np.count_nonzero(eye))
+        })
+
+    def get_summary(self, state: EyeTrackerState = None, metrics: Dict = None) -> Dict:
+        metrics = metrics or (state or self.state).metrics
+        engine = get_scoring_engine()
+        bands = engine.config["eye"]
+
         # Eğer hiç yüz bulunamadıysa 0 döndür
-        if self.metrics['face_detected_frames'] == 0:
+        if metrics['face_detected_frames'] == 0:
             score = 0
             recs = ["⚠️ Videoda yüzünüz tespit edilemedi. Işıklandırmayı kontrol edin veya kameraya daha yakın durun."]
         else:
             # Sadece yüzün göründüğü anları baz alarak puanla
-            score = (self.metrics['eye_contact_frames'] / self.metrics['face_detected_frames']) * 100
+            score = float(engine.eye_scores(metrics['face_detected_frames'], metrics['eye_contact_frames']))
 
             recs = []
-            if score < 50:
+            if score < bands["weak_below"]:
                 recs.append("🔴 İzleyiciyle göz temasınız zayıf. Kameraya daha sık bakın.")
-            elif score < 80:
+            elif score < bands["good_from"]:
                 recs.append("🟡 Göz temasınız iyi ama artırılabilir.")
             else:
                 recs.append("🟢 Harika göz teması! İzleyiciyle bağ kuruyorsunuz.")
 
         return {
             'overall_eye_contact_score': round(score, 1),
-            'recommendations': recs
-        }
\ No newline at end of file
+            'recommendations': recs,
+            # Yeniden puanlama için ham sayaçlar
+            'total_frames': int(metrics['total_frames']),
+            'face_detected_frames': int(metrics['face_detected_frames']),
+            'eye_contact_frames': int(metrics['eye_contact_frames'])
+        }
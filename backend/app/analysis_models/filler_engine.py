@@ -0,0 +1,115 @@
+import re
+import numpy as np
+from typing import Dict, List, Union
+
+# Dile göre dolgu kelime sözlükleri:
+#   words    -> tam eşleşen tek kelimeler
+#   phrases  -> birden fazla kelimelik kalıplar ("you know")
+#   patterns -> uzatılmış sesler için etiket -> düzenli ifade (kelimenin tamamına uymalı)
+FILLER_LEXICONS = {
+    "tr": {
+        "words": ["şey", "yani", "hani", "falan", "filan", "acaba", "işte"],
+        "phrases": [],
+        "patterns": {"ıı": r"ı+ı+", "ee": r"e+e+", "hım": r"hı+m", "hmm": r"hmm+"},
+    },
+    "en": {
+        "words": ["um", "uh", "like", "basically", "actually", "literally"],
+        "phrases": ["you know", "i mean", "kind of", "sort of"],
+        "patterns": {"umm": r"um+m", "uhh": r"uh+h", "hmm": r"hmm+"},
+    },
+}
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class FillerEngine:
+    """
+    Transkripti bir kez kelimelere ayırır ve tüm dolgu kalıplarını tek geçişte eşler:
+    tek kelimeler sözlükten O(1) bakılır, uzatılmış sesler tek birleşik düzenli ifadeyle denenir.
+    Sonuç: kelime bazlı sayılar, konumlar/zaman damgaları ve dakikalık yoğunluk serisi.
+    """
+
+    def __init__(self, language: str = "tr", lexicon: Dict = None):
+        lexicon = lexicon or FILLER_LEXICONS.get(language.split("-")[0].lower(), FILLER_LEXICONS["tr"])
+        self.words = set(lexicon.get("words", []))
+
+        # İlk kelimeye göre gruplanmış çok kelimelik kalıplar
+        self.phrases = {}
+        for phrase in lexicon.get("phrases", []):
+            tokens = tuple(phrase.split())
+            self.phrases.setdefault(tokens[0], []).append(tokens)
+        for candidates in self.phrases.values():
+            candidates.sort(key=len, reverse=True)
+
+        patterns = lexicon.get("patterns", {})
+        self.pattern_labels = {f"p{i}": label for i, label in enumerate(patterns)}
+        self.pattern_re = re.compile("|".join(f"(?P<p{i}>{regex})" for i, regex in enumerate(patterns.values()))) \
+            if patterns else None
+
+    def _match_word(self, token: str):
+        """Tek kelimelik dolgu etiketi (yoksa None)."""
+        if token in self.words:
+            return token
+        if self.pattern_re is not None:
+            match = self.pattern_re.fullmatch(token)
+            if match:
+                return self.pattern_labels[match.lastgroup]
+        return None
+
+    def analyze(self, transcript: Union[str, List[Dict]], duration: float = None) -> Dict:
+        """
+        transcript: düz metin veya zaman damgalı parçalar ([{start, end, text}, ...]).
+        Parça içindeki kelimelerin zamanı, parça süresine eşit aralıklarla dağıtılarak tahmin edilir.
+        """
+        if isinstance(transcript, str):
+            transcript = [{"start": 0.0, "end": duration or 0.0, "text": transcript}]
+
+        counts = {}
+        occurrences = []
+        word_index = 0
+        # Konuşmadaki farklı kelime sayısı azdır; her kelime için eşleşme sonucu bir kez hesaplanır
+        word_labels = {}
+        for segment in transcript:
+            tokens = _TOKEN_RE.findall(segment.get("text", "").lower())
+            if not tokens:
+                continue
+            start, end = segment.get("start", 0.0), segment.get("end", 0.0)
+            step = (end - start) / len(tokens)
+
+            i = 0
+            while i < len(tokens):
+                token = tokens[i]
+                label, length = None, 1
+                for phrase in self.phrases.get(token, ()):
+                    if tuple(tokens[i:i + len(phrase)]) == phrase:
+                        label, length = " ".join(phrase), len(phrase)
+                        break
+                if label is None:
+                    if token not in word_labels:
+                        word_labels[token] = self._match_word(token)
+                    label = word_labels[token]
+                if label:
+                    counts[label] = counts.get(label, 0) + 1
+                    occurrences.append({"word": label, "index": word_index + i,
+                                        "t": round(start + (i + 0.5) * step, 2)})
+                i += length
+            word_index += len(tokens)
+
+        duration = duration if duration is not None else max((s.get("end", 0.0) for s in transcript), default=0.0)
+        minutes = int(np.ceil(duration / 60)) if duration > 0 else 0
+        if minutes and occurrences:
+            buckets = np.minimum((np.array([o["t"] for o in occurrences]) // 60).astype(int), minutes - 1)
+            density = np.bincount(buckets, minlength=minutes).tolist()
+        else:
+            density = [0] * minutes
+
+        total = sum(counts.values())
+        return {
+            "count": total,
+            "list": sorted(counts),
+            "ratio": round(total / word_index * 100, 1) if word_index else 0.0,
+            "counts": dict(sorted(counts.items(), key=lambda item: -item[1])),
+            "occurrences": occurrences,
+            "density_per_minute": density,
+            "word_count": word_index
+        }
@@ -0,0 +1,58 @@
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+class FrameContext:
+    """
+    Tek bir video karesini ve ondan türetilen görünümleri (gri, bulanık, küçültülmüş) taşır.
+    Her görünüm ilk istendiğinde hesaplanır ve aynı kare için bir daha hesaplanmaz.
+    """
+
+    def __init__(self, frame: np.ndarray, index: int = 0, timestamp_ms: float = 0.0):
+        self.frame = frame
+        self.index = index
+        self.timestamp_ms = timestamp_ms
+        # Örneklemede atlanan karelerden hemen öncekisi (varsa); hareket farkı bununla alınır
+        self.previous: Optional["FrameContext"] = None
+        self._views: Dict[Tuple, np.ndarray] = {}
+
+    @staticmethod
+    def wrap(frame) -> "FrameContext":
+        """Analizörlere ham kare de verilebilsin diye ndarray'i bağlama sarar."""
+        if isinstance(frame, FrameContext):
+            return frame
+        return FrameContext(frame)
+
+    @property
+    def shape(self):
+        return self.frame.shape
+
+    @property
+    def gray(self) -> np.ndarray:
+        key = ("gray",)
+        if key not in self._views:
+            self._views[key] = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        return self._views[key]
+
+    def blurred(self, ksize: int = 21, scale: float = 1.0, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Gri karenin (gerekirse küçültülmüş) Gaussian bulanıklaştırılmış hali (hareket analizi için).
+        'out' verilirse sonuç doğrudan o diziye (Örn: bitişik bir blok dilimine) yazılır.
+        """
+        key = ("blurred", ksize, scale)
+        if key not in self._views:
+            self._views[key] = cv2.GaussianBlur(self.downscaled(scale), (ksize, ksize), 0, dst=out)
+        elif out is not None:
+            out[...] = self._views[key]
+        return self._views[key] if out is None else out
+
+    def downscaled(self, scale: float) -> np.ndarray:
+        """Gri karenin 'scale' oranında küçültülmüş hali (1.0 ise kendisi)."""
+        if scale >= 1.0:
+            return self.gray
+        key = ("downscaled", scale)
+        if key not in self._views:
+            self._views[key] = cv2.resize(self.gray, None, fx=scale, fy=scale,
+                                          interpolation=cv2.INTER_AREA)
+        return self._views[key]
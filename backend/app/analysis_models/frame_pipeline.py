@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, List
+
+import cv2
+
+from app.analysis_models.frame_sampler import FrameSampler, iter_sampled_frames
+
+# Kuyruk sonu işareti
+_END = object()
+
+
+class StageStats:
+    """Bir aşamanın ne kadar çalıştığını / beklediğini ölçer (darboğaz tespiti için)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_sec = 0.0      # Asıl iş (çözme, tespit, fark alma)
+        self.wait_in_sec = 0.0   # Girdi beklerken boşta (önceki aşama yavaş)
+        self.wait_out_sec = 0.0  # Çıktı kuyruğu dolu diye bekleme (sonraki aşama yavaş)
+
+    def to_dict(self, wall_sec: float) -> Dict:
+        return {
+            "items": self.items,
+            "busy_sec": round(self.busy_sec, 3),
+            "wait_in_sec": round(self.wait_in_sec, 3),
+            "wait_out_sec": round(self.wait_out_sec, 3),
+            "utilization": round(self.busy_sec / wall_sec, 3) if wall_sec > 0 else 0.0
+        }
+
+
+class FramePipeline:
+    """
+    Kare analizini iş parçacıklı aşamalara böler:
+
+        çözücü (decoder) ──► [kuyruk] ──► göz takibi  ──┐
+                        └──► [kuyruk] ──► hareket (blok) ─┴──► birleştirici (çağıran iş parçacığı)
+
+    OpenCV hem video çözmede hem Haar tespitinde GIL'i bıraktığı için aşamalar gerçekten örtüşür.
+    Kuyruklar sınırlıdır (backpressure): yavaş bir aşama, çözücünün belleği doldurmasını engeller.
+    Her aşamanın doluluk oranı report() ile alınır.
+    """
+
+    def __init__(self, sampler: FrameSampler, stages: Dict[str, Callable[[List], List[Dict]]],
+                 batch_sizes: Dict[str, int] = None, queue_size: int = 16):
+        self.sampler = sampler
+        self.stages = stages
+        self.batch_sizes = batch_sizes or {}
+        self.queue_size = queue_size
+
+        self.stats = {"decode": StageStats("decode"), "merge": StageStats("merge")}
+        self.stats.update({name: StageStats(name) for name in stages})
+        self.wall_sec = 0.0
+
+        self._stop = threading.Event()
+        self._errors = []
+
+    # --- Kuyruk yardımcıları (hata durumunda kilitlenmemek için zaman aşımlı) ---
+    def _put(self, q: queue.Queue, item, stats: StageStats):
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        stats.wait_out_sec += time.perf_counter() - start
+
+    def _get(self, q: queue.Queue, stats: StageStats):
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                item = q.get(timeout=0.1)
+                stats.wait_in_sec += time.perf_counter() - start
+                return item
+            except queue.Empty:
+                continue
+        stats.wait_in_sec += time.perf_counter() - start
+        return _END
+
+    def _fail(self, error: Exception):
+        self._errors.append(error)
+        self._stop.set()
+
+    # --- Aşamalar ---
+    def _decode(self, cap: cv2.VideoCapture, inputs: Dict[str, queue.Queue]):
+        stats = self.stats["decode"]
+        try:
+            frames = iter_sampled_frames(cap, self.sampler)
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                ctx = next(frames, None)
+                if ctx is not None:
+                    # Gri dönüşüm çözücü aşamasında yapılır; analiz aşamaları hazır görünümü okur
+                    ctx.gray
+                stats.busy_sec += time.perf_counter() - start
+                if ctx is None:
+                    break
+                stats.items += 1
+                for q in inputs.values():
+                    self._put(q, ctx, stats)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            for q in inputs.values():
+                self._put(q, _END, stats)
+
+    def _analyze(self, name: str, fn, q_in: queue.Queue, q_out: queue.Queue):
+        stats = self.stats[name]
+        batch_size = max(1, self.batch_sizes.get(name, 1))
+        try:
+            done = False
+            while not done:
+                batch = []
+                while len(batch) < batch_size:
+                    ctx = self._get(q_in, stats)
+                    if ctx is _END:
+                        done = True
+                        break
+                    batch.append(ctx)
+                if not batch:
+                    break
+
+                start = time.perf_counter()
+                results = fn(batch)
+                stats.busy_sec += time.perf_counter() - start
+                stats.items += len(batch)
+                for ctx, metrics in zip(batch, results):
+                    self._put(q_out, (ctx, metrics), stats)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(q_out, _END, stats)
+
+    def run(self, cap: cv2.VideoCapture, on_frame: Callable):
+        """
+        Videoyu aşamalardan geçirir; her kare için birleştirilmiş sonuçla on_frame(ctx, frame_metrics)
+        çağrılır (kare sırasıyla, çağıran iş parçacığında).
+        """
+        inputs = {name: queue.Queue(self.queue_size) for name in self.stages}
+        outputs = {name: queue.Queue(self.queue_size) for name in self.stages}
+
+        threads = [threading.Thread(target=self._decode, args=(cap, inputs), daemon=True)]
+        for name, fn in self.stages.items():
+            threads.append(threading.Thread(target=self._analyze, args=(name, fn, inputs[name], outputs[name]),
+                                            daemon=True))
+
+        wall_start = time.perf_counter()
+        for t in threads:
+            t.start()
+
+        merge_stats = self.stats["merge"]
+        try:
+            while True:
+                # Her aşama kareleri aynı sırayla ürettiği için sonuçlar sırayla eşleşir
+                parts = [self._get(outputs[name], merge_stats) for name in self.stages]
+                if any(part is _END for part in parts):
+                    break
+                start = time.perf_counter()
+                ctx = parts[0][0]
+                frame_metrics = {}
+                for _, metrics in parts:
+                    frame_metrics.update(metrics)
+                on_frame(ctx, frame_metrics)
+                merge_stats.busy_sec += time.perf_counter() - start
+                merge_stats.items += 1
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join()
+            self.wall_sec = time.perf_counter() - wall_start
+
+        if self._errors:
+            raise self._errors[0]
+
+    def report(self) -> Dict:
+        """Aşama bazlı kullanım oranları ve en yoğun (darboğaz) aşama."""
+        stages = {name: stats.to_dict(self.wall_sec) for name, stats in self.stats.items()}
+        bottleneck = max(stages, key=lambda name: stages[name]["utilization"]) if stages else None
+        return {"wall_sec": round(self.wall_sec, 3), "bottleneck": bottleneck, "stages": stages}
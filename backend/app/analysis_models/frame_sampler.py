@@ -0,0 +1,158 @@
+import cv2
+from typing import Dict, Iterator, Optional
+
+from app.analysis_models.frame_context import FrameContext
+
+
+class FrameSampler:
+    """
+    Videonun hangi karelerinin analiz edileceğine karar verir.
+
+    Modlar:
+        all      -> Her kare (varsayılan, eski davranış)
+        every_n  -> Her N. kare
+        fps      -> Saniyede hedef sayıda kare (zaman damgasına göre)
+        adaptive -> Yüz/hareket durumu sabitken seyrek, değişince sık örnekleme
+
+    Analiz edilmeyen kareler grab() ile atlanır, çözülmez (retrieve edilmez).
+    Seçilen karenin hemen öncesindeki kare de çözülür (ctx.previous) ki hareket
+    analizi seyrek örneklemede de ardışık iki kare arasındaki farkı ölçsün.
+    """
+
+    MODES = ("all", "every_n", "fps", "adaptive")
+
+    def __init__(self, mode: str = "all", every_n: int = 1, target_fps: float = 5.0,
+                 min_step: int = 1, max_step: int = 8):
+        if mode not in self.MODES:
+            raise ValueError(f"Bilinmeyen örnekleme modu: {mode}")
+        self.mode = mode
+        self.every_n = max(1, int(every_n))
+        self.target_fps = float(target_fps)
+        self.min_step = max(1, int(min_step))
+        self.max_step = max(self.min_step, int(max_step))
+        self.reset()
+
+    @classmethod
+    def from_spec(cls, spec: Optional[str]) -> "FrameSampler":
+        """
+        Metin ayarından örnekleyici oluşturur (Örn: .env içindeki ANALYSIS_SAMPLING).
+        Örnekler: "all", "every:3", "fps:5", "adaptive", "adaptive:1-10"
+        """
+        spec = (spec or "all").strip().lower()
+        name, _, value = spec.partition(":")
+
+        if name == "all":
+            return cls("all")
+        if name == "every":
+            return cls("every_n", every_n=int(value or 1))
+        if name == "fps":
+            return cls("fps", target_fps=float(value or 5))
+        if name == "adaptive":
+            if value:
+                low, _, high = value.partition("-")
+                return cls("adaptive", min_step=int(low), max_step=int(high or low))
+            return cls("adaptive")
+        raise ValueError(f"Geçersiz örnekleme ayarı: {spec}")
+
+    @property
+    def spec(self) -> str:
+        if self.mode == "every_n":
+            return f"every:{self.every_n}"
+        if self.mode == "fps":
+            return f"fps:{self.target_fps:g}"
+        if self.mode == "adaptive":
+            return f"adaptive:{self.min_step}-{self.max_step}"
+        return "all"
+
+    def reset(self):
+        """Yeni bir video için durumu sıfırlar."""
+        self.frames_seen = 0
+        self.frames_analyzed = 0
+        self._next_index = 0
+        self._next_ms = 0.0
+        self._step = self.min_step
+        self._last_state = None
+        self._last_ms = None
+        self._frame_ms = 0.0
+
+    def should_analyze(self, index: int, timestamp_ms: float = 0.0) -> bool:
+        self.frames_seen += 1
+        if self._last_ms is not None and timestamp_ms > self._last_ms:
+            self._frame_ms = timestamp_ms - self._last_ms
+        self._last_ms = timestamp_ms
+
+        if self.mode == "all":
+            take = True
+        elif self.mode == "every_n":
+            take = index % self.every_n == 0
+        elif self.mode == "fps":
+            take = timestamp_ms >= self._next_ms
+            if take:
+                self._next_ms = timestamp_ms + 1000.0 / self.target_fps
+        else:
+            take = index >= self._next_index
+            if take:
+                self._next_index = index + self._step
+
+        if take:
+            self.frames_analyzed += 1
+        return take
+
+    def needs_lead_in(self, index: int, timestamp_ms: float = 0.0) -> bool:
+        """Bir sonraki kare analiz edilecekse (ve bu kare atlanıyorsa) bu kare çözülmeli mi?"""
+        if self.mode == "all":
+            return False
+        if self.mode == "every_n":
+            return self.every_n > 1 and (index + 1) % self.every_n == 0
+        if self.mode == "fps":
+            return timestamp_ms + self._frame_ms >= self._next_ms
+        return index + 1 >= self._next_index
+
+    def observe(self, index: int, frame_metrics: Dict):
+        """
+        Adaptif modda analiz sonucuna göre adımı ayarlar:
+        durum değiştiyse en sık örneklemeye dön, değişmediyse adımı iki katına çıkar.
+        """
+        if self.mode != "adaptive":
+            return
+
+        state = (
+            frame_metrics.get("face_detected", False),
+            frame_metrics.get("eye_contact", False),
+            frame_metrics.get("movement_detected", False),
+        )
+        if state != self._last_state:
+            self._step = self.min_step
+        else:
+            self._step = min(self._step * 2, self.max_step)
+        self._last_state = state
+        self._next_index = index + self._step
+
+
+def iter_sampled_frames(cap: cv2.VideoCapture, sampler: Optional[FrameSampler] = None,
+                        start_index: int = 0, end_index: Optional[int] = None) -> Iterator[FrameContext]:
+    """
+    Açık bir VideoCapture üzerinden yalnızca örnekleyicinin seçtiği kareleri çözer.
+    Diğer kareler sadece grab() ile geçilir. end_index verilirse o kareye gelmeden durur.
+    """
+    sampler = sampler or FrameSampler()
+    index = start_index
+    lead_in = None
+    while cap.isOpened() and (end_index is None or index < end_index):
+        if not cap.grab():
+            break
+        timestamp_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if sampler.should_analyze(index, timestamp_ms):
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            ctx = FrameContext(frame, index, timestamp_ms)
+            ctx.previous = lead_in
+            lead_in = None
+            yield ctx
+        elif sampler.needs_lead_in(index, timestamp_ms):
+            ret, frame = cap.retrieve()
+            lead_in = FrameContext(frame, index, timestamp_ms) if ret else None
+        else:
+            lead_in = None
+        index += 1
@@ -0,0 +1,420 @@
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Süreç genelinde tek iş yöneticisi (ilk kullanımda oluşturulur)
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+# Öncelik sınıfları (küçük = önce): canlı prova bitişi > normal yükleme > toplu / yan işler
+PRIORITY_CLASSES = {"live": 0, "interactive": 1, "bulk": 2}
+
+# Maliyet birimi: 720p video saniyesi. Süre okunamazsa (tarayıcı webm kayıtları) dosya boyundan,
+# 720p kaydın tipik bit hızıyla tahmin edilir (bit hızı çözünürlükle zaten ölçeklenir)
+REFERENCE_PIXELS = 1280 * 720
+ASSUMED_BITRATE = 2.5e6
+
+# Tek analiz işinin bellek tahmini: sabit pay (çözücü, OpenCV tamponları, ASR ara verisi) + ses örnekleri
+# (ffmpeg stereo f32 çıktısı + mono kopya ≈ 0.2 MB/sn) + boru hattında aynı anda tutulan kareler
+JOB_BASE_MEMORY_MB = 150
+AUDIO_MB_PER_SECOND = 0.25
+FRAMES_IN_FLIGHT = 16
+
+
+def estimate_cost(media: Dict = None, size_bytes: int = 0) -> float:
+    """Analiz maliyeti tahmini (720p eşdeğeri saniye): süre x çözünürlük oranı."""
+    media = media or {}
+    pixels = (media.get("width") or 0) * (media.get("height") or 0)
+    if media.get("duration_sec") and pixels:
+        cost = media["duration_sec"] * pixels / REFERENCE_PIXELS
+    else:
+        cost = size_bytes * 8 / ASSUMED_BITRATE
+    return round(max(1.0, cost), 1)
+
+
+def estimate_memory_mb(media: Dict = None, size_bytes: int = 0) -> float:
+    """Analiz sırasındaki tepe bellek tahmini (MB); süre bilinmiyorsa dosya boyundan tahmin edilir."""
+    media = media or {}
+    duration = media.get("duration_sec") or size_bytes * 8 / ASSUMED_BITRATE
+    pixels = (media.get("width") or 0) * (media.get("height") or 0) or REFERENCE_PIXELS
+    frames = pixels * 3 * FRAMES_IN_FLIGHT / 1024 ** 2
+    return round(JOB_BASE_MEMORY_MB + duration * AUDIO_MB_PER_SECOND + frames, 1)
+
+
+def default_memory_budget_mb() -> float:
+    """Varsayılan bütçe: fiziksel belleğin yarısı (okunamazsa 0 = kapalı)."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 2 * 0.5
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+class AdmissionError(Exception):
+    """Kuyruk dolu veya tahmini bekleme çok uzun; istemci retry_after saniye sonra tekrar denemeli."""
+
+    def __init__(self, reason: str, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AnalysisJob:
+    """
+    Kuyruğa alınmış tek bir analiz işi. İş fonksiyonu stage / session / presentation_id alanlarını
+    günceller; durum sorgusu bu alanları okur.
+    """
+
+    def __init__(self, user_id: Optional[int], content_hash: str = None, priority: str = "interactive",
+                 cost: float = 1.0, deadline: float = None, memory_mb: float = 0):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.priority = priority
+        self.cost = cost
+        self.memory_mb = memory_mb
+        # İsteğe bağlı bitiş zamanı (epoch); yaklaştığında iş kendi sınıfında öne alınır
+        self.deadline = deadline
+        # Adil paylaşım sıralama etiketi (JobManager atar)
+        self.finish_tag = 0.0
+        # Yüklenen dosyanın SHA-256 özeti (yükleme sırasında akış halinde hesaplanır)
+        self.content_hash = content_hash
+        self.status = "queued"  # queued | running | done | failed
+        self.stage = "queued"
+        self.error = None
+        self.presentation_id = None
+        # Sonuç önbellekten geldiyse işin süresi maliyet tahminini öğrenmekte kullanılmaz
+        self.cache_hit = False
+        # Kare ilerlemesi için iş çalışırken AnalysisSession buraya bağlanır
+        self.session = None
+        self.total_frames = None
+        self._final_progress = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # İşin bitişini bekleyen çağıranlar için (Örn: canlı prova WebSocket'i); sonuç presentation_id
+        self.future = Future()
+
+    def progress(self) -> Dict:
+        if self._final_progress is not None:
+            return self._final_progress
+        progress = {"frames_processed": 0, "frames_seen": 0, "total_frames": self.total_frames, "ratio": None}
+        if self.session is not None:
+            progress["frames_processed"] = self.session.sampler.frames_analyzed
+            progress["frames_seen"] = self.session.sampler.frames_seen
+        if self.status == "done":
+            progress["ratio"] = 1.0
+        elif self.total_frames:
+            progress["ratio"] = round(min(1.0, progress["frames_seen"] / self.total_frames), 3)
+        return progress
+
+    def to_dict(self) -> Dict:
+        now = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress(),
+            "error": self.error,
+            "presentation_id": self.presentation_id,
+            "content_hash": self.content_hash,
+            "priority": self.priority,
+            "estimated_cost": self.cost,
+            "queue_wait_sec": round((self.started_at or now) - self.created_at, 2),
+            "elapsed_sec": round(now - (self.started_at or now), 2)
+        }
+
+
+class JobManager:
+    """
+    Analiz işlerini olay döngüsünün dışında, sınırlı sayıda işçi iş parçacığında çalıştırır.
+    Sıradaki iş şu sırayla seçilir:
+      1. Öncelik sınıfı (live > interactive > bulk); uzun bekleyen iş PRIORITY_AGING_SECONDS'ta bir sınıf yükselir
+      2. Bitiş zamanı DEADLINE_URGENT_SECONDS içinde olan işler, en yakın bitişten başlayarak
+      3. Adil paylaşım etiketi: her kullanıcının kuyruğa aldığı tahmini maliyet birikir (ağırlıklı adil kuyruk);
+         tek kullanıcının on uzun kaydı, diğerlerinin kısa kayıtlarını arkasında bekletmez ve kısa işler öne geçer
+    Bir kullanıcının aynı anda çalışan işi max_per_user ile sınırlıdır (canlı prova bitişi hariç).
+    reserved_live işçi yalnızca canlı prova bitişlerini alır; uzun yüklemeler sürerken de bekletmeden başlar.
+    Kabul denetimi (admit): kuyruk max_queued'a ulaştıysa veya tahmini bekleme max_wait_seconds'ı aşıyorsa
+    yeni iş hiç kabul edilmez (AdmissionError). Çalışan işlerin tahmini bellek toplamı memory_budget_mb'ı
+    aşacaksa iş, yer açılana kadar kuyrukta bekler (bütçeden büyük tek iş yalnız başına çalışır); aging_seconds'tan
+    uzun bekleyen böyle bir iş varsa bütçe ona ayrılır ve o başlayana kadar yeni (canlı olmayan) iş alınmaz.
+    İşler bellekte tutulur (sunucu yeniden başlarsa yarım kalan işler kaybolur);
+    biten işler JOB_RETENTION_SECONDS sonra temizlenir.
+    """
+
+    def __init__(self, workers: int, retention_seconds: float = 3600, max_per_user: int = None,
+                 reserved_live: int = 1, aging_seconds: float = 600, urgent_seconds: float = 3600,
+                 max_queued: int = None, max_wait_seconds: float = 0, memory_budget_mb: float = 0):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued or self.workers * 8
+        self.max_wait_seconds = max_wait_seconds
+        self.memory_budget_mb = memory_budget_mb
+        self.retention_seconds = retention_seconds
+        self.max_per_user = max_per_user or max(1, self.workers // 2)
+        self.aging_seconds = aging_seconds
+        self.urgent_seconds = urgent_seconds
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._queue: List[tuple] = []  # (job, fn, args)
+        self._running_by_user: Dict[int, int] = defaultdict(int)
+        # Kullanıcı başına son etiket ve sistemin sanal zamanı (son başlatılan işin başlangıç etiketi)
+        self._user_tags: Dict[int, float] = defaultdict(float)
+        self._virtual_time = 0.0
+        # Sınıf başına son kuyruk bekleme süreleri (metrikler için)
+        self._waits = {name: deque(maxlen=500) for name in PRIORITY_CLASSES}
+        self._running_memory = 0.0
+        # Bellek bütçesinin ayrıldığı, uzun süredir bekleyen büyük iş (bkz. _reserve_memory)
+        self._memory_reserved: Optional[AnalysisJob] = None
+        # Maliyet biriminin gerçekte kaç saniye sürdüğü (biten işlerden üstel ortalama); bekleme tahmini için
+        self._sec_per_cost = 1.0
+        self._rejected = defaultdict(int)
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+
+        self._threads = [threading.Thread(target=self._worker, args=(None,), daemon=True,
+                                          name=f"analysis-job-{i}") for i in range(self.workers)]
+        self._threads += [threading.Thread(target=self._worker, args=("live",), daemon=True,
+                                           name=f"analysis-live-{i}") for i in range(reserved_live)]
+        for thread in self._threads:
+            thread.start()
+
+    def _queued_backlog(self):
+        """Kilit tutulurken: canlı prova dışındaki bekleyen işlerin sayısı ve toplam maliyeti."""
+        jobs = [entry[0] for entry in self._queue if entry[0].priority != "live"]
+        return len(jobs), sum(j.cost for j in jobs)
+
+    def _estimated_wait(self, queued_cost: float) -> float:
+        return queued_cost * self._sec_per_cost / self.workers
+
+    def admit(self, cost: float = 1.0, priority: str = "interactive"):
+        """
+        Yeni iş kabul edilebilir mi? Edilemezse AdmissionError (HTTP 503 + Retry-After).
+        Yükleme oturumu açılırken veri gelmeden çağrılır; anlık bir kontrol olduğu için eşzamanlı
+        isteklerde kuyruk sınırı birkaç iş kadar aşılabilir.
+        """
+        if priority == "live":
+            return
+        with self._lock:
+            queued, queued_cost = self._queued_backlog()
+            # Bir işçinin boşalması için beklenen süre: kuyruktaki ortalama iş süresi / işçi sayısı
+            mean_cost = queued_cost / queued if queued else cost
+            retry_after = int(min(600, max(5, math.ceil(self._estimated_wait(mean_cost)))))
+            if queued >= self.max_queued:
+                self._rejected["queue_full"] += 1
+                raise AdmissionError("queue_full", "Analiz kuyruğu dolu, lütfen biraz sonra tekrar deneyin.",
+                                     retry_after)
+            if self.max_wait_seconds and self._estimated_wait(queued_cost + cost) > self.max_wait_seconds:
+                self._rejected["overloaded"] += 1
+                raise AdmissionError("overloaded", "Sunucu yoğun, lütfen biraz sonra tekrar deneyin.", retry_after)
+
+    def submit(self, user_id: Optional[int], fn, *args, content_hash: str = None, priority: str = "interactive",
+               cost: float = 1.0, deadline: float = None, memory_mb: float = 0) -> AnalysisJob:
+        """
+        fn(job, *args) bir işçide çalışır; dönüş değeri sunumun kimliği olarak kaydedilir.
+        cost: estimate_cost ile tahmin edilen maliyet; deadline: epoch saniye (isteğe bağlı);
+        memory_mb: estimate_memory_mb ile tahmin edilen tepe bellek. Kabul denetimi için önce admit çağrılır.
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Bilinmeyen öncelik sınıfı: {priority}")
+        job = AnalysisJob(user_id, content_hash, priority, cost, deadline, memory_mb)
+        with self._lock:
+            self._cleanup()
+            # Başlangıç etiketi: kullanıcının önceki işinin bitişi veya (boşta kaldıysa) sistemin sanal zamanı;
+            # böylece bir süre iş göndermeyen kullanıcı biriktirdiği hakla kuyruğu tekeline alamaz
+            start_tag = max(self._user_tags[user_id], self._virtual_time)
+            job.finish_tag = start_tag + cost
+            self._user_tags[user_id] = job.finish_tag
+            if user_id is not None:
+                self._jobs[job.id] = job
+            self._queue.append((job, fn, args))
+            self._available.notify_all()
+        return job
+
+    def defer(self, fn, *args):
+        """Sonucu beklenmeyen yan işler için (Örn: işaretli önizleme videosu); en düşük öncelikte çalışır."""
+        self.submit(None, lambda job, *a: fn(*a), *args, priority="bulk")
+
+    def _sort_key(self, job: AnalysisJob, now: float):
+        waited = now - job.created_at
+        rank = max(0, PRIORITY_CLASSES[job.priority] - int(waited // self.aging_seconds))
+        urgent = job.deadline is not None and job.deadline - now <= self.urgent_seconds
+        return rank, 0 if urgent else 1, job.deadline if urgent else 0, job.finish_tag, job.created_at
+
+    def _fits_memory(self, job: AnalysisJob) -> bool:
+        # Hiç iş çalışmıyorsa bütçeden büyük iş de yalnız başına çalışır
+        return not self.memory_budget_mb or self._running_memory <= 0 or \
+            self._running_memory + job.memory_mb <= self.memory_budget_mb
+
+    def _under_user_limit(self, job: AnalysisJob) -> bool:
+        return job.user_id is None or self._running_by_user[job.user_id] < self.max_per_user
+
+    def _reserve_memory(self, now: float) -> Optional[AnalysisJob]:
+        """
+        Kilit tutulurken: aging_seconds'tan uzun süredir yalnızca bellek bütçesi yüzünden bekleyen en eski işe
+        bütçe ayrılır ve ayrım iş başlayana kadar sürer; küçük işler sürekli araya girip onu aç bırakamaz.
+        """
+        if self._memory_reserved is not None and any(entry[0] is self._memory_reserved for entry in self._queue):
+            return self._memory_reserved
+        starving = [entry[0] for entry in self._queue
+                    if entry[0].priority != "live" and now - entry[0].created_at >= self.aging_seconds
+                    and not self._fits_memory(entry[0]) and self._under_user_limit(entry[0])]
+        self._memory_reserved = min(starving, key=lambda j: j.created_at, default=None)
+        return self._memory_reserved
+
+    def _eligible(self, job: AnalysisJob, only: Optional[str], reserved: Optional[AnalysisJob] = None) -> bool:
+        if only is not None and job.priority != only:
+            return False
+        if job.priority == "live":
+            return True
+        # Bütçe aç kalan büyük işe ayrıldıysa, o sığana kadar başka iş başlatılmaz (çalışanlar bitip yer açar)
+        if reserved is not None and job is not reserved:
+            return False
+        # Bellek bütçesi: çalışan işlerle birlikte sığmıyorsa bekler
+        if not self._fits_memory(job):
+            return False
+        return self._under_user_limit(job)
+
+    def _next(self, only: Optional[str]):
+        """Kilit tutulurken çağrılır; çalıştırılabilecek iş yoksa None."""
+        now = time.time()
+        reserved = self._reserve_memory(now)
+        candidates = [entry for entry in self._queue if self._eligible(entry[0], only, reserved)]
+        if not candidates:
+            return None
+        entry = min(candidates, key=lambda e: self._sort_key(e[0], now))
+        self._queue.remove(entry)
+        job = entry[0]
+        if job is self._memory_reserved:
+            self._memory_reserved = None
+        self._virtual_time = max(self._virtual_time, job.finish_tag - job.cost)
+        # Canlı prova bitişi kullanıcı sınırına sayılmaz; prova sürerken aynı kullanıcının yüklemeleri bekletilmez
+        if job.priority != "live":
+            self._running_by_user[job.user_id] += 1
+        self._running_memory += job.memory_mb
+        return entry
+
+    def _worker(self, only: Optional[str]):
+        while True:
+            with self._available:
+                entry = self._next(only)
+                while entry is None:
+                    # Yaşlanma ile sınıf değişebileceği için ara ara yeniden değerlendirilir
+                    self._available.wait(timeout=self.aging_seconds)
+                    entry = self._next(only)
+            self._run(*entry)
+            with self._available:
+                job = entry[0]
+                if job.priority != "live":
+                    self._running_by_user[job.user_id] -= 1
+                self._running_memory -= job.memory_mb
+                if job.status == "done" and job.cost > 0 and job.priority != "live" and not job.cache_hit:
+                    rate = (job.finished_at - job.started_at) / job.cost
+                    self._sec_per_cost = 0.8 * self._sec_per_cost + 0.2 * rate
+                # Kullanıcı sınırı / bellek bütçesi boşaldı; bekleyen işçiler yeniden baksın
+                self._available.notify_all()
+
+    def _run(self, job: AnalysisJob, fn, args):
+        job.status = job.stage = "running"
+        job.started_at = time.time()
+        self._waits[job.priority].append(job.started_at - job.created_at)
+        try:
+            job.presentation_id = fn(job, *args)
+            job.status = job.stage = "done"
+            job.future.set_result(job.presentation_id)
+        except Exception as e:
+            print(f"❌ Analiz işi başarısız ({job.id}): {e}")
+            job.status = "failed"
+            job.error = str(e) or e.__class__.__name__
+            job.future.set_exception(e)
+        finally:
+            job.finished_at = time.time()
+            # Son ilerleme sabitlenir; oturumun sayaç ve zaman çizelgesi belleği serbest kalır
+            job._final_progress = job.progress()
+            job.session = None
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    def _cleanup(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            queued = [entry[0] for entry in self._queue]
+            running = {user_id: count for user_id, count in self._running_by_user.items() if count}
+            waits = {name: list(values) for name, values in self._waits.items()}
+            backlog, backlog_cost = self._queued_backlog()
+            reserved = self._memory_reserved
+            admission = {
+                "accepting": backlog < self.max_queued and not (
+                    self.max_wait_seconds and self._estimated_wait(backlog_cost) > self.max_wait_seconds),
+                "max_queued": self.max_queued,
+                "max_wait_sec": self.max_wait_seconds or None,
+                "estimated_wait_sec": round(self._estimated_wait(backlog_cost), 1),
+                "sec_per_cost": round(self._sec_per_cost, 3),
+                "memory_budget_mb": round(self.memory_budget_mb) or None,
+                "running_memory_mb": round(self._running_memory, 1),
+                "memory_reserved_mb": reserved.memory_mb if reserved else None,
+                "rejected": dict(self._rejected)
+            }
+        classes = {}
+        for name in PRIORITY_CLASSES:
+            jobs = [j for j in queued if j.priority == name]
+            recent = np.array(waits[name]) if waits[name] else None
+            classes[name] = {
+                "queued": len(jobs),
+                "queued_cost": round(sum(j.cost for j in jobs), 1),
+                # Son 500 işin kuyrukta bekleme süresi (sn)
+                "started": len(waits[name]),
+                "wait_p50_sec": round(float(np.percentile(recent, 50)), 2) if recent is not None else None,
+                "wait_p90_sec": round(float(np.percentile(recent, 90)), 2) if recent is not None else None,
+                "wait_max_sec": round(float(recent.max()), 2) if recent is not None else None
+            }
+        return {
+            "workers": self.workers,
+            "max_per_user": self.max_per_user,
+            "queued": len(queued),
+            "running": sum(running.values()),
+            "users_running": len([u for u in running if u is not None]),
+            "classes": classes,
+            "admission": admission
+        }
+
+
+def get_job_manager() -> JobManager:
+    """
+    Süreç genelindeki iş yöneticisi.
+    .env: ANALYSIS_JOB_WORKERS (varsayılan ANALYZER_POOL_SIZE / CPU sayısı), JOB_RETENTION_SECONDS,
+    ANALYSIS_JOBS_PER_USER (varsayılan işçi sayısının yarısı), ANALYSIS_LIVE_WORKERS (canlı prova için ayrılan),
+    PRIORITY_AGING_SECONDS, DEADLINE_URGENT_SECONDS,
+    ANALYSIS_MAX_QUEUED (varsayılan işçi x 8), ANALYSIS_MAX_WAIT_SECONDS (0 = kapalı),
+    ANALYSIS_MEMORY_BUDGET_MB (varsayılan fiziksel belleğin yarısı, 0 = kapalı)
+    """
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            default_workers = os.getenv("ANALYZER_POOL_SIZE", str(os.cpu_count() or 2))
+            workers = int(os.getenv("ANALYSIS_JOB_WORKERS", default_workers))
+            per_user = os.getenv("ANALYSIS_JOBS_PER_USER")
+            max_queued = os.getenv("ANALYSIS_MAX_QUEUED")
+            memory_budget = os.getenv("ANALYSIS_MEMORY_BUDGET_MB")
+            _job_manager = JobManager(
+                workers,
+                float(os.getenv("JOB_RETENTION_SECONDS", "3600")),
+                max_per_user=int(per_user) if per_user else None,
+                reserved_live=int(os.getenv("ANALYSIS_LIVE_WORKERS", "1")),
+                aging_seconds=float(os.getenv("PRIORITY_AGING_SECONDS", "600")),
+                urgent_seconds=float(os.getenv("DEADLINE_URGENT_SECONDS", "3600")),
+                max_queued=int(max_queued) if max_queued else None,
+                max_wait_seconds=float(os.getenv("ANALYSIS_MAX_WAIT_SECONDS", "0")),
+                memory_budget_mb=float(memory_budget) if memory_budget else default_memory_budget_mb()
+            )
+        return _job_manager
@@ -0,0 +1,185 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from app.analysis_models.eye_tracker import EyeTracker
+from app.analysis_models.pose_detector import PoseDetector
+from app.analysis_models.prosody_engine import ProsodyEngine
+from app.analysis_models.speech_analyzer import SpeechAnalyzer
+from app.analysis_models.frame_context import FrameContext
+from app.analysis_models.combined_analyzer import compute_overall_score, collect_features
+from app.utils.audio_buffer import AudioBuffer
+from app.utils.timeline_store import TimelineWriter
+
+# Canlı provalar arasında paylaşılan analizörler (ilk bağlantıda bir kez oluşturulur)
+_live_analyzers = None
+_live_analyzers_lock = threading.Lock()
+
+
+def get_live_analyzers():
+    """
+    (EyeTracker, PoseDetector, SpeechAnalyzer) üçlüsü. Oturum durumu her provanın kendi state
+    nesnelerinde tutulduğu için analizörler eşzamanlı bağlantılarda paylaşılır. Havuzdaki analizörler
+    kullanılmaz: bir prova 30 dakikaya kadar sürebilir ve yükleme analizlerinden bir yer kapatırdı.
+    """
+    global _live_analyzers
+    with _live_analyzers_lock:
+        if _live_analyzers is None:
+            # Canlı akışta hız öncelikli: yüz takip modu açık
+            _live_analyzers = (EyeTracker(tracking=True), PoseDetector(), SpeechAnalyzer())
+        return _live_analyzers
+
+
+class LiveRehearsal:
+    """
+    Canlı prova oturumu: kareler ve ses parçaları geldikçe artımlı olarak analiz edilir,
+    her saniye için göz teması / hareket / canlılık göstergeleri üretilir.
+    Bitişte toplam sonuçlar analyze_session ile aynı biçimde döner (Presentation kaydı için).
+    """
+
+    # Canlılık göstergesinin hesaplandığı kayan pencere (saniye)
+    LIVELINESS_WINDOW = 5
+
+    def __init__(self, sample_rate: int = 16000, max_width: int = 640, max_seconds: float = 1800,
+                 transcribe: bool = True, max_lead_seconds: float = 2.0):
+        self.eye_tracker, self.pose_detector, self.speech_analyzer = get_live_analyzers()
+        self.eye_state = self.eye_tracker.new_state()
+        self.pose_state = self.pose_detector.new_state()
+        self.sample_rate = sample_rate
+        self.max_width = max_width
+        self.max_samples = int(max_seconds * sample_rate)
+        self.transcribe = transcribe
+
+        # Ses 1 sn'lik bloklarla işlenir; son blokların RMS/F0 değerleri kayan pencerede tutulur
+        self._recent_audio = deque(maxlen=self.LIVELINESS_WINDOW)
+        self.prosody = ProsodyEngine(sample_rate, block_seconds=1.0,
+                                     on_block=lambda rms, f0: self._recent_audio.append((rms, f0)))
+        # Bitişte transkripsiyon için ses 16-bit olarak saklanır (float32'nin yarısı kadar bellek)
+        self._audio_chunks: List[np.ndarray] = []
+        self.audio_samples = 0
+
+        self.timeline = TimelineWriter()
+        self.frames = 0
+        self.last_frame_ts = None
+        self._second = self._new_second()
+        # Kare zaman damgaları istemciden gelir; sunucu saatinin en fazla max_lead_seconds önüne geçebilir
+        self.started_at = time.monotonic()
+        self.max_lead_seconds = max_lead_seconds
+
+    @staticmethod
+    def _new_second() -> Dict:
+        return {"frames": 0, "faces": 0, "eye": 0, "move_sum": 0.0, "move_count": 0, "busy_ms": 0.0}
+
+    @property
+    def media_seconds(self) -> float:
+        """Gelen medyanın süresi (kare zaman damgası veya ses uzunluğu, hangisi ilerideyse)."""
+        video = (self.last_frame_ts or 0.0) / 1000.0
+        return max(video, self.audio_samples / self.sample_rate)
+
+    def clamp_timestamp(self, timestamp_ms: float) -> Optional[float]:
+        """
+        İstemci zaman damgasını süre ve skorları bozmayacak aralığa çeker: geri gitmez ve oturumun
+        başlangıcından bu yana geçen sunucu süresini (+ max_lead_seconds) aşmaz. Sonlu değilse None.
+        """
+        if not math.isfinite(timestamp_ms):
+            return None
+        limit = (time.monotonic() - self.started_at + self.max_lead_seconds) * 1000.0
+        return min(max(timestamp_ms, self.last_frame_ts or 0.0), limit)
+
+    def add_frame(self, frame: np.ndarray, timestamp_ms: float) -> Dict:
+        start = time.perf_counter()
+        timestamp_ms = self.clamp_timestamp(timestamp_ms)
+        if timestamp_ms is None:
+            return {}
+        if frame.shape[1] > self.max_width:
+            scale = self.max_width / frame.shape[1]
+            frame = cv2.resize(frame, (self.max_width, int(frame.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+
+        ctx = FrameContext(frame, self.frames, timestamp_ms)
+        frame_metrics = {}
+        frame_metrics.update(self.pose_detector.analyze_batch([ctx], self.pose_state)[0])
+        frame_metrics.update(self.eye_tracker.analyze_frame(ctx, self.eye_state)[1])
+        self.timeline.append(timestamp_ms, frame_metrics)
+        self.frames += 1
+        self.last_frame_ts = timestamp_ms
+
+        second = self._second
+        second["frames"] += 1
+        second["faces"] += frame_metrics.get("face_detected", False)
+        second["eye"] += frame_metrics.get("eye_contact", False)
+        if "movement_ratio" in frame_metrics:
+            second["move_sum"] += frame_metrics["movement_ratio"]
+            second["move_count"] += 1
+        second["busy_ms"] += (time.perf_counter() - start) * 1000
+        return frame_metrics
+
+    def add_audio(self, samples: np.ndarray):
+        """Mono float32 ses parçası ekler (oturum süresi sınırını aşan kısım yok sayılır)."""
+        samples = samples[:max(0, self.max_samples - self.audio_samples)]
+        if len(samples) == 0:
+            return
+        # İstemciden gelen NaN/sonsuz değerler perde ve enerji hesaplarını bozmasın
+        samples = np.nan_to_num(samples, nan=0.0, posinf=1.0, neginf=-1.0)
+        self.prosody.push(samples, self.sample_rate)
+        self._audio_chunks.append((np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16))
+        self.audio_samples += len(samples)
+
+    def tick(self) -> Dict:
+        """Son saniyenin göstergelerini döner ve saniye sayaçlarını sıfırlar."""
+        second, self._second = self._second, self._new_second()
+        indicator = {
+            "type": "tick",
+            "t": round(self.media_seconds, 2),
+            "frames": second["frames"],
+            "face_ratio": round(second["faces"] / second["frames"], 3) if second["frames"] else None,
+            "eye_contact_ratio": round(second["eye"] / second["faces"], 3) if second["faces"] else None,
+            "movement": round(second["move_sum"] / second["move_count"], 3) if second["move_count"] else None,
+            "monotony_score": None,
+            "last_frame_ts": self.last_frame_ts,
+            "busy_ms": round(second["busy_ms"], 1)
+        }
+        if self._recent_audio:
+            rms = np.concatenate([r for r, _ in self._recent_audio])
+            f0 = np.concatenate([f for _, f in self._recent_audio])
+            indicator["monotony_score"] = round(float(SpeechAnalyzer.monotony_score(
+                float(np.std(rms)), float(np.std(f0)) if len(f0) else 0.0)), 1)
+        return indicator
+
+    def finalize(self, timeline_path: Optional[str] = None) -> Dict:
+        """Oturumu kapatır; analyze_session ile aynı biçimde sonuç döner."""
+        prosody = self.prosody.finish()
+        if timeline_path:
+            self.timeline.save(timeline_path)
+
+        eye_summary = self.eye_tracker.get_summary(self.eye_state)
+        pose_summary = self.pose_detector.get_summary(self.pose_state)
+        duration = self.media_seconds
+
+        # Puanlama yüklemeyle aynı yoldan (SpeechAnalyzer.score) yapılır
+        speech_analyzer = self.speech_analyzer
+        transcription = None
+        prosody_stats = None
+        if self.audio_samples:
+            prosody_stats = dict(prosody, energy_std=float(prosody["energy_std"]),
+                                 pitch_std=float(prosody["pitch_std"]), duration=duration)
+            if self.transcribe:
+                samples = np.concatenate(self._audio_chunks).astype(np.float32) / 32767
+                transcription = speech_analyzer.transcriber.transcribe(AudioBuffer(samples, self.sample_rate),
+                                                                       language=speech_analyzer.language)
+        self._audio_chunks = []
+        speech_data = speech_analyzer.score(transcription, prosody_stats, duration)
+
+        results = {
+            "eye_score": eye_summary.get("overall_eye_contact_score", 0),
+            "body_score": pose_summary.get("overall_body_language_score", 0),
+            "speech_data": speech_data,
+            "features": collect_features(eye_summary, pose_summary, speech_data),
+            "duration_seconds": duration
+        }
+        results["overall_score"] = compute_overall_score(results)
+        return results
@@ -1,87 +1,177 @@
 import cv2
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple, Union
+from app.analysis_models.frame_context import FrameContext
+from app.analysis_models.frame_sampler import FrameSampler, iter_sampled_frames
+from app.utils.running_stats import RunningStats
+from app.analysis_models.scoring import get_scoring_engine
+
+class PoseState:
+    """Bir analiz oturumuna ait değişken durum (önceki kare ve hareket istatistikleri)."""
 
-class PoseDetector:
     def __init__(self):
         self.prev_frame_gray = None
-        self.movement_scores = []
+
+        # Hareket oranları listede biriktirilmez; sabit bellekli istatistik tutulur (% cinsinden)
+        self.movement_stats = RunningStats(hist_min=0.0, hist_max=20.0, bins=200)
 
         self.metrics = {
             'stability_score': 0,
             'high_movement_frames': 0
         }
 
-    def analyze_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Dict]:
-        # Griye çevir ve yumuşat
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
 
-        movement_ratio = 0.0
-        frame_metrics = {'movement_detected': False}
+class PoseDetector:
+    """
+    Ayarlar bu nesnede, oturum durumu PoseState içinde tutulur.
+    Metotlara state verilmezse nesnenin kendi varsayılan durumu (self.state) kullanılır.
+    """
 
-        if self.prev_frame_gray is not None:
-            # İki kare arasındaki farkı al
-            frame_delta = cv2.absdiff(self.prev_frame_gray, gray)
-            thresh = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY)[1]
+    # Hareket oranı çıktısını değiştiren bir değişiklikte artırılır (aşama önbelleği, bkz. ArtifactStore)
+    STAGE_VERSION = 1
 
-            # Hareket eden piksellerin toplam alana oranı (0.0 - 1.0 arası)
-            total_pixels = frame.shape[0] * frame.shape[1]
-            movement_pixels = np.count_nonzero(thresh)
-            
-            # Yüzdeye çevir (Örn: %0.5 hareket)
-            movement_ratio = (movement_pixels / total_pixels) * 100
-            self.movement_scores.append(movement_ratio)
+    # Kareler arası piksel farkının "hareket" sayılacağı eşik (0-255)
+    DIFF_THRESHOLD = 25
 
-            # Eşik değeri: Eğer ekrandaki piksellerin %1'inden fazlası değişiyorsa hareket var demektir
-            if movement_ratio > 1.0: 
-                frame_metrics['movement_detected'] = True
-                self.metrics['high_movement_frames'] += 1
-                cv2.putText(frame, "HAREKETLI", (10, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            else:
-                cv2.putText(frame, "STABIL", (10, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    def __init__(self, scale: float = 1.0):
+        # scale < 1 ise fark hesabı küçültülmüş karede yapılır (1.0: eski sonuçlarla birebir aynı)
+        self.scale = scale
+        self.blur_ksize = 21 if scale >= 1.0 else max(3, int(21 * scale) | 1)
+
+        self.state = self.new_state()
 
-        self.prev_frame_gray = gray
-        return frame, frame_metrics
+    def new_state(self) -> PoseState:
+        return PoseState()
 
-    def get_summary(self) -> Dict:
-        if not self.movement_scores:
-            avg_move = 0.0
+    @property
+    def metrics(self) -> Dict:
+        return self.state.metrics
+
+    @property
+    def movement_stats(self) -> RunningStats:
+        return self.state.movement_stats
+
+    def _gray(self, ctx: FrameContext) -> np.ndarray:
+        return ctx.blurred(self.blur_ksize, self.scale)
+
+    def analyze_frame(self, frame: Union[np.ndarray, FrameContext],
+                      state: PoseState = None) -> Tuple[np.ndarray, Dict]:
+        ctx = FrameContext.wrap(frame)
+        return ctx.frame, self.analyze_batch([ctx], state)[0]
+
+    def analyze_batch(self, frames: List[Union[np.ndarray, FrameContext]],
+                      state: PoseState = None) -> List[Dict]:
+        """
+        K kareyi tek seferde işler: bulanık gri kareler tek bir bitişik diziye dizilir,
+        kare-kare farklar ve hareket oranları tüm blok için vektörel hesaplanır.
+        """
+        state = state or self.state
+        ctxs = [FrameContext.wrap(f) for f in frames]
+        if not ctxs:
+            return []
+        frame_metrics = [{'movement_detected': False} for _ in ctxs]
+
+        if any(ctx.previous is not None for ctx in ctxs):
+            # Seyrek örneklemede her kare kendi lead-in karesiyle kıyaslanır
+            grays = [self._gray(ctx) for ctx in ctxs]
+            pairs = [(i, self._gray(ctx.previous) if ctx.previous is not None
+                      else (grays[i - 1] if i > 0 else state.prev_frame_gray))
+                     for i, ctx in enumerate(ctxs)]
+            valid = [i for i, prev in pairs if prev is not None]
+            state.prev_frame_gray = grays[-1]
+            if not valid:
+                return frame_metrics
+            height, width = grays[0].shape
+            cur_block = np.concatenate([grays[i] for i in valid])
+            prev_block = np.concatenate([pairs[i][1] for i in valid])
         else:
-            avg_move = np.mean(self.movement_scores)
+            # Bir önceki bloğun son karesi + bu bloğun K karesi tek bitişik (K+1, H, W) diziye yazılır;
+            # ardışık farklar iki görünüm (stack[:-1], stack[1:]) arasında tek çağrıda alınır
+            height, width = ctxs[0].downscaled(self.scale).shape
+            has_prev = state.prev_frame_gray is not None
+            stack = np.empty((len(ctxs) + 1, height, width), dtype=np.uint8)
+            if has_prev:
+                stack[0] = state.prev_frame_gray
+            for i, ctx in enumerate(ctxs):
+                ctx.blurred(self.blur_ksize, self.scale, out=stack[i + 1])
+            state.prev_frame_gray = stack[-1]
+
+            first = 0 if has_prev else 1
+            valid = list(range(first, len(ctxs)))
+            if not valid:
+                return frame_metrics
+            prev_block = stack[first:-1].reshape(-1, width)
+            cur_block = stack[first + 1:].reshape(-1, width)
+
+        # İki kare arasındaki farkı al
+        frame_delta = cv2.absdiff(prev_block, cur_block)
+        thresh = frame_delta > self.DIFF_THRESHOLD
 
-        # --- PUANLAMA MANTIĞI (GÜNCELLENDİ) ---
-        # İdeal hareket oranı %0.5 ile %3.0 arasıdır (Jest ve mimikler).
+        # Hareket eden piksellerin toplam alana oranı, yüzde olarak (Örn: %0.5 hareket)
+        movement_pixels = np.count_nonzero(thresh.reshape(len(valid), -1), axis=1)
+        ratios = movement_pixels / float(height * width) * 100
+        state.movement_stats.push_many(ratios)
+
+        for i, movement_ratio in zip(valid, ratios.tolist()):
+            # Eşik değeri: Eğer ekrandaki piksellerin %1'inden fazlası değişiyorsa hareket var demektir
+            if movement_ratio > 1.0:
+                frame_metrics[i]['movement_detected'] = True
+                state.metrics['high_movement_frames'] += 1
+
+            # Kare üzerine çizim yapılmaz (headless); etiket isteğe bağlı overlay aşamasında basılır
+            frame_metrics[i]['movement_ratio'] = movement_ratio
+
+        return frame_metrics
+
+    def prime(self, frame: Union[np.ndarray, FrameContext], state: PoseState = None):
+        """Segment başında önceki kareyi referans olarak yükler (skor üretmeden)."""
+        (state or self.state).prev_frame_gray = self._gray(FrameContext.wrap(frame))
+
+    def get_state(self, state: PoseState = None) -> Dict:
+        """Segment bazlı paralel analizde süreçler arası taşınacak durum."""
+        state = state or self.state
+        return {
+            'movement_stats': state.movement_stats,
+            'high_movement_frames': state.metrics['high_movement_frames']
+        }
+
+    def merge_state(self, segment_state: Dict, state: PoseState = None):
+        """Başka bir segmentin hareket istatistiklerini verilen oturum durumuna ekler."""
+        state = state or self.state
+        state.movement_stats.merge(segment_state['movement_stats'])
+        state.metrics['high_movement_frames'] += segment_state['high_movement_frames']
+
+    def summarize_timeline(self, rows: np.ndarray) -> Dict:
+        """Kaydedilmiş kare dizisinin hareket oranlarından özet üretir (videoyu yeniden çözmeden)."""
+        moves = rows["move"][~np.isnan(rows["move"])].astype(np.float64)
+        return self.get_summary(avg_move=float(moves.mean()) if len(moves) else 0.0)
+
+    def get_summary(self, state: PoseState = None, avg_move: float = None) -> Dict:
+        if avg_move is None:
+            avg_move = (state or self.state).movement_stats.mean
+
+        # --- PUANLAMA MANTIĞI (eşikler: scoring.DEFAULT_SCORING["body"]) ---
+        # İdeal hareket oranı %0.2 ile %3.0 arasıdır (Jest ve mimikler).
         # 0'a yakınsa: Robot gibi duruyor (Kötü)
-        # 5'ten büyükse: Çok sallanıyor (Kötü)
-        
-        score = 0
-        
-        if avg_move < 0.2:
-            # Çok hareketsiz (Robot) -> Puan düşük
-            score = 60
+        # Bandın üstündeyse: Çok sallanıyor (Kötü)
+        engine = get_scoring_engine()
+        bands = engine.config["body"]
+        score = float(engine.body_scores(avg_move))
+
+        if avg_move < bands["still_below"]:
             interpretation = "Çok Hareketsiz"
-        elif 0.2 <= avg_move <= 3.0:
-            # İdeal bölge
-            score = 90 + (10 * (1 - abs(1.5 - avg_move)/1.5)) # 90-100 arası
+        elif avg_move <= bands["ideal_max"]:
             interpretation = "İdeal Hareketlilik"
         else:
-            # Çok hareketli
-            diff = avg_move - 3.0
-            score = max(0, 90 - (diff * 10))
             interpretation = "Aşırı Hareketli"
 
-        score = round(min(100, max(0, score)), 1)
-
         recs = []
-        if score < 70:
-            if avg_move < 0.2:
+        if score < bands["weak_below"]:
+            if avg_move < bands["still_below"]:
                 recs.append("🔴 Çok donuk duruyorsunuz. Ellerinizi ve vücut dilinizi kullanarak anlatımı güçlendirin.")
             else:
                 recs.append("🔴 Çok fazla sallanıyorsunuz. Ayaklarınızı yere sağlam basmaya çalışın.")
-        elif score < 90:
+        elif score < bands["good_from"]:
             recs.append("🟢 Beden diliniz iyi, ancak biraz daha doğal olabilirsiniz.")
         else:
             recs.append("🟢 Harika sahne hakimiyeti! Hareketleriniz dengeli.")
@@ -89,15 +179,27 @@ class PoseDetector:
         return {
             'overall_body_language_score': score,
             'avg_movement_ratio': round(avg_move, 2),
+            # Yeniden puanlama için yuvarlanmamış ortalama
+            'movement_mean': float(avg_move),
             'interpretation': interpretation,
             'recommendations': recs
         }
 
-    def analyze_video(self, video_path):
+    def analyze_video(self, video_path, sampler: FrameSampler = None, batch_size: int = 8):
+        if sampler:
+            sampler.reset()
+            if sampler.mode == "adaptive":
+                batch_size = 1
         cap = cv2.VideoCapture(video_path)
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret: break
-            self.analyze_frame(frame)
+        batch = []
+        for ctx in iter_sampled_frames(cap, sampler):
+            batch.append(ctx)
+            if len(batch) >= batch_size:
+                for c, frame_metrics in zip(batch, self.analyze_batch(batch)):
+                    if sampler:
+                        sampler.observe(c.index, frame_metrics)
+                batch = []
+        if batch:
+            self.analyze_batch(batch)
         cap.release()
         return self.get_summary()
\ No newline at end of file
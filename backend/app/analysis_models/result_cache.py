@@ -0,0 +1,178 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Optional
+
+# Analiz sonucunu etkileyen modüller; kaynak kodları değişince önbellekteki sonuçlar kendiliğinden geçersiz olur
+_RESULT_MODULES = ["combined_analyzer", "eye_tracker", "pose_detector", "speech_analyzer", "prosody_engine",
+                   "transcription", "filler_engine", "frame_sampler", "frame_context", "scoring"]
+
+_code_fingerprint = None
+
+
+def code_fingerprint() -> str:
+    """Analiz modüllerinin kaynak kodunun SHA-256 özeti (süreç başına bir kez hesaplanır)."""
+    global _code_fingerprint
+    if _code_fingerprint is None:
+        digest = hashlib.sha256()
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in _RESULT_MODULES:
+            with open(os.path.join(package_dir, f"{name}.py"), "rb") as f:
+                digest.update(f.read())
+        _code_fingerprint = digest.hexdigest()[:16]
+    return _code_fingerprint
+
+
+class ResultCache:
+    """
+    İçerik adresli analiz sonucu önbelleği: anahtar (dosya SHA-256, analizör yapılandırması, kod özeti).
+    Aynı dosya tekrar yüklendiğinde çözme + Haar + librosa + ASR adımları atlanır.
+    Girdiler diskte JSON (+ zaman çizelgesi) olarak tutulur; sınır aşılınca en uzun süre
+    kullanılmayanlar silinir (LRU, dosya değiştirilme zamanına göre).
+    Klasör birden çok süreç tarafından paylaşılabilir: yazımlar benzersiz geçici dosya üzerinden yapılır,
+    başka sürecin sildiği girdi hata sayılmaz.
+    """
+
+    # Temizlik, girdi sayısı ve boyut bu orana inene kadar siler; sınırın hemen altında her yazımda taranmaz
+    EVICT_TO = 0.9
+
+    def __init__(self, cache_dir: str, max_entries: int = 1000, max_bytes: int = 512 * 1024 ** 2):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Bu sürecin bildiği girdi sayısı ve toplam boyut (ilk yazımda taranır)
+        self._count = None
+        self._total = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(content_hash: str, config: Dict) -> str:
+        config = dict(config, code=code_fingerprint())
+        payload = json.dumps({"content": content_hash, "config": config}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".timeline.npy"
+
+    def get(self, key: str, timeline_path: str = None) -> Optional[Dict]:
+        """Önbellekteki sonucu döner; zaman çizelgesi istenen yola kopyalanır. Yoksa None."""
+        if not self.enabled:
+            return None
+        result_path, cached_timeline = self._paths(key)
+        with self._lock:
+            try:
+                with open(result_path) as f:
+                    results = json.load(f)
+                if timeline_path and os.path.exists(cached_timeline):
+                    os.makedirs(os.path.dirname(timeline_path) or ".", exist_ok=True)
+                    shutil.copyfile(cached_timeline, timeline_path)
+                # LRU: son kullanım zamanı güncellenir
+                os.utime(result_path)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return results
+
+    def _write_atomic(self, path: str, write) -> int:
+        """
+        Yarım yazılmış dosya okunmasın diye benzersiz geçici ada yazılıp taşınır (aynı anahtarı yazan
+        başka süreç geçici dosyayı ezemez). Yazılan boyutu döner.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return size
+
+    def put(self, key: str, results: Dict, timeline_path: str = None):
+        if not self.enabled:
+            return
+        result_path, cached_timeline = self._paths(key)
+        size = 0
+        if timeline_path and os.path.exists(timeline_path):
+            with open(timeline_path, "rb") as source:
+                size += self._write_atomic(cached_timeline, lambda f: shutil.copyfileobj(source, f))
+        payload = json.dumps(results, ensure_ascii=False).encode("utf-8")
+        size += self._write_atomic(result_path, lambda f: f.write(payload))
+
+        with self._lock:
+            if self._count is None:
+                self._count, self._total = self._scan()[1:]
+            else:
+                self._count += 1
+                self._total += size
+            if self._count > self.max_entries or self._total > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """Klasördeki girdiler ((son kullanım, boyut, sonuç yolu, zaman çizelgesi yolu) listesi), sayı ve boyut."""
+        entries = []
+        total = 0
+        for result_path in glob.glob(os.path.join(self.cache_dir, "*.json")):
+            timeline = result_path[:-len(".json")] + ".timeline.npy"
+            try:
+                size = os.path.getsize(result_path) + (os.path.getsize(timeline) if os.path.exists(timeline) else 0)
+                entries.append((os.path.getmtime(result_path), size, result_path, timeline))
+            except OSError:
+                # Tarama sırasında başka süreç silmiş olabilir
+                continue
+            total += size
+        return entries, len(entries), total
+
+    def _evict(self):
+        """Kilit tutulurken: girdi sayısını ve toplam boyutu sınırların EVICT_TO oranının altına indirir."""
+        entries, count, total = self._scan()
+        entries.sort()
+        while entries and (count > self.max_entries * self.EVICT_TO or total > self.max_bytes * self.EVICT_TO):
+            _, size, result_path, timeline = entries.pop(0)
+            for path in (result_path, timeline):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            count -= 1
+            total -= size
+        self._count, self._total = count, total
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(glob.glob(os.path.join(self.cache_dir, "*.json")))}
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """
+    .env: RESULT_CACHE_DIR, RESULT_CACHE_MAX_ENTRIES (0 = kapalı), RESULT_CACHE_MAX_MB
+    """
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            # Varsayılan klasör /uploads statik sunumunun dışında: sonuçlar transkript içerir
+            _result_cache = ResultCache(
+                os.getenv("RESULT_CACHE_DIR", "cache/results"),
+                max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000")),
+                max_bytes=int(float(os.getenv("RESULT_CACHE_MAX_MB", "512")) * 1024 ** 2)
+            )
+        return _result_cache
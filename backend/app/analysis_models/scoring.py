@@ -0,0 +1,141 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+# Tüm puanlama eşikleri ve ağırlıkları tek yerde. .env: SCORING_CONFIG=<json dosyası> ile
+# kısmen ezilebilir (Örn: {"overall": {"weights": {"eye": 2}}}); eksik anahtarlar varsayılanı kullanır.
+DEFAULT_SCORING = {
+    "eye": {
+        # Öneri metni bantları (skoru etkilemez)
+        "weak_below": 50,
+        "good_from": 80
+    },
+    "body": {
+        # Ortalama hareket oranı (%) bantları
+        "still_below": 0.2,       # altı: çok hareketsiz
+        "ideal_max": 3.0,         # üstü: aşırı hareketli
+        "ideal_center": 1.5,      # ideal bandın tepe noktası
+        "still_score": 60,
+        "ideal_base": 90,         # ideal bantta 90-100 arası
+        "ideal_bonus": 10,
+        "excess_penalty": 10,     # ideal_max üstündeki her %1 hareket için düşülen puan
+        # Öneri metni bantları
+        "weak_below": 70,
+        "good_from": 90
+    },
+    "voice": {
+        # Tipik aralıklar: energy_std ≈ 0.02 – 0.10, pitch_std ≈ 10 – 60 Hz
+        "energy_norm": 0.08,
+        "pitch_norm": 40
+    },
+    "overall": {
+        # Ağırlıklı ortalama; ses skoru yalnızca ölçülebildiyse (> 0) dahil edilir
+        "weights": {"eye": 1, "body": 1, "voice": 1}
+    }
+}
+
+# analysis_json içinde saklanan ham özellikler (yeniden puanlama bunlardan yapılır)
+FEATURE_KEYS = ["total_frames", "face_detected_frames", "eye_contact_frames", "movement_mean",
+                "energy_std", "pitch_std", "duration", "word_count", "filler_count", "wpm"]
+
+
+def _merge(base: Dict, override: Dict) -> Dict:
+    merged = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class ScoringEngine:
+    """
+    Ham özelliklerden alt skorları ve genel skoru hesaplar. Tüm hesaplar NumPy dizileri üzerinde
+    vektöreldir: analiz sırasında tek kayıt (1 elemanlı dizi), toplu yeniden puanlamada binlerce kayıt
+    aynı kodla puanlanır; böylece canlı puan ile yeniden hesaplanan puan birebir aynı olur.
+    """
+
+    def __init__(self, config: Dict = None):
+        self.config = _merge(DEFAULT_SCORING, config)
+
+    @property
+    def fingerprint(self) -> str:
+        """Yapılandırmanın kısa özeti (önbellek anahtarı ve analysis_json'da sürüm olarak)."""
+        payload = json.dumps(self.config, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+    def eye_scores(self, face_frames, eye_frames) -> np.ndarray:
+        face = np.asarray(face_frames, dtype=np.float64)
+        eye = np.asarray(eye_frames, dtype=np.float64)
+        # Sadece yüzün göründüğü anları baz alarak puanla; yüz hiç yoksa 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.round(np.where(face > 0, eye / face * 100, 0.0), 1)
+
+    def body_scores(self, movement_mean) -> np.ndarray:
+        c = self.config["body"]
+        move = np.asarray(movement_mean, dtype=np.float64)
+        score = np.select(
+            [move < c["still_below"], move <= c["ideal_max"]],
+            [c["still_score"],
+             c["ideal_base"] + c["ideal_bonus"] * (1 - np.abs(c["ideal_center"] - move) / c["ideal_center"])],
+            np.maximum(0, c["ideal_base"] - (move - c["ideal_max"]) * c["excess_penalty"])
+        )
+        return np.round(np.clip(score, 0, 100), 1)
+
+    def voice_scores(self, energy_std, pitch_std) -> np.ndarray:
+        """Canlılık skoru (0–100, yüksek = daha canlı; alanda 'monotony_score' olarak saklanır)."""
+        c = self.config["voice"]
+        energy_score = np.clip((np.asarray(energy_std, dtype=np.float64) / c["energy_norm"]) * 50, 0, 50)
+        pitch_score = np.clip((np.asarray(pitch_std, dtype=np.float64) / c["pitch_norm"]) * 50, 0, 50)
+        return 100 - (energy_score + pitch_score)
+
+    def overall_scores(self, eye, body, voice) -> np.ndarray:
+        w = self.config["overall"]["weights"]
+        eye, body, voice = (np.asarray(v, dtype=np.float64) for v in (eye, body, voice))
+        voice_weight = np.where(voice > 0, w["voice"], 0)
+        total = w["eye"] * eye + w["body"] * body + voice_weight * voice
+        return np.round(total / (w["eye"] + w["body"] + voice_weight), 1)
+
+    def rescore(self, features: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        features: FEATURE_KEYS -> eşit uzunlukta diziler. Ses ölçülemeyen kayıtlarda energy_std/pitch_std NaN
+        olmalıdır (ses skoru 0 sayılır). Dönen: eye_score, body_score, monotony_score, overall_score dizileri.
+        """
+        eye = self.eye_scores(features["face_detected_frames"], features["eye_contact_frames"])
+        body = self.body_scores(features["movement_mean"])
+        energy = np.asarray(features["energy_std"], dtype=np.float64)
+        pitch = np.asarray(features["pitch_std"], dtype=np.float64)
+        measured = ~(np.isnan(energy) | np.isnan(pitch))
+        voice = np.where(measured, np.round(self.voice_scores(np.nan_to_num(energy), np.nan_to_num(pitch)), 1), 0.0)
+        return {
+            "eye_score": eye,
+            "body_score": body,
+            "monotony_score": voice,
+            "overall_score": self.overall_scores(eye, body, voice)
+        }
+
+
+_scoring_engine = None
+_scoring_engine_lock = threading.Lock()
+
+
+def load_scoring_config(path: Optional[str]) -> Dict:
+    if not path:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def get_scoring_engine() -> ScoringEngine:
+    """Süreç genelindeki puanlama motoru (.env: SCORING_CONFIG)."""
+    global _scoring_engine
+    with _scoring_engine_lock:
+        if _scoring_engine is None:
+            _scoring_engine = ScoringEngine(load_scoring_config(os.getenv("SCORING_CONFIG")))
+        return _scoring_engine
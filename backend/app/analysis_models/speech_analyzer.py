@@ -1,12 +1,29 @@
-import speech_recognition as sr
-import librosa
-import numpy as np
-import re
+from typing import Union
+from app.utils.audio_buffer import AudioBuffer
+from app.analysis_models.prosody_engine import ProsodyEngine
+from app.analysis_models.transcription import ChunkedTranscriber
+from app.analysis_models.filler_engine import FillerEngine
+from app.analysis_models.scoring import get_scoring_engine
 
 
 class SpeechAnalyzer:
-    def analyze_audio(self, audio_path):
-        result = {
+    # Google tanıma servisi için yeterli hız; daha yüksek hızlı kayıtlar gönderilmeden önce indirgenir
+    TRANSCRIBE_RATE = 16000
+
+    def __init__(self, transcriber: ChunkedTranscriber = None, language: str = "tr-TR"):
+        # Servis .env: TRANSCRIPTION_BACKEND ile seçilir (google | offline)
+        self.transcriber = transcriber or ChunkedTranscriber()
+        self.language = language
+        self.filler_engine = FillerEngine(language)
+
+    @staticmethod
+    def monotony_score(energy_std: float, pitch_std: float) -> float:
+        # Normalizasyon eşikleri scoring.DEFAULT_SCORING["voice"] içinde
+        return float(get_scoring_engine().voice_scores(energy_std, pitch_std))
+
+    @staticmethod
+    def empty_result():
+        return {
             "transcript": "",
             "speaking_rate": {"words_per_minute": 0},
             "filler_words": {"count": 0, "list": [], "ratio": 0.0},
@@ -17,89 +34,109 @@ class SpeechAnalyzer:
             }
         }
 
-        # -------------------------------------------------
-        # 1️⃣ TRANSKRİPT + KONUŞMA HIZI + DOLGU KELİMELER
-        # -------------------------------------------------
-        recognizer = sr.Recognizer()
-        recognizer.energy_threshold = 300
-        recognizer.dynamic_energy_threshold = True
+    def stage_params(self):
+        """Aşama önbelleği anahtarları: çıktıyı etkileyen sürüm ve ayarlar."""
+        return {
+            "transcript": {"version": ChunkedTranscriber.STAGE_VERSION, "backend": self.transcriber.backend.name,
+                           "language": self.language, "chunk_seconds": self.transcriber.max_chunk_seconds,
+                           "sample_rate": self.TRANSCRIBE_RATE},
+            "prosody": {"version": ProsodyEngine.STAGE_VERSION, "sample_rate": ProsodyEngine.SAMPLE_RATE}
+        }
 
+    def transcribe(self, audio: AudioBuffer):
+        """Aşama 1: Transkript (zaman damgalı parçalarla). Hata olursa None."""
         try:
-            with sr.AudioFile(audio_path) as source:
-                recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio_data = recognizer.record(source)
-
-                try:
-                    text = recognizer.recognize_google(audio_data, language="tr-TR")
-                except (sr.UnknownValueError, sr.RequestError):
-                    text = ""
-
-                result["transcript"] = text
-                words = text.lower().split()
-                word_count = len(words)
-
-                # Süre
-                duration_sec = librosa.get_duration(path=audio_path)
-                if duration_sec > 0:
-                    wpm = (word_count / duration_sec) * 60
-                    result["speaking_rate"]["words_per_minute"] = int(wpm)
-
-                # Dolgu kelimeler
-                fillers_regex = [
-                    r"\bı+ı+\b", r"\be+e+\b", r"\bhı+m\b", r"\bhmm+\b",
-                    r"\bşey\b", r"\byani\b", r"\bhani\b",
-                    r"\bfalan\b", r"\bfilan\b", r"\bacaba\b", r"\bişte\b"
-                ]
-
-                found = []
-                for f in fillers_regex:
-                    found.extend(re.findall(f, text.lower()))
-
-                result["filler_words"]["count"] = len(found)
-                result["filler_words"]["list"] = list(set(found))
-
-                if word_count > 0:
-                    result["filler_words"]["ratio"] = round(
-                        (len(found) / word_count) * 100, 1
-                    )
-
+            # Uzun kayıtlar sessizlik noktalarından parçalanıp eşzamanlı çevrilir
+            transcription = self.transcriber.transcribe(audio.resampled(min(audio.sample_rate, self.TRANSCRIBE_RATE)),
+                                                        language=self.language)
+            if transcription["failed_chunks"]:
+                print(f"⚠️ {transcription['failed_chunks']}/{len(transcription['segments'])} parça çevrilemedi.")
+            return transcription
         except Exception as e:
             print(f"Transkript hatası: {e}")
+            return None
 
-        # -------------------------------------------------
-        # 2️⃣ SES SİNYALİ ANALİZİ (CANLILIK / MONOTONLUK)
-        # -------------------------------------------------
+    def measure_prosody(self, audio: AudioBuffer):
+        """Aşama 2: Enerji ve perde istatistikleri (+ kayıt süresi). Hata olursa None."""
         try:
-            y, sr_lib = librosa.load(audio_path, sr=None)
-
-            # --- Enerji (RMS) ---
-            rms = librosa.feature.rms(y=y)[0]
-            energy_std = float(np.std(rms))
+            # Enerji ve perde 16 kHz'de, bloklar halinde hesaplanır (bellek kayıt uzunluğundan bağımsız)
+            engine = ProsodyEngine()
+            engine.push_buffer(audio)
+            prosody = engine.finish()
+            prosody["energy_std"] = float(prosody["energy_std"])
+            prosody["pitch_std"] = float(prosody["pitch_std"])
+            prosody["duration"] = audio.duration
+            return prosody
+        except Exception as e:
+            print(f"Sinyal analiz hatası: {e}")
+            return None
+
+    def score(self, transcription, prosody, duration_sec: float):
+        """
+        Puanlama: konuşma hızı, dolgu kelimeler ve canlılık skoru aşama çıktılarından hesaplanır.
+        Ses yeniden çözülmediği için önbellekteki aşamalardan da çağrılabilir.
+        """
+        result = self.empty_result()
+        # Yeniden puanlama için ham özellikler (ses ölçülemediyse None)
+        features = result["features"] = {"energy_std": None, "pitch_std": None, "duration": duration_sec,
+                                          "word_count": 0, "filler_count": 0, "wpm": 0}
 
-            # --- Pitch (Gerçek F0 analizi) ---
-            f0 = librosa.yin(y, fmin=80, fmax=300, sr=sr_lib)
-            f0 = f0[np.isfinite(f0)]
+        # -------------------------------------------------
+        # 1️⃣ TRANSKRİPT + KONUŞMA HIZI + DOLGU KELİMELER
+        # -------------------------------------------------
+        if transcription is not None:
+            text = transcription["text"]
+            result["transcript_segments"] = transcription["segments"]
+            result["transcript"] = text
+            words = text.lower().split()
+            word_count = len(words)
+
+            # Süre (tampondan; dosya tekrar açılmaz)
+            if duration_sec > 0:
+                wpm = (word_count / duration_sec) * 60
+                result["speaking_rate"]["words_per_minute"] = int(wpm)
+
+            # Dolgu kelimeler (tek geçiş; sayılar, zaman damgaları ve dakikalık yoğunluk)
+            result["filler_words"] = self.filler_engine.analyze(transcription["segments"], duration_sec)
+            features.update(word_count=word_count, filler_count=result["filler_words"]["count"],
+                            wpm=result["speaking_rate"]["words_per_minute"])
 
-            pitch_std = float(np.std(f0)) if len(f0) > 0 else 0.0
+        # -------------------------------------------------
+        # 2️⃣ SES SİNYALİ ANALİZİ (CANLILIK / MONOTONLUK)
+        # -------------------------------------------------
+        if prosody is not None:
+            energy_std = prosody["energy_std"]
+            pitch_std = prosody["pitch_std"]
 
             # -------------------------------------------------
             # 3️⃣ NORMALİZE EDİLMİŞ CANLILIK SKORU (0–100)
             # -------------------------------------------------
-            # Tipik aralıklar:
-            # energy_std ≈ 0.02 – 0.10
-            # pitch_std  ≈ 10 – 60 Hz
-
-            energy_score = np.clip((energy_std / 0.08) * 50, 0, 50)
-            pitch_score = np.clip((pitch_std / 40) * 50, 0, 50)
-
-            liveliness_score = energy_score + pitch_score
-            final_monotony = 100 - liveliness_score
+            final_monotony = self.monotony_score(energy_std, pitch_std)
 
             result["audio_features"]["monotony_score"] = round(final_monotony, 1)
             result["audio_features"]["energy_variation"] = round(energy_std, 4)
             result["audio_features"]["pitch_variation"] = round(pitch_std, 2)
-
-        except Exception as e:
-            print(f"Sinyal analiz hatası: {e}")
+            result["audio_features"]["pitch_hz"] = {k: round(prosody["pitch"][k], 1) for k in ("mean", "p50", "p90")}
+            features.update(energy_std=energy_std, pitch_std=pitch_std)
 
         return result
+
+    def analyze_audio(self, audio: Union[str, AudioBuffer]):
+        """
+        Ses bir kez çözülür (dosya yolu verilirse) ve tüm aşamalar aynı bellek içi tampondan beslenir.
+        """
+        audio = self.load(audio)
+        if audio is None:
+            return self.empty_result()
+        return self.score(self.transcribe(audio), self.measure_prosody(audio), audio.duration)
+
+    @staticmethod
+    def load(audio: Union[str, AudioBuffer]):
+        """Dosya yolunu belleğe çözer (tampon verilirse aynen döner); okunamazsa None."""
+        try:
+            if not isinstance(audio, AudioBuffer):
+                audio = AudioBuffer.from_file(audio)
+            return audio
+        except Exception as e:
+            print(f"Ses okuma hatası: {e}")
+            return None
@@ -0,0 +1,188 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+import speech_recognition as sr
+
+from app.utils.audio_buffer import AudioBuffer
+
+
+class TranscriptionError(Exception):
+    """Servise ulaşılamadı / istek başarısız (konuşma bulunamaması hata değildir, "" döner)."""
+
+
+class TranscriptionBackend:
+    """Konuşmayı metne çeviren servis arayüzü. transcribe() tek bir parçayı işler."""
+
+    name = "base"
+
+    def transcribe(self, audio: AudioBuffer, language: str, offset: float = 0.0) -> str:
+        raise NotImplementedError
+
+
+def calibrate_energy_threshold(recognizer: sr.Recognizer, audio: AudioBuffer, duration: float = 0.5,
+                               chunk: int = 4096) -> float:
+    """
+    Recognizer.adjust_for_ambient_noise'un bellekteki tampon için karşılığı: parçanın ilk `duration`
+    saniyesindeki 16-bit blokların RMS enerjisiyle energy_threshold aynı sönümlü ortalamayla güncellenir.
+    Eski akış (sr.AudioFile + adjust_for_ambient_noise) dosyadan okuyarak aynı eşiği üretirdi; farkı,
+    kalibrasyon penceresinin artık tüketilmemesi, yani parçanın başındaki konuşmanın da servise gitmesidir.
+    """
+    pcm = (np.clip(audio.samples, -1.0, 1.0) * 32767).astype(np.int16)
+    seconds_per_buffer = chunk / audio.sample_rate
+    elapsed = 0.0
+    for start in range(0, len(pcm), chunk):
+        elapsed += seconds_per_buffer
+        if elapsed > duration:
+            break
+        # audioop.rms ile aynı: tam sayıya kırpılmış karekök ortalama
+        energy = int(np.sqrt(np.mean(pcm[start:start + chunk].astype(np.float64) ** 2)))
+        damping = recognizer.dynamic_energy_adjustment_damping ** seconds_per_buffer
+        target = energy * recognizer.dynamic_energy_ratio
+        recognizer.energy_threshold = recognizer.energy_threshold * damping + target * (1 - damping)
+    return recognizer.energy_threshold
+
+
+class GoogleTranscriber(TranscriptionBackend):
+    """speech_recognition üzerinden Google Web Speech API."""
+
+    name = "google"
+
+    # Gürültü kalibrasyonu için parçanın başından kullanılan süre (eski adjust_for_ambient_noise(duration=0.5))
+    CALIBRATION_SECONDS = 0.5
+
+    def __init__(self, timeout: float = None):
+        # .env: TRANSCRIPTION_TIMEOUT_SECONDS (tek istek için üst sınır; yanıt vermeyen istek parçayı kilitlemesin)
+        self.timeout = timeout or float(os.getenv("TRANSCRIPTION_TIMEOUT_SECONDS", "30"))
+
+    def transcribe(self, audio: AudioBuffer, language: str, offset: float = 0.0) -> str:
+        recognizer = sr.Recognizer()
+        recognizer.operation_timeout = self.timeout
+        calibrate_energy_threshold(recognizer, audio, self.CALIBRATION_SECONDS)
+        try:
+            return recognizer.recognize_google(audio.to_audio_data(), language=language)
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            raise TranscriptionError(str(e))
+        except OSError as e:
+            # Zaman aşımı (socket.timeout) ve bağlantı kopması RequestError'a sarılmadan gelebilir
+            raise TranscriptionError(f"{type(e).__name__}: {e}")
+
+
+class OfflineTranscriber(TranscriptionBackend):
+    """
+    Ağ gerektirmeyen yerel yedek (geliştirme ve testler için).
+    Konuşma tanımaz; parçanın süresine göre sabit bir metinden sırayla kelime üretir.
+    Kelime sırası parçanın zamanından hesaplandığı için sonuç paralel çalışmada da aynıdır.
+    """
+
+    name = "offline"
+
+    DEFAULT_SCRIPT = ("merhaba bugün size projemizi anlatacağım şey yani bu çalışmada "
+                      "kullanıcıların sunum becerilerini ölçüyoruz hani ilk bölümde sorunu sonra çözümü işte "
+                      "son olarak sonuçları paylaşacağım")
+
+    def __init__(self, script: str = None, words_per_second: float = 2.0):
+        self.words = (script or self.DEFAULT_SCRIPT).split()
+        self.words_per_second = words_per_second
+
+    def transcribe(self, audio: AudioBuffer, language: str, offset: float = 0.0) -> str:
+        first = int(round(offset * self.words_per_second))
+        last = int(round((offset + audio.duration) * self.words_per_second))
+        return " ".join(self.words[i % len(self.words)] for i in range(first, last))
+
+
+TRANSCRIPTION_BACKENDS = {
+    GoogleTranscriber.name: GoogleTranscriber,
+    OfflineTranscriber.name: OfflineTranscriber,
+}
+
+
+def get_transcription_backend(name: str = None) -> TranscriptionBackend:
+    """.env: TRANSCRIPTION_BACKEND=google (varsayılan) | offline"""
+    name = name or os.getenv("TRANSCRIPTION_BACKEND", "google")
+    if name not in TRANSCRIPTION_BACKENDS:
+        raise ValueError(f"Bilinmeyen transkripsiyon servisi: {name}")
+    return TRANSCRIPTION_BACKENDS[name]()
+
+
+def split_on_silence(audio: AudioBuffer, max_chunk_seconds: float = 30.0,
+                     min_chunk_seconds: float = 5.0, frame_seconds: float = 0.02) -> List[Tuple[int, int]]:
+    """
+    Sesi en fazla max_chunk_seconds uzunluğunda parçalara böler. Kesim noktası,
+    [min, max] aralığındaki en sessiz (en düşük RMS) pencereye konur; böylece kelimeler ortadan bölünmez.
+    Dönen değer örnek indeksleri olarak (başlangıç, bitiş) listesidir.
+    """
+    total = len(audio.samples)
+    max_len = int(max_chunk_seconds * audio.sample_rate)
+    if total <= max_len:
+        return [(0, total)] if total else []
+
+    # Örtüşmeyen pencerelerde RMS (einsum ara kopya oluşturmaz; uzun kayıtlarda bellek sabit kalır)
+    hop = max(1, int(frame_seconds * audio.sample_rate))
+    frames = audio.samples[:total // hop * hop].reshape(-1, hop)
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / hop)
+    min_len = int(min_chunk_seconds * audio.sample_rate)
+
+    chunks = []
+    start = 0
+    while total - start > max_len:
+        lo = (start + min_len) // hop
+        hi = min(len(rms), (start + max_len) // hop)
+        cut = (lo + int(np.argmin(rms[lo:hi]))) * hop + hop if hi > lo else start + max_len
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, total))
+    return chunks
+
+
+class ChunkedTranscriber:
+    """
+    Uzun kayıtları sessizlik noktalarından parçalara bölüp sınırlı sayıda eşzamanlı istekle çevirir.
+    Her parça zaman damgasıyla döner; yavaş veya başarısız bir parça tüm transkripti kaybettirmez.
+    """
+
+    # Parçalama / birleştirme çıktısını değiştiren bir değişiklikte artırılır (aşama önbelleği)
+    STAGE_VERSION = 1
+
+    def __init__(self, backend: TranscriptionBackend = None, max_workers: int = None,
+                 max_chunk_seconds: float = None, retries: int = 1):
+        self.backend = backend or get_transcription_backend()
+        # .env: TRANSCRIPTION_WORKERS (eşzamanlı istek sınırı), TRANSCRIPTION_CHUNK_SECONDS
+        self.max_workers = max_workers or int(os.getenv("TRANSCRIPTION_WORKERS", "4"))
+        self.max_chunk_seconds = max_chunk_seconds or float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", "30"))
+        self.retries = retries
+
+    def _transcribe_chunk(self, audio: AudioBuffer, start: int, end: int, language: str) -> Dict:
+        offset = start / audio.sample_rate
+        chunk = AudioBuffer(audio.samples[start:end], audio.sample_rate)
+        segment = {"start": round(offset, 2), "end": round(end / audio.sample_rate, 2), "text": ""}
+
+        for attempt in range(self.retries + 1):
+            try:
+                segment["text"] = self.backend.transcribe(chunk, language, offset)
+                segment["status"] = "ok" if segment["text"] else "empty"
+                return segment
+            except TranscriptionError as e:
+                error = e
+            except Exception as e:
+                # Beklenmeyen hata yeniden denemeyle düzelmez; yalnızca bu parça boş kalır
+                error = f"{type(e).__name__}: {e}"
+                break
+        print(f"⚠️ Transkripsiyon parçası başarısız ({segment['start']}-{segment['end']} sn): {error}")
+        segment["status"] = "failed"
+        return segment
+
+    def transcribe(self, audio: AudioBuffer, language: str = "tr-TR") -> Dict:
+        chunks = split_on_silence(audio, self.max_chunk_seconds)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(chunks) or 1))) as executor:
+            segments = list(executor.map(lambda c: self._transcribe_chunk(audio, c[0], c[1], language), chunks))
+
+        return {
+            "text": " ".join(s["text"] for s in segments if s["text"]),
+            "segments": segments,
+            "backend": self.backend.name,
+            "failed_chunks": sum(1 for s in segments if s["status"] == "failed")
+        }
@@ -5,7 +5,8 @@ import os
 
 # Veritabanı ve Modeller
 from app import models, database
-from app.routers import auth, analysis, dashboard, chat, projects
+from app.routers import auth, analysis, dashboard, chat, projects, live
+from app.analysis_models.analyzer_pool import get_analyzer_pool
 
 # Tabloları oluştur (yoksa)
 models.Base.metadata.create_all(bind=database.engine)
@@ -25,6 +26,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Tarayıcının okuyabilmesi için: yoğunlukta bekleme süresi ve parçalı yükleme konumu
+    expose_headers=["Retry-After", "Upload-Offset", "Upload-Length"],
 )
 
 # Klasörleri Oluştur
@@ -40,6 +43,12 @@ app.include_router(analysis.router)
 app.include_router(dashboard.router)
 app.include_router(chat.router)
 app.include_router(projects.router)
+app.include_router(live.router)
+
+@app.on_event("startup")
+def warm_analyzers():
+    # İlk yüklemeler model yükleme maliyetini ödemesin diye analizör havuzu açılışta doldurulur
+    get_analyzer_pool().warm_up()
 
 @app.get("/")
 def read_root():
@@ -1,13 +1,25 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
 from sqlalchemy.orm import Session
 from app import database, models, schemas, oauth2
-from app.utils.video_processor import VideoProcessor
-from app.analysis_models.combined_analyzer import CombinedAnalyzer
-import shutil
+from app.utils.video_processor import (PROXY_KEEP_ORIGINAL, VideoProcessor, needs_proxy, probe_video,
+                                       proxy_path_for, proxy_spec)
+from app.utils.overlay_renderer import render_annotated_video
+from app.utils.timeline_store import TimelineStore, legacy_timeline_path_for, timeline_path_for
+from app.utils.upload_store import UploadError, WRITE_BUFFER_BYTES, get_upload_store
+from app.analysis_models.analyzer_pool import get_analyzer_pool
+from app.analysis_models.job_manager import AdmissionError, estimate_cost, estimate_memory_mb, get_job_manager
+from app.analysis_models.result_cache import ResultCache, get_result_cache
+from app.analysis_models.scoring import get_scoring_engine
 import os
+import json
+import hashlib
+import shutil
 import google.generativeai as genai
 from dotenv import load_dotenv
 from typing import Optional, List
+from datetime import datetime
 
 load_dotenv()
 
@@ -31,49 +43,87 @@ def get_working_model():
         print(f"⚠️ Model seçimi hatası: {e}")
         return 'gemini-pro'
 
-@router.post("/upload", response_model=schemas.PresentationOut) 
-async def analyze_video(
-    file: UploadFile = File(...),
-    project_id: Optional[int] = None,
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(oauth2.get_current_user) 
-):
-    # 1. Klasör Hazırla ve Kaydet
-    UPLOAD_DIR = "uploads/videos"
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    file_path = f"{UPLOAD_DIR}/{file.filename}"
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    # 2. Analiz Süreçleri
-    processor = VideoProcessor(file_path)
-    audio_path = processor.extract_audio()
-    analyzer = CombinedAnalyzer()
-    results = analyzer.analyze_session(file_path, audio_path)
-    processor.cleanup()
+def filler_breakdown_json(filler_data):
+    return json.dumps(filler_data.get("counts", {}), ensure_ascii=False, separators=(",", ":"))
 
-    # 3. Metrikleri Topla
-    speech_data = results.get("speech_data", {})
-    transcript = speech_data.get("transcript", "")
-    wpm = speech_data.get("speaking_rate", {}).get("words_per_minute", 0)
+def build_analysis_json(speech_data, extra=None, features=None):
+    """
+    Presentation.analysis_json için sıkıştırılmış yapılandırılmış detaylar.
+    features: skorların medyaya dokunmadan yeniden hesaplanabilmesi için ham özellikler (bkz. rescore.py).
+    """
     filler_data = speech_data.get("filler_words", {})
-    filler_count = filler_data.get("count", 0)
-    filler_summary = ", ".join(filler_data.get("list", [])) if filler_data.get("list") else "Yok"
-    
-    monotony_score = speech_data.get("audio_features", {}).get("monotony_score", 0)
-    eye_contact = results.get("eye_score", 0)
-    body_language = results.get("body_score", 0)
-    overall_score = results.get("overall_score", 0)
+    details = {
+        "features": features or {},
+        "scoring": get_scoring_engine().fingerprint,
+        "filler_words": {
+            "counts": filler_data.get("counts", {}),
+            "occurrences": [[o["word"], o["t"]] for o in filler_data.get("occurrences", [])],
+            "density_per_minute": filler_data.get("density_per_minute", [])
+        },
+        "transcript_segments": [[seg["start"], seg["end"], seg["status"]]
+                                for seg in speech_data.get("transcript_segments", [])]
+    }
+    details.update(extra or {})
+    return json.dumps(details, ensure_ascii=False, separators=(",", ":"))
+
+def result_cache_key(content_hash):
+    cache = get_result_cache()
+    return ResultCache.make_key(content_hash, get_analyzer_pool().config()) if content_hash and cache.enabled else None
+
+def get_cached_result(content_hash, timeline_path, job=None):
+    """Aynı içerik + aynı analizör ayarlarıyla önceden üretilmiş sonuç (zaman çizelgesi timeline_path'e kopyalanır)."""
+    cache_key = result_cache_key(content_hash)
+    cached = get_result_cache().get(cache_key, timeline_path) if cache_key else None
+    if cached is not None:
+        print(f"♻️ Önbellekten sonuç: {content_hash[:12]}")
+        if job is not None:
+            job.stage = "cache_hit"
+            job.cache_hit = True
+        cached["cached"] = True
+    return cached
+
+def proxy_content_hash(content_hash):
+    # Vekilden üretilen sonuçlar orijinalinkinden farklıdır; önbellek anahtarına vekil ayarları katılır
+    return hashlib.sha256(f"{content_hash}:{proxy_spec()}".encode()).hexdigest()
 
-    # 🟢 4. HAFIZALI AI COACH MANTIĞI
+def run_analysis(file_path, audio, job=None, content_hash=None):
+    """
+    Havuzdan ısınmış bir analizör alıp oturumu çalıştırır (iş parçacığında çağrılır).
+    İçerik özeti verilirse aynı dosya + aynı analizör ayarlarıyla önceden üretilmiş sonuç önbellekten döner.
+    """
+    pool = get_analyzer_pool()
+    cache = get_result_cache()
+    timeline_path = timeline_path_for(file_path)
+    cache_key = result_cache_key(content_hash)
+
+    cached = get_cached_result(content_hash, timeline_path, job)
+    if cached is not None:
+        return cached
+
+    with pool.acquire() as analyzer:
+        session = analyzer.new_session()
+        if job is not None:
+            # Durum sorgusu işlenen kare sayısını bu oturumdan okur
+            job.session = session
+            job.stage = "analyzing"
+        results = analyzer.analyze_session(file_path, audio, timeline_path=timeline_path, session=session,
+                                           content_hash=content_hash)
+
+    # Geçici servis hatasıyla eksik kalan transkriptler önbelleğe alınmaz
+    failed = any(seg.get("status") == "failed" for seg in results["speech_data"].get("transcript_segments", []))
+    if cache_key and not failed:
+        cache.put(cache_key, results, timeline_path)
+    return results
+
+def generate_ai_feedback(db, user_id, overall_score, wpm, filler_count, eye_contact):
+    """🟢 HAFIZALI AI COACH MANTIĞI: geçmiş sunumlarla kıyaslamalı mentor yorumu."""
     ai_feedback = "Analiz tamamlandı."
     
     if GOOGLE_API_KEY:
         try:
             # Kullanıcının geçmiş sunumlarını çek (Hafıza oluşturma)
             past_sessions = db.query(models.Presentation)\
-                .filter(models.Presentation.user_id == current_user.id)\
+                .filter(models.Presentation.user_id == user_id)\
                 .order_by(models.Presentation.created_at.desc())\
                 .limit(3).all()
 
@@ -112,26 +162,369 @@ async def analyze_video(
             print(f"❌ AI Hatası: {e}")
             ai_feedback = "Sunumun kaydedildi, istatistiklerin yukarıdaki grafiklerde yer alıyor."
 
-    # 5. Veritabanına Kaydet
-    new_presentation = models.Presentation(
-        user_id=current_user.id,
-        project_id=project_id,
-        video_filename=file_path,
-        overall_score=overall_score,
-        wpm=wpm,
-        filler_count=filler_count,
-        filler_breakdown=filler_summary,
-        monotony_score=monotony_score,
-        eye_contact_score=eye_contact,
-        body_language_score=body_language,
-        ai_feedback=ai_feedback
-    )
-    
-    db.add(new_presentation)
-    db.commit()
-    db.refresh(new_presentation)
+    return ai_feedback
+
+def process_upload_job(job, file_path, user_id, project_id, annotate, media):
+    """
+    Kuyruktaki bir yüklemenin tüm işi (işçi iş parçacığında çalışır): vekil kopya, analiz, AI yorumu
+    ve Presentation kaydı. Dönen değer oluşturulan sunumun kimliğidir.
+    """
+    # 0. Vekil kopya: analiz ve oynatım düşük çözünürlüklü, sabit kare hızlı kopyadan yapılır
+    analysis_path = file_path
+    content_hash = job.content_hash
+    source = {"original": file_path, "original_size": os.path.getsize(file_path),
+              "width": media.get("width"), "height": media.get("height")}
+    results = None
+    defer_proxy = False
+    if needs_proxy(media):
+        # Aynı içerik daha önce vekilden analiz edildiyse sonuç kodlamadan önce önbellekten alınır;
+        # vekil yalnızca oynatım için gerektiğinden arka planda (en düşük öncelikte) üretilir
+        results = get_cached_result(proxy_content_hash(job.content_hash), timeline_path_for(file_path), job)
+        defer_proxy = results is not None
+        if results is None:
+            job.stage = "transcoding"
+            proxy_path = VideoProcessor(file_path).create_proxy(proxy_path_for(file_path))
+            if proxy_path:
+                analysis_path = proxy_path
+                media = probe_video(proxy_path)
+                content_hash = proxy_content_hash(job.content_hash)
+                source.update(proxy=proxy_spec(), proxy_size=os.path.getsize(proxy_path))
+    # Kare sayısı güvenilir değilse (vekilsiz tarayıcı webm kayıtları) ilerleme oranı verilmez
+    job.total_frames = media.get("frame_count")
+
+    # 1. Analiz Süreçleri
+    # Ses 16 kHz mono olarak doğrudan belleğe çözülür (ara .wav dosyası yazılmaz); çıkarma işlemi
+    # ses dalında, kare analiziyle aynı anda yapılır.
+    if results is None:
+        job.stage = "waiting_analyzer"
+        processor = VideoProcessor(analysis_path)
+        results = run_analysis(analysis_path, processor.extract_audio_samples, job, content_hash)
+
+    # 2. Metrikleri Topla
+    speech_data = results.get("speech_data", {})
+    wpm = speech_data.get("speaking_rate", {}).get("words_per_minute", 0)
+    filler_data = speech_data.get("filler_words", {})
+    filler_count = filler_data.get("count", 0)
     
-    return new_presentation
+    monotony_score = speech_data.get("audio_features", {}).get("monotony_score", 0)
+    eye_contact = results.get("eye_score", 0)
+    body_language = results.get("body_score", 0)
+    overall_score = results.get("overall_score", 0)
+
+    db = database.SessionLocal()
+    try:
+        job.stage = "feedback"
+        ai_feedback = generate_ai_feedback(db, user_id, overall_score, wpm, filler_count, eye_contact)
+
+        # 3. Veritabanına Kaydet
+        job.stage = "saving"
+        new_presentation = models.Presentation(
+            user_id=user_id,
+            project_id=project_id,
+            # Oynatım vekil kopyadan (varsa) yapılır; zaman çizelgesi de bu adın yanında tutulur
+            video_filename=analysis_path,
+            overall_score=overall_score,
+            wpm=wpm,
+            filler_count=filler_count,
+            # Kelime bazlı sayılar JSON olarak ({"şey": 3, "yani": 1}); konumlar ve yoğunluk analysis_json'da
+            filler_breakdown=filler_breakdown_json(filler_data),
+            analysis_json=build_analysis_json(speech_data, {"source": source}, features=results.get("features")),
+            monotony_score=monotony_score,
+            eye_contact_score=eye_contact,
+            body_language_score=body_language,
+            ai_feedback=ai_feedback
+        )
+        db.add(new_presentation)
+        db.commit()
+        db.refresh(new_presentation)
+        presentation_id = new_presentation.id
+    finally:
+        db.close()
+
+    # Arşiv için orijinal istenmiyorsa (PROXY_KEEP_ORIGINAL=0) yalnızca vekil kopya saklanır
+    if analysis_path != file_path and not PROXY_KEEP_ORIGINAL:
+        os.remove(file_path)
+    # 4. İsteğe bağlı: Koçluk oynatımı için işaretli önizleme videosu (iş bittikten sonra).
+    # Önbellekten gelen sonucun kutuları vekil karelerine göredir; çizim vekil bağlandıktan sonra yapılır.
+    if defer_proxy:
+        get_job_manager().defer(attach_proxy, presentation_id, file_path, annotate)
+    elif annotate:
+        get_job_manager().defer(annotate_presentation, presentation_id)
+
+    return presentation_id
+
+def update_analysis_details(presentation, **details):
+    """analysis_json'daki üst düzey alanları günceller (çağıran commit eder)."""
+    merged = json.loads(presentation.analysis_json or "{}")
+    merged.update(details)
+    presentation.analysis_json = json.dumps(merged, ensure_ascii=False, separators=(",", ":"))
+
+def annotate_presentation(presentation_id):
+    """
+    Sunumun videosu ve zaman çizelgesinden işaretli önizleme üretir (arka plan işi); yolu
+    analysis_json'da "annotated_video" olarak kaydedilir. Çizim sürerken veritabanı oturumu tutulmaz.
+    """
+    db = database.SessionLocal()
+    try:
+        presentation = db.query(models.Presentation).filter(models.Presentation.id == presentation_id).first()
+        video_path = presentation.video_filename if presentation else None
+    finally:
+        db.close()
+    if not video_path:
+        return
+
+    output_path = render_annotated_video(video_path, timeline_path_for(video_path))
+    if not output_path:
+        return
+    db = database.SessionLocal()
+    try:
+        presentation = db.query(models.Presentation).filter(models.Presentation.id == presentation_id).first()
+        if presentation is None:
+            # Çizim sürerken sunum silindi
+            os.remove(output_path)
+            return
+        update_analysis_details(presentation, annotated_video=output_path)
+        db.commit()
+    finally:
+        db.close()
+
+def attach_proxy(presentation_id, file_path, annotate=False):
+    """
+    Sonucu önbellekten gelen yüklemenin oynatım vekilini üretir ve sunuma bağlar (arka plan işi).
+    Zaman çizelgesi yeni video adına kopyalanır; sunum güncellendikten sonra eskisi silinir.
+    """
+    proxy_path = VideoProcessor(file_path).create_proxy(proxy_path_for(file_path))
+    if not proxy_path:
+        return
+    old_timeline, new_timeline = timeline_path_for(file_path), timeline_path_for(proxy_path)
+    if os.path.exists(old_timeline):
+        shutil.copyfile(old_timeline, new_timeline)
+
+    db = database.SessionLocal()
+    try:
+        presentation = db.query(models.Presentation).filter(models.Presentation.id == presentation_id).first()
+        if presentation is None:
+            # Vekil hazırlanırken sunum silindi
+            os.remove(proxy_path)
+            return
+        source = json.loads(presentation.analysis_json or "{}").get("source", {})
+        source.update(proxy=proxy_spec(), proxy_size=os.path.getsize(proxy_path))
+        update_analysis_details(presentation, source=source)
+        presentation.video_filename = proxy_path
+        db.commit()
+    finally:
+        db.close()
+
+    if os.path.exists(old_timeline):
+        os.remove(old_timeline)
+    if not PROXY_KEEP_ORIGINAL:
+        os.remove(file_path)
+    if annotate:
+        annotate_presentation(presentation_id)
+
+def enqueue_analysis(upload, user_id, project_id, annotate, deadline: Optional[datetime] = None):
+    """
+    Tamamlanmış yüklemeyi (depolama yolu + içerik özeti) analiz kuyruğuna alır (iş parçacığında çağrılır).
+    Kuyruk sırası için maliyet, konteyner başlığındaki süre ve çözünürlükten tahmin edilir.
+    """
+    media = probe_video(upload["file_path"])
+    return get_job_manager().submit(user_id, process_upload_job, upload["file_path"], user_id,
+                                    project_id, annotate, media, content_hash=upload["sha256"],
+                                    cost=estimate_cost(media, upload["size"]),
+                                    memory_mb=estimate_memory_mb(media, upload["size"]),
+                                    deadline=deadline.timestamp() if deadline else None)
+
+def admit_analysis(size_bytes: int):
+    """
+    Kabul denetimi: kuyruk doluysa veya tahmini bekleme sınırı aşılıyorsa, dosya diske yazılmadan ve
+    analiz başlatılmadan hızlıca 503 + Retry-After döner (yük herkesi yavaşlatmak yerine reddedilir).
+    """
+    try:
+        get_job_manager().admit(estimate_cost(None, size_bytes))
+    except AdmissionError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=e.detail,
+                            headers={"Retry-After": str(e.retry_after)})
+
+class AdmittedUploadRoute(APIRoute):
+    """
+    Tek istekte yükleme için kabul denetimini gövde okunmadan yapar. FastAPI form gövdesini bağımlılıklardan
+    önce geçici dosyaya yazdığı için denetim Content-Length başlığıyla rotanın kendisinde yapılır;
+    böylece yoğunlukta dosya sunucuya hiç aktarılmadan 503 döner. Başlık yoksa yalnızca kuyruk doluluğuna bakılır.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def admitted_handler(request: Request) -> Response:
+            length = request.headers.get("content-length", "")
+            admit_analysis(int(length) if length.isascii() and length.isdigit() else 0)
+            return await handler(request)
+
+        return admitted_handler
+
+def raise_upload_error(e: UploadError):
+    raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+def parse_size_header(value: Optional[str], name: str) -> Optional[int]:
+    """Boyut/konum başlığını negatif olmayan tam sayıya çevirir; başlık yoksa None, geçersizse 400."""
+    if value is None:
+        return None
+    value = value.strip()
+    if not (value.isascii() and value.isdigit()):
+        raise UploadError(400, f"Geçersiz {name} başlığı.")
+    return int(value)
+
+def copy_upload(file, session):
+    """Tek istekte gelen dosyayı yükleme oturumuna parça parça aktarır (iş parçacığında çağrılır)."""
+    offset = 0
+    for block in iter(lambda: file.file.read(WRITE_BUFFER_BYTES), b""):
+        offset = session.write(offset, block)
+    # Form verisinde boyut bildirilmediyse oturum, gelen toplam boyla kapatılır
+    session.meta["size"] = offset
+    return session.complete()
+
+async def analyze_video(
+    file: UploadFile = File(...),
+    project_id: Optional[int] = None,
+    annotate: bool = False,
+    deadline: Optional[datetime] = None,
+    current_user: models.User = Depends(oauth2.get_current_user) 
+):
+    """
+    Tek istekte yükleme (küçük dosyalar için). Dosya benzersiz bir adla kaydedilir ve analiz
+    kuyruğa alınır; iş kimliği hemen döner. Sonuç /analysis/jobs/{job_id} ile sorgulanır.
+    Büyük dosyalar için devam ettirilebilir /analysis/uploads protokolü kullanılmalıdır.
+    deadline: sonucun gerektiği zaman (Örn: sunum günü); yaklaştığında iş kuyrukta öne alınır.
+    Kabul denetimi gövde okunmadan AdmittedUploadRoute'ta yapılır.
+    """
+    store = get_upload_store()
+    try:
+        # Oturum açma (süresi dolanların temizliği dahil) ve disk yazımı olay döngüsünü bloklamasın
+        session = await run_in_threadpool(store.create, current_user.id, file.filename,
+                                          file.size or store.max_bytes, project_id)
+        upload = await run_in_threadpool(copy_upload, file, session)
+    except UploadError as e:
+        raise_upload_error(e)
+
+    job = await run_in_threadpool(enqueue_analysis, upload, current_user.id, project_id, annotate, deadline)
+    return job.to_dict()
+
+router.add_api_route("/upload", analyze_video, methods=["POST"], response_model=schemas.AnalysisJobOut,
+                     status_code=status.HTTP_202_ACCEPTED, route_class_override=AdmittedUploadRoute)
+
+# --- DEVAM ETTİRİLEBİLİR PARÇALI YÜKLEME ---
+# 1. POST   /analysis/uploads                 {filename, size, project_id} -> upload_id
+# 2. PATCH  /analysis/uploads/{id}            Upload-Offset başlığı + ham bayt gövdesi (istenen boyda parçalar)
+#    HEAD/GET /analysis/uploads/{id}          bağlantı koparsa sunucudaki offset'i öğrenip oradan devam et
+# 3. POST   /analysis/uploads/{id}/complete   dosyayı kalıcı adına taşır ve analiz işini başlatır
+
+@router.post("/uploads", response_model=schemas.UploadOut, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    upload: schemas.UploadCreate,
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    # Yoğunlukta yükleme hiç başlamadan reddedilir; istemci Retry-After kadar bekleyip yeniden dener
+    admit_analysis(upload.size)
+    try:
+        session = await run_in_threadpool(get_upload_store().create, current_user.id,
+                                          upload.filename, upload.size, upload.project_id)
+    except UploadError as e:
+        raise_upload_error(e)
+    return session.to_dict()
+
+@router.api_route("/uploads/{upload_id}", methods=["GET", "HEAD"], response_model=schemas.UploadOut)
+def get_upload(
+    upload_id: str,
+    response: Response,
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    try:
+        session = get_upload_store().get(upload_id, current_user.id)
+    except UploadError as e:
+        raise_upload_error(e)
+    response.headers["Upload-Offset"] = str(session.offset)
+    response.headers["Upload-Length"] = str(session.size)
+    return session.to_dict()
+
+@router.patch("/uploads/{upload_id}", response_model=schemas.UploadOut)
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: str = Header(..., alias="Upload-Offset"),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    """
+    Gövde akış halinde okunur ve WRITE_BUFFER_BYTES'lık parçalarla diske eklenir; istek bellekte
+    toplanmaz. Offset uyuşmazsa 409, bildirilen boyut aşılırsa (ilk taşan parçada) 413 döner;
+    Upload-Offset veya Content-Length sayı değilse 400.
+    Bağlantı yarıda koparsa o ana kadar yazılanlar korunur.
+    """
+    try:
+        upload_offset = parse_size_header(upload_offset, "Upload-Offset")
+        declared = parse_size_header(request.headers.get("content-length"), "Content-Length")
+        session = get_upload_store().get(upload_id, current_user.id)
+        if declared is not None and upload_offset + declared > session.size:
+            raise UploadError(413, "Parça bildirilen dosya boyutunu aşıyor.")
+
+        offset = upload_offset
+        buffer = bytearray()
+        async for piece in request.stream():
+            buffer += piece
+            if len(buffer) >= WRITE_BUFFER_BYTES:
+                offset = await run_in_threadpool(session.write, offset, bytes(buffer))
+                buffer.clear()
+        if buffer or offset == upload_offset:
+            offset = await run_in_threadpool(session.write, offset, bytes(buffer))
+    except UploadError as e:
+        raise_upload_error(e)
+
+    response.headers["Upload-Offset"] = str(offset)
+    return session.to_dict()
+
+@router.post("/uploads/{upload_id}/complete", response_model=schemas.AnalysisJobOut,
+             status_code=status.HTTP_202_ACCEPTED)
+async def complete_upload(
+    upload_id: str,
+    annotate: bool = False,
+    deadline: Optional[datetime] = None,
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    try:
+        session = get_upload_store().get(upload_id, current_user.id)
+        project_id = session.meta.get("project_id")
+        # Reddedilirse yükleme oturumu korunur; tamamlama Retry-After sonrası tekrar denenebilir
+        admit_analysis(session.size)
+        upload = await run_in_threadpool(session.complete)
+    except UploadError as e:
+        raise_upload_error(e)
+
+    job = await run_in_threadpool(enqueue_analysis, upload, current_user.id, project_id, annotate, deadline)
+    return job.to_dict()
+
+@router.get("/queue", response_model=schemas.AnalysisQueueOut)
+def get_analysis_queue(current_user: models.User = Depends(oauth2.get_current_user)):
+    """
+    Analiz kuyruğunun durumu (paneller için): öncelik sınıfı başına bekleyen iş, tahmini maliyet,
+    bekleme süreleri ve kabul denetimi (sınırlar, bellek bütçesi, reddedilen istek sayıları).
+    """
+    return get_job_manager().stats()
+
+@router.get("/jobs/{job_id}", response_model=schemas.AnalysisJobOut)
+def get_analysis_job(
+    job_id: str,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    job = get_job_manager().get(job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Analiz işi bulunamadı.")
+
+    result = job.to_dict()
+    if job.presentation_id is not None:
+        result["presentation"] = db.query(models.Presentation)\
+            .filter(models.Presentation.id == job.presentation_id).first()
+    return result
 
 @router.get("/history", response_model=List[schemas.PresentationOut])
 def get_analysis_history(
@@ -172,4 +565,35 @@ def get_presentations_by_project(
         .order_by(models.Presentation.created_at.desc())\
         .all()
     
-    return presentations
\ No newline at end of file
+    return presentations
+
+@router.get("/{id}/timeline")
+def get_analysis_timeline(
+    id: int,
+    start: float = 0.0,
+    end: Optional[float] = None,
+    resolution: float = 60.0,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    """
+    Sunumun kare bazlı zaman çizelgesini istenen aralık ve çözünürlükte (saniye) döndürür.
+    Örnek: ?resolution=60 -> dakika dakika göz teması ve hareket eğrisi.
+    """
+    presentation = db.query(models.Presentation).filter(models.Presentation.id == id).first()
+    if not presentation or presentation.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Analiz bulunamadı.")
+
+    if resolution <= 0 or start < 0 or (end is not None and end < start):
+        raise HTTPException(status_code=400, detail="Geçersiz zaman aralığı.")
+
+    path = timeline_path_for(presentation.video_filename or "")
+    legacy_path = legacy_timeline_path_for(presentation.video_filename or "")
+    if not os.path.exists(path) and os.path.exists(legacy_path):
+        # Eski kayıt: dosya herkese açık dizinden korumalı dizine taşınır
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(legacy_path, path)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Bu analiz için zaman çizelgesi yok.")
+
+    return TimelineStore(path).query(start, end, resolution)
@@ -0,0 +1,265 @@
+import asyncio
+import json
+import math
+import os
+import struct
+import time
+import uuid
+from typing import Optional
+
+import cv2
+import numpy as np
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app import database, models, schemas, oauth2
+from app.analysis_models.job_manager import get_job_manager
+from app.analysis_models.live_session import LiveRehearsal
+from app.routers.analysis import build_analysis_json, filler_breakdown_json
+from app.utils.timeline_store import timeline_path_for
+
+router = APIRouter(prefix="/live", tags=["Live"])
+
+# Bağlantı başına kaynak sınırları (.env ile ayarlanabilir)
+LIVE_MAX_CONNECTIONS = int(os.getenv("LIVE_MAX_CONNECTIONS", "4"))
+LIVE_MAX_FPS = float(os.getenv("LIVE_MAX_FPS", "10"))
+LIVE_MAX_FRAME_BYTES = int(os.getenv("LIVE_MAX_FRAME_BYTES", str(1024 * 1024)))
+LIVE_MAX_AUDIO_BYTES = int(os.getenv("LIVE_MAX_AUDIO_BYTES", str(512 * 1024)))
+LIVE_MAX_SECONDS = float(os.getenv("LIVE_MAX_SECONDS", "1800"))
+LIVE_IDLE_TIMEOUT = float(os.getenv("LIVE_IDLE_TIMEOUT", "30"))
+# İstemcinin bildirebileceği ses örnekleme hızı aralığı (Hz)
+LIVE_MIN_SAMPLE_RATE, LIVE_MAX_SAMPLE_RATE = 8000, 48000
+
+# İkili mesaj türleri (ilk bayt):
+#   1: JPEG kare   -> [1][zaman ms: float64][jpeg baytları]
+#   2: Ses parçası -> [2][mono float32 örnekler]
+#   3: Ham kare    -> [3][zaman ms: float64][genişlik: uint16][yükseklik: uint16][BGR baytları]
+# Metin mesajları (JSON): {"type": "start", "sample_rate": 16000} ve {"type": "stop"}
+MSG_JPEG, MSG_AUDIO, MSG_RAW = 1, 2, 3
+
+_active_connections = 0
+
+
+def decode_frame(kind: int, payload: bytes):
+    """İkili kare mesajını (zaman damgası, BGR kare) olarak çözer; geçersizse kare None döner."""
+    if len(payload) < (10 if kind == MSG_JPEG else 13):
+        return None, None
+    timestamp_ms = struct.unpack_from("<d", payload, 1)[0]
+    if kind == MSG_JPEG:
+        frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8, offset=9), cv2.IMREAD_COLOR)
+    else:
+        width, height = struct.unpack_from("<HH", payload, 9)
+        if width == 0 or height == 0 or len(payload) - 13 != width * height * 3:
+            return timestamp_ms, None
+        frame = np.frombuffer(payload, dtype=np.uint8, offset=13).reshape(height, width, 3)
+    return timestamp_ms, frame
+
+
+def decode_audio(payload: bytes):
+    """Ses mesajını mono float32 örneklere çözer; boyu 4'ün katı değilse veya sınırı aşıyorsa None."""
+    size = len(payload) - 1
+    if size <= 0 or size % 4 or size > LIVE_MAX_AUDIO_BYTES:
+        return None
+    return np.frombuffer(payload, dtype="<f4", offset=1)
+
+
+def parse_sample_rate(value) -> Optional[int]:
+    """"start" mesajındaki örnekleme hızı; sayı değilse veya desteklenen aralıkta değilse None."""
+    try:
+        sample_rate = int(value)
+    except (TypeError, ValueError):
+        return None
+    return sample_rate if LIVE_MIN_SAMPLE_RATE <= sample_rate <= LIVE_MAX_SAMPLE_RATE else None
+
+
+def authenticate(token: str) -> int:
+    """Token'ın sahibi olan kullanıcının kimliği (iş parçacığında çağrılır; oturum hemen kapatılır)."""
+    db = database.SessionLocal()
+    try:
+        return oauth2.get_current_user(token=token, db=db).id
+    finally:
+        db.close()
+
+
+def load_presentation(presentation_id: int) -> dict:
+    db = database.SessionLocal()
+    try:
+        presentation = db.query(models.Presentation).filter(models.Presentation.id == presentation_id).first()
+        return schemas.PresentationOut.model_validate(presentation).model_dump(mode="json")
+    finally:
+        db.close()
+
+
+def save_live_presentation(db: Session, user_id: int, project_id: Optional[int], video_filename: str,
+                           results: dict, stats: dict) -> models.Presentation:
+    speech_data = results.get("speech_data", {})
+    filler_data = speech_data.get("filler_words", {})
+    presentation = models.Presentation(
+        user_id=user_id,
+        project_id=project_id,
+        # Canlı provada video kaydı tutulmaz; ad zaman çizelgesi dosyasını bulmak için kullanılır
+        video_filename=video_filename,
+        overall_score=results.get("overall_score", 0),
+        wpm=speech_data.get("speaking_rate", {}).get("words_per_minute", 0),
+        filler_count=filler_data.get("count", 0),
+        filler_breakdown=filler_breakdown_json(filler_data),
+        analysis_json=build_analysis_json(speech_data, {"live": stats}, features=results.get("features")),
+        monotony_score=speech_data.get("audio_features", {}).get("monotony_score", 0),
+        eye_contact_score=results.get("eye_score", 0),
+        body_language_score=results.get("body_score", 0),
+        duration_seconds=int(results.get("duration_seconds", 0)),
+        ai_feedback="Canlı prova tamamlandı."
+    )
+    db.add(presentation)
+    db.commit()
+    db.refresh(presentation)
+    return presentation
+
+
+def finalize_live_job(job, rehearsal: LiveRehearsal, user_id: int, project_id: Optional[int],
+                      video_filename: str, stats: dict) -> int:
+    """Prova bitişi (transkripsiyon + puanlama + kayıt) analiz kuyruğunda en yüksek öncelikle çalışır."""
+    job.stage = "finalizing"
+    results = rehearsal.finalize(timeline_path_for(video_filename))
+    db = database.SessionLocal()
+    try:
+        return save_live_presentation(db, user_id, project_id, video_filename, results, stats).id
+    finally:
+        db.close()
+
+
+@router.websocket("/ws")
+async def live_rehearsal(
+    websocket: WebSocket,
+    token: str = Query(...),
+    project_id: Optional[int] = None
+):
+    """
+    Canlı prova: istemci kareleri ve ses parçalarını akıtır, sunucu her saniye
+    göz teması / hareket / canlılık göstergelerini geri gönderir. "stop" ile sunum kaydı oluşturulur.
+    Bağlantı boyunca veritabanı oturumu tutulmaz; yalnızca kimlik doğrulama ve kayıt için kısa süre açılır.
+    """
+    global _active_connections
+
+    # Tarayıcı WebSocket'i başlık gönderemediği için token sorgu parametresiyle gelir
+    try:
+        user_id = await run_in_threadpool(authenticate, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    if _active_connections >= LIVE_MAX_CONNECTIONS:
+        # 1013: Sunucu meşgul, daha sonra tekrar deneyin
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    _active_connections += 1
+    try:
+        await websocket.accept()
+        session_id = uuid.uuid4().hex
+        rehearsal = None
+        stats = {"frames": 0, "dropped_frames": 0, "audio_chunks": 0, "dropped_audio_chunks": 0}
+        next_tick = 1.0
+        # Kare hızı ve süre sınırları sunucu saatiyle uygulanır; istemcinin zaman damgasına güvenilmez
+        started_at = None
+        last_accepted_at = None
+        min_frame_gap = 1.0 / LIVE_MAX_FPS
+
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive(), LIVE_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await websocket.close(code=status.WS_1001_GOING_AWAY)
+                return
+            if message["type"] == "websocket.disconnect":
+                # "stop" gelmeden kopan provalar kaydedilmez
+                return
+
+            if message.get("text") is not None:
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    continue
+                if control.get("type") == "start" and rehearsal is None:
+                    sample_rate = parse_sample_rate(control.get("sample_rate", 16000))
+                    if sample_rate is None:
+                        await websocket.send_json({
+                            "type": "error",
+                            "detail": f"sample_rate {LIVE_MIN_SAMPLE_RATE}-{LIVE_MAX_SAMPLE_RATE} Hz aralığında olmalı."
+                        })
+                        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+                        return
+                    rehearsal = await run_in_threadpool(LiveRehearsal, sample_rate, max_seconds=LIVE_MAX_SECONDS)
+                    started_at = time.monotonic()
+                    await websocket.send_json({"type": "ready", "session_id": session_id,
+                                               "max_fps": LIVE_MAX_FPS, "max_seconds": LIVE_MAX_SECONDS})
+                elif control.get("type") == "stop":
+                    break
+                continue
+
+            payload = message.get("bytes") or b""
+            if rehearsal is None or not payload:
+                continue
+            kind = payload[0]
+
+            # Bozuk veya sınırı aşan mesajlar bağlantıyı kesmez; atlanan olarak sayılır
+            if kind == MSG_AUDIO:
+                samples = decode_audio(payload)
+                if samples is None:
+                    stats["dropped_audio_chunks"] += 1
+                    continue
+                await run_in_threadpool(rehearsal.add_audio, samples)
+                stats["audio_chunks"] += 1
+            elif kind in (MSG_JPEG, MSG_RAW):
+                if len(payload) > LIVE_MAX_FRAME_BYTES:
+                    stats["dropped_frames"] += 1
+                    continue
+                # Kare hızı sınırı: çok sık gelen kareler çözülmeden ve analiz edilmeden atlanır
+                now = time.monotonic()
+                if last_accepted_at is not None and now - last_accepted_at < min_frame_gap:
+                    stats["dropped_frames"] += 1
+                    continue
+                timestamp_ms, frame = decode_frame(kind, payload)
+                if frame is None or not math.isfinite(timestamp_ms):
+                    stats["dropped_frames"] += 1
+                    continue
+                last_accepted_at = now
+                await run_in_threadpool(rehearsal.add_frame, frame, timestamp_ms)
+                stats["frames"] += 1
+
+            if rehearsal.media_seconds >= next_tick:
+                indicator = rehearsal.tick()
+                indicator["dropped_frames"] = stats["dropped_frames"]
+                await websocket.send_json(indicator)
+                next_tick = float(int(rehearsal.media_seconds)) + 1.0
+
+            if time.monotonic() - started_at >= LIVE_MAX_SECONDS or rehearsal.media_seconds >= LIVE_MAX_SECONDS:
+                await websocket.send_json({"type": "limit", "detail": "Maksimum prova süresine ulaşıldı."})
+                break
+
+        if rehearsal is None:
+            await websocket.close()
+            return
+
+        # Bitiş: toplam skorlar, zaman çizelgesi ve normal bir Presentation kaydı
+        video_filename = f"uploads/videos/live_{session_id}"
+        # Maliyet: biriken ses ve karelerin süresi (transkripsiyon bunun üzerinden yapılır)
+        job = get_job_manager().submit(user_id, finalize_live_job, rehearsal, user_id, project_id,
+                                       video_filename, stats, priority="live",
+                                       cost=max(1.0, round(rehearsal.media_seconds, 1)))
+        try:
+            presentation_id = await asyncio.wrap_future(job.future)
+            presentation = await run_in_threadpool(load_presentation, presentation_id)
+        except Exception as e:
+            print(f"❌ Canlı prova kaydedilemedi ({session_id}): {e}")
+            await websocket.send_json({"type": "error", "detail": "Prova analizi tamamlanamadı, lütfen tekrar deneyin."})
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+            return
+        await websocket.send_json({"type": "final", "presentation": presentation})
+        await websocket.close()
+    except WebSocketDisconnect:
+        # İstemci yanıt beklemeden ayrıldı
+        pass
+    finally:
+        _active_connections -= 1
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -54,10 +54,78 @@ class PresentationOut(PresentationBase):
     user_id: int
     # 🟢 KRİTİK: Frontend filtrelemesi için bu alanın burada tanımlı olması şarttır
     project_id: Optional[int] = None 
+    # Dolgu kelime konumları/yoğunluğu gibi yapılandırılmış analiz detayları (JSON metni)
+    analysis_json: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+# --- ANALİZ İŞİ ŞEMALARI ---
+
+class AnalysisJobProgress(BaseModel):
+    frames_processed: int = 0
+    frames_seen: int = 0
+    total_frames: Optional[int] = None
+    ratio: Optional[float] = None
+
+class AnalysisJobOut(BaseModel):
+    job_id: str
+    status: str  # queued | running | done | failed
+    stage: str
+    progress: AnalysisJobProgress
+    error: Optional[str] = None
+    presentation_id: Optional[int] = None
+    content_hash: Optional[str] = None
+    priority: str = "interactive"  # live | interactive | bulk
+    estimated_cost: float = 0.0  # 720p eşdeğeri video saniyesi
+    queue_wait_sec: float = 0.0
+    elapsed_sec: float = 0.0
+    # İş bittiğinde oluşturulan sunum kaydı
+    presentation: Optional[PresentationOut] = None
+
+class AnalysisQueueClass(BaseModel):
+    queued: int = 0
+    queued_cost: float = 0.0
+    started: int = 0
+    wait_p50_sec: Optional[float] = None
+    wait_p90_sec: Optional[float] = None
+    wait_max_sec: Optional[float] = None
+
+class AnalysisAdmission(BaseModel):
+    accepting: bool
+    max_queued: int
+    max_wait_sec: Optional[float] = None
+    estimated_wait_sec: float = 0.0
+    sec_per_cost: float = 1.0  # maliyet birimi başına gerçekleşen analiz süresi
+    memory_budget_mb: Optional[int] = None
+    running_memory_mb: float = 0.0
+    memory_reserved_mb: Optional[float] = None  # bütçenin ayrıldığı, uzun bekleyen işin tahmini belleği
+    rejected: Dict[str, int] = {}  # queue_full | overloaded
+
+class AnalysisQueueOut(BaseModel):
+    workers: int
+    max_per_user: int
+    queued: int
+    running: int
+    users_running: int
+    classes: Dict[str, AnalysisQueueClass]
+    admission: AnalysisAdmission
+
+# --- PARÇALI YÜKLEME ŞEMALARI ---
+
+class UploadCreate(BaseModel):
+    filename: str
+    size: int  # bayt
+    project_id: Optional[int] = None
+
+class UploadOut(BaseModel):
+    upload_id: str
+    filename: str
+    size: int
+    offset: int  # sunucuya yazılmış bayt sayısı; yükleme buradan devam eder
+    project_id: Optional[int] = None
+    expires_at: float
+
 # --- DİĞER ŞEMALAR ---
 
 class ChatRequest(BaseModel):
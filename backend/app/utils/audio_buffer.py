@@ -0,0 +1,42 @@
+import librosa
+import numpy as np
+import speech_recognition as sr
+
+
+class AudioBuffer:
+    """
+    Bir kez çözülmüş mono ses (float32 NumPy dizisi + örnekleme hızı).
+    Transkripsiyon, süre, enerji ve perde aşamaları diski tekrar okumadan bu tampondan beslenir;
+    farklı hız isteyen aşama için yeniden örnekleme yalnızca bir kez yapılır ve saklanır.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.sample_rate = int(sample_rate)
+        self._resampled = {}
+
+    @classmethod
+    def from_file(cls, audio_path) -> "AudioBuffer":
+        """Ses dosyasını özgün hızında, mono olarak tek seferde okur."""
+        samples, sample_rate = librosa.load(audio_path, sr=None, mono=True)
+        return cls(samples, sample_rate)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    def resampled(self, sample_rate: int) -> "AudioBuffer":
+        """İstenen hızdaki kopyayı döner; hız zaten aynıysa tamponun kendisi döner."""
+        sample_rate = int(sample_rate)
+        if sample_rate == self.sample_rate:
+            return self
+        if sample_rate not in self._resampled:
+            samples = librosa.resample(self.samples, orig_sr=self.sample_rate, target_sr=sample_rate)
+            self._resampled[sample_rate] = AudioBuffer(samples, sample_rate)
+        return self._resampled[sample_rate]
+
+    def to_audio_data(self, sample_rate: int = None) -> sr.AudioData:
+        """speech_recognition için 16-bit PCM AudioData üretir (dosya açmadan)."""
+        buffer = self.resampled(sample_rate) if sample_rate else self
+        pcm = (np.clip(buffer.samples, -1.0, 1.0) * 32767).astype("<i2")
+        return sr.AudioData(pcm.tobytes(), buffer.sample_rate, 2)
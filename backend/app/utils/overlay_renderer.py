@@ -0,0 +1,86 @@
+import os
+import cv2
+import numpy as np
+
+from app.analysis_models.frame_sampler import iter_sampled_frames
+
+
+def annotated_path_for(video_path):
+    """Koçluk oynatımı için üretilen işaretli videonun yolu (orijinalin yanında)."""
+    return os.path.splitext(video_path)[0] + "_annotated.webm"
+
+
+def draw_overlay(frame, frame_metrics):
+    """Analiz sonuçlarını (yüz kutusu, hareket etiketi) karenin üzerine çizer."""
+    box = frame_metrics.get('face_box')
+    if box:
+        (x, y, w, h) = box
+        color = (0, 255, 0) if frame_metrics.get('eye_contact') else (0, 0, 255)
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(frame, "ODAK", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2)
+
+    if 'movement_ratio' in frame_metrics:
+        if frame_metrics.get('movement_detected'):
+            cv2.putText(frame, "HAREKETLI", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        else:
+            cv2.putText(frame, "STABIL", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    return frame
+
+
+def row_metrics(row, has_box: bool) -> dict:
+    """Zaman çizelgesi satırını draw_overlay'in beklediği kare sonuçlarına çevirir."""
+    frame_metrics = {'eye_contact': bool(row['eye'])}
+    if has_box and row['face'] and row['box'][2] > 0:
+        frame_metrics['face_box'] = tuple(int(v) for v in row['box'])
+    if not np.isnan(row['move']):
+        frame_metrics['movement_ratio'] = float(row['move'])
+        # Eşik PoseDetector ile aynı: piksellerin %1'inden fazlası değişiyorsa hareket var
+        frame_metrics['movement_detected'] = frame_metrics['movement_ratio'] > 1.0
+    return frame_metrics
+
+
+def render_annotated_video(video_path, timeline_path, output_path=None):
+    """
+    Analizde kaydedilen zaman çizelgesinden (yüz kutusu, göz teması, hareket) işaretli bir önizleme
+    videosu yazar. Kareler yeniden analiz edilmez, yalnızca çözülüp üzerine çizilir; havuzdan analizör
+    alınmadığı için yüklemelerin analizini bekletmez. Upload sonrası arka plan görevi olarak çalıştırılır.
+    """
+    if not os.path.exists(timeline_path):
+        print(f"⚠️ İşaretli video için zaman çizelgesi yok: {timeline_path}")
+        return None
+    rows = np.load(timeline_path)
+    if len(rows) == 0:
+        return None
+    # Yüz kutusu sütunu olmayan eski zaman çizelgelerinde yalnızca hareket etiketi basılır
+    has_box = "box" in rows.dtype.names
+    times = rows["t"]
+
+    output_path = output_path or annotated_path_for(video_path)
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    # Tarayıcı webm kayıtları anlamsız FPS (Örn: 1000) bildirebilir
+    if not (0 < fps <= 120):
+        fps = 30.0
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    # VP8/webm tarayıcıda doğrudan oynatılabilir
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*"VP80"), fps, size)
+    if not writer.isOpened():
+        print("❌ İşaretli video yazıcısı açılamadı.")
+        cap.release()
+        return None
+
+    try:
+        for ctx in iter_sampled_frames(cap):
+            # Seyrek örneklenen analizlerde kareye en yakın önceki satır kullanılır
+            # (zaman sütunu float32; küçük tolerans aynı karenin satırını kaçırmamak için)
+            i = max(0, int(np.searchsorted(times, ctx.timestamp_ms / 1000.0 + 1e-3, side="right")) - 1)
+            writer.write(draw_overlay(ctx.frame, row_metrics(rows[i], has_box)))
+    except Exception as e:
+        print(f"❌ İşaretli video hatası: {e}")
+        output_path = None
+    finally:
+        cap.release()
+        writer.release()
+
+    return output_path
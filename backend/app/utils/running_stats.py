@@ -0,0 +1,110 @@
+import numpy as np
+from typing import Dict
+
+
+class RunningStats:
+    """
+    Sabit bellekli (O(1)) akan istatistik: adet, ortalama, varyans, min/max ve histogram.
+    Değerler listede tutulmaz; yüzdelikler histogramdan (kova genişliği hassasiyetinde) hesaplanır.
+    Aralık dışındaki değerler ilk/son kovaya sayılır, min/max ise kesin tutulur.
+    """
+
+    def __init__(self, hist_min: float = 0.0, hist_max: float = 100.0, bins: int = 200):
+        self.hist_min = float(hist_min)
+        self.hist_max = float(hist_max)
+        self.histogram = np.zeros(bins, dtype=np.int64)
+
+        self.count = 0
+        self.total = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def _bin_index(self, values):
+        bins = len(self.histogram)
+        width = (self.hist_max - self.hist_min) / bins
+        return np.clip(((np.asarray(values, dtype=np.float64) - self.hist_min) / width).astype(np.int64), 0, bins - 1)
+
+    def push(self, value: float):
+        value = float(value)
+        self.count += 1
+        self.total += value
+        # Welford güncellemesi (sayısal olarak kararlı varyans)
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.histogram[self._bin_index(value)] += 1
+
+    def push_many(self, values):
+        """Bir dizi değeri tek seferde (vektörel) ekler."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        batch = RunningStats(self.hist_min, self.hist_max, len(self.histogram))
+        batch.count = int(values.size)
+        batch.total = float(values.sum())
+        batch._mean = batch.total / batch.count
+        batch._m2 = float(((values - batch._mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        batch.histogram += np.bincount(self._bin_index(values), minlength=len(self.histogram))
+        self.merge(batch)
+
+    def merge(self, other: "RunningStats"):
+        """Başka bir istatistiği (Örn: paralel segment) bununla birleştirir (Chan yöntemi)."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self._mean, self._m2 = other._mean, other._m2
+        else:
+            count = self.count + other.count
+            delta = other._mean - self._mean
+            self._mean += delta * other.count / count
+            self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.histogram += other.histogram
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    def percentile(self, q: float) -> float:
+        """Histogramdan yaklaşık yüzdelik (q: 0-100), kova içinde doğrusal ara değerleme ile."""
+        if self.count == 0:
+            return 0.0
+        target = self.count * q / 100.0
+        cumulative = np.cumsum(self.histogram)
+        index = int(np.searchsorted(cumulative, target, side="left"))
+        index = min(index, len(self.histogram) - 1)
+
+        width = (self.hist_max - self.hist_min) / len(self.histogram)
+        before = cumulative[index - 1] if index > 0 else 0
+        in_bin = self.histogram[index]
+        fraction = (target - before) / in_bin if in_bin else 0.0
+        value = self.hist_min + (index + fraction) * width
+        return float(min(max(value, self.min), self.max))
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+        }
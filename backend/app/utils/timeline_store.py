@@ -0,0 +1,154 @@
+import os
+import numpy as np
+from typing import Dict, Optional
+
+# Kare başına tek satır, sabit genişlikli sütunlar (22 bayt/kare):
+#   t       -> zaman damgası (saniye)
+#   face    -> yüz bulundu mu (0/1)
+#   eye     -> göz teması var mı (0/1)
+#   move    -> hareket oranı (%); önceki karesi olmayan karelerde NaN
+#   face_dx -> yüz merkezinin kare merkezine yatay uzaklığı (kare genişliğine oranla); yüz yoksa NaN.
+#              Göz teması eşiği değişince skor videoyu yeniden çözmeden bundan hesaplanır.
+#   box     -> yüz kutusu (x, y, genişlik, yükseklik; analiz edilen karenin pikselleri); yüz yoksa 0.
+#              İşaretli önizleme videosu kareler yeniden analiz edilmeden bundan çizilir.
+TIMELINE_DTYPE = np.dtype([("t", "<f4"), ("face", "u1"), ("eye", "u1"), ("move", "<f4"), ("face_dx", "<f4"),
+                           ("box", "<u2", (4,))])
+
+# Tek bir sorguda dönebilecek en fazla zaman kovası (büyük aralıklarda çözünürlük otomatik artırılır)
+MAX_BUCKETS = 2000
+
+
+# Zaman çizelgeleri herkese açık /uploads dizininin dışında tutulur; yalnızca oturum açmış sahibine
+# /analysis/{id}/timeline üzerinden sunulur (.env: TIMELINE_DIR)
+TIMELINE_DIR = os.getenv("TIMELINE_DIR", "timelines")
+
+
+def timeline_path_for(video_path):
+    """Zaman çizelgesi dosyası videonun benzersiz adıyla TIMELINE_DIR altında tutulur."""
+    name = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(TIMELINE_DIR, name + ".timeline.npy")
+
+
+def legacy_timeline_path_for(video_path):
+    """Eski sürümlerin videonun yanına (/uploads içine) yazdığı zaman çizelgesi."""
+    return os.path.splitext(video_path)[0] + ".timeline.npy"
+
+
+class TimelineWriter:
+    """Analiz sırasında kare sonuçlarını bloklar halinde diziye yazar."""
+
+    BLOCK_ROWS = 4096
+
+    def __init__(self):
+        self._blocks = []
+        self._block = np.empty(self.BLOCK_ROWS, dtype=TIMELINE_DTYPE)
+        self._filled = 0
+
+    def __len__(self):
+        return sum(len(b) for b in self._blocks) + self._filled
+
+    def append(self, timestamp_ms: float, frame_metrics: Dict):
+        self._block[self._filled] = (
+            timestamp_ms / 1000.0,
+            frame_metrics.get("face_detected", False),
+            frame_metrics.get("eye_contact", False),
+            frame_metrics.get("movement_ratio", np.nan),
+            frame_metrics.get("face_offset", np.nan),
+            frame_metrics.get("face_box") or (0, 0, 0, 0),
+        )
+        self._filled += 1
+
+        if self._filled == self.BLOCK_ROWS:
+            self._blocks.append(self._block)
+            self._block = np.empty(self.BLOCK_ROWS, dtype=TIMELINE_DTYPE)
+            self._filled = 0
+
+    def extend(self, rows: np.ndarray):
+        """Başka bir yazıcının (Örn: paralel segmentin) satırlarını sona ekler."""
+        self._flush()
+        self._blocks.append(np.asarray(rows, dtype=TIMELINE_DTYPE))
+
+    def _flush(self):
+        if self._filled:
+            self._blocks.append(self._block[:self._filled].copy())
+            self._filled = 0
+
+    def to_array(self) -> np.ndarray:
+        self._flush()
+        if not self._blocks:
+            return np.empty(0, dtype=TIMELINE_DTYPE)
+        rows = np.concatenate(self._blocks)
+        self._blocks = [rows]
+        return rows
+
+    def save(self, path):
+        return save_timeline(path, self.to_array())
+
+
+def save_timeline(path, rows: np.ndarray):
+    # Aralık sorguları ikili arama kullandığı için zaman sırası garanti edilir
+    if len(rows) > 1 and np.any(np.diff(rows["t"]) < 0):
+        rows = np.sort(rows, order="t", kind="stable")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.save(path, rows)
+    return path
+
+
+class TimelineStore:
+    """Diskteki zaman çizelgesini bellek eşlemeli (mmap) açar ve aralık sorgularına cevap verir."""
+
+    def __init__(self, path):
+        self.rows = np.load(path, mmap_mode="r")
+
+    @property
+    def duration(self) -> float:
+        return float(self.rows["t"][-1]) if len(self.rows) else 0.0
+
+    def query(self, start: float = 0.0, end: Optional[float] = None, resolution: float = 1.0) -> Dict:
+        """
+        [start, end) saniye aralığını 'resolution' saniyelik kovalara indirger.
+        Her kova için: yüz görünme oranı, göz teması oranı (yüz görünen karelere göre) ve ortalama hareket.
+        """
+        open_ended = end is None
+        end = self.duration if open_ended else end
+        span = max(0.0, end - start)
+        resolution = max(float(resolution), span / MAX_BUCKETS, 1e-3)
+
+        times = self.rows["t"]
+        lo, hi = np.searchsorted(times, [start, end])
+        if open_ended:
+            # Son kare de dahil olsun
+            hi = len(times)
+        # Sadece istenen aralık diskten okunur
+        chunk = np.asarray(self.rows[lo:hi])
+
+        bucket_count = int(np.ceil(span / resolution)) if span > 0 else 0
+        result = {"start": start, "end": end, "resolution": resolution,
+                  "t": [], "face_ratio": [], "eye_contact_ratio": [], "movement": []}
+        if bucket_count == 0:
+            return result
+
+        buckets = np.minimum(((chunk["t"] - start) / resolution).astype(np.int64), bucket_count - 1)
+        frames = np.bincount(buckets, minlength=bucket_count)
+        faces = np.bincount(buckets, weights=chunk["face"], minlength=bucket_count)
+        eyes = np.bincount(buckets, weights=chunk["eye"], minlength=bucket_count)
+
+        moves = chunk["move"].astype(np.float64)
+        valid = ~np.isnan(moves)
+        move_sum = np.bincount(buckets[valid], weights=moves[valid], minlength=bucket_count)
+        move_count = np.bincount(buckets[valid], minlength=bucket_count)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            face_ratio = np.where(frames > 0, faces / frames, np.nan)
+            eye_ratio = np.where(faces > 0, eyes / faces, np.nan)
+            movement = np.where(move_count > 0, move_sum / move_count, np.nan)
+
+        def to_list(values, digits):
+            # JSON'da NaN olmaz; veri olmayan kovalar None döner
+            return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+        result["t"] = [round(start + i * resolution, 3) for i in range(bucket_count)]
+        result["face_ratio"] = to_list(face_ratio, 3)
+        result["eye_contact_ratio"] = to_list(eye_ratio, 3)
+        result["movement"] = to_list(movement, 3)
+        return result
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+# .env: MAX_UPLOAD_BYTES (tek video için üst sınır), UPLOAD_EXPIRY_SECONDS (yarım kalan yüklemelerin ömrü)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(2 * 1024 ** 3)))
+UPLOAD_EXPIRY_SECONDS = float(os.getenv("UPLOAD_EXPIRY_SECONDS", str(24 * 3600)))
+
+# Diske tek seferde yazılacak en küçük parça (ağdan gelen küçük parçalar bu boya kadar birleştirilir)
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Yükleme protokolü hatası; status_code HTTP yanıt koduna karşılık gelir."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def safe_extension(filename: str) -> str:
+    """Kullanıcı dosya adından yalnızca uzantı alınır; depolama adı her zaman benzersiz kimliktir."""
+    ext = os.path.splitext(os.path.basename(filename or ""))[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,8}", ext) else ".webm"
+
+
+class UploadSession:
+    """
+    Devam ettirilebilir tek bir yükleme. Parçalar doğrudan tek bir .part dosyasının sonuna eklenir;
+    bitişte dosya yeniden kopyalanmadan (os.replace) kalıcı adına taşınır.
+    Yazılan bayt sayısı (offset) diskteki dosya boyundan okunur; sunucu yeniden başlasa da yükleme sürer.
+    """
+
+    def __init__(self, store: "UploadStore", upload_id: str, meta: Dict):
+        self.store = store
+        self.id = upload_id
+        self.meta = meta
+        self.lock = threading.Lock()
+        self._hasher = None
+        self._hashed = 0
+
+    @property
+    def part_path(self) -> str:
+        return os.path.join(self.store.incoming_dir, f"{self.id}.part")
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.store.incoming_dir, f"{self.id}.json")
+
+    @property
+    def size(self) -> int:
+        return self.meta["size"]
+
+    @property
+    def offset(self) -> int:
+        return os.path.getsize(self.part_path) if os.path.exists(self.part_path) else 0
+
+    def _ensure_hasher(self):
+        """SHA-256 akış halinde tutulur; süreç yeniden başladıysa mevcut kısım bir kez okunup devam edilir."""
+        if self._hasher is not None and self._hashed == self.offset:
+            return
+        self._hasher = hashlib.sha256()
+        self._hashed = 0
+        if os.path.exists(self.part_path):
+            with open(self.part_path, "rb") as f:
+                for block in iter(lambda: f.read(WRITE_BUFFER_BYTES), b""):
+                    self._hasher.update(block)
+                    self._hashed += len(block)
+
+    def write(self, offset: int, data: bytes) -> int:
+        """offset konumuna parça ekler (iş parçacığında çağrılır); yeni offset'i döner."""
+        with self.lock:
+            current = self.offset
+            if offset != current:
+                raise UploadError(409, f"Beklenen offset {current}, gelen {offset}.")
+            if current + len(data) > self.size:
+                raise UploadError(413, "Parça bildirilen dosya boyutunu aşıyor.")
+            self._ensure_hasher()
+            with open(self.part_path, "ab") as f:
+                f.write(data)
+            self._hasher.update(data)
+            self._hashed += len(data)
+            return current + len(data)
+
+    def complete(self) -> Dict:
+        """Eksiksiz yüklemeyi kalıcı adına taşır; depolama yolu ve içerik özetini döner."""
+        with self.lock:
+            if self.offset != self.size:
+                raise UploadError(409, f"Yükleme tamamlanmadı ({self.offset}/{self.size} bayt).")
+            self._ensure_hasher()
+            sha256 = self._hasher.hexdigest()
+            final_path = os.path.join(self.store.video_dir, f"{self.id}{self.meta['extension']}")
+            os.replace(self.part_path, final_path)
+            os.remove(self.meta_path)
+            self.store.forget(self.id)
+            return {"file_path": final_path, "sha256": sha256, "size": self.size}
+
+    def to_dict(self) -> Dict:
+        return {
+            "upload_id": self.id,
+            "filename": self.meta["filename"],
+            "size": self.size,
+            "offset": self.offset,
+            "project_id": self.meta.get("project_id"),
+            # Son parçadan itibaren UPLOAD_EXPIRY_SECONDS boyunca devam ettirilebilir
+            "expires_at": os.path.getmtime(self.part_path) + UPLOAD_EXPIRY_SECONDS
+        }
+
+
+class UploadStore:
+    """
+    Yarım yüklemeler (ve sahiplik bilgisi içeren .json kayıtları) /uploads statik sunumunun dışında,
+    UPLOAD_INCOMING_DIR altında; tamamlananlar uploads/videos altında tutulur. İki klasör aynı dosya
+    sisteminde olmalıdır (bitişte dosya os.replace ile taşınır).
+    """
+
+    def __init__(self, video_dir: str = "uploads/videos", incoming_dir: str = None,
+                 max_bytes: int = MAX_UPLOAD_BYTES):
+        incoming_dir = incoming_dir or os.getenv("UPLOAD_INCOMING_DIR", "incoming")
+        self.video_dir = video_dir
+        self.incoming_dir = incoming_dir
+        self.max_bytes = max_bytes
+        os.makedirs(video_dir, exist_ok=True)
+        os.makedirs(incoming_dir, exist_ok=True)
+        self._sessions: Dict[str, UploadSession] = {}
+        self._lock = threading.Lock()
+
+    def create(self, user_id: int, filename: str, size: int, project_id: Optional[int] = None) -> UploadSession:
+        # Boyut sınırı veri gönderilmeden, oturum açılırken uygulanır
+        if size <= 0:
+            raise UploadError(400, "Geçersiz dosya boyutu.")
+        if size > self.max_bytes:
+            raise UploadError(413, f"Dosya çok büyük (en fazla {self.max_bytes // 1024 ** 2} MB).")
+
+        self.cleanup_expired()
+        upload_id = uuid.uuid4().hex
+        meta = {
+            "user_id": user_id,
+            "filename": os.path.basename(filename or ""),
+            "extension": safe_extension(filename),
+            "size": size,
+            "project_id": project_id,
+            "created_at": time.time()
+        }
+        session = UploadSession(self, upload_id, meta)
+        with open(session.meta_path, "w") as f:
+            json.dump(meta, f)
+        open(session.part_path, "wb").close()
+        with self._lock:
+            self._sessions[upload_id] = session
+        return session
+
+    def get(self, upload_id: str, user_id: int) -> UploadSession:
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+            raise UploadError(404, "Yükleme bulunamadı.")
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is None:
+                meta_path = os.path.join(self.incoming_dir, f"{upload_id}.json")
+                if not os.path.exists(meta_path):
+                    raise UploadError(404, "Yükleme bulunamadı.")
+                with open(meta_path) as f:
+                    session = self._sessions[upload_id] = UploadSession(self, upload_id, json.load(f))
+        if session.meta["user_id"] != user_id:
+            raise UploadError(404, "Yükleme bulunamadı.")
+        return session
+
+    def forget(self, upload_id: str):
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+
+    def cleanup_expired(self):
+        """Son parçası UPLOAD_EXPIRY_SECONDS'tan eski yarım yüklemeleri siler."""
+        cutoff = time.time() - UPLOAD_EXPIRY_SECONDS
+        for name in os.listdir(self.incoming_dir):
+            if not name.endswith(".json"):
+                continue
+            upload_id = name[:-len(".json")]
+            part_path = os.path.join(self.incoming_dir, f"{upload_id}.part")
+            try:
+                last_activity = os.path.getmtime(part_path if os.path.exists(part_path) else
+                                                 os.path.join(self.incoming_dir, name))
+                if last_activity < cutoff:
+                    for path in (part_path, os.path.join(self.incoming_dir, name)):
+                        if os.path.exists(path):
+                            os.remove(path)
+                    self.forget(upload_id)
+            except OSError:
+                pass
+
+
+_upload_store = None
+_upload_store_lock = threading.Lock()
+
+
+def get_upload_store() -> UploadStore:
+    global _upload_store
+    with _upload_store_lock:
+        if _upload_store is None:
+            _upload_store = UploadStore()
+        return _upload_store
@@ -1,30 +1,162 @@
 import os
-from moviepy.editor import VideoFileClip
+import subprocess
+import tempfile
+import cv2
+import numpy as np
+from typing import Dict, Optional
+from app.utils.audio_buffer import AudioBuffer
+
+# Konuşma analizinin çalıştığı hız (transkripsiyon, enerji ve perde için yeterli)
+ANALYSIS_SAMPLE_RATE = 16000
+
+# Analiz / oynatım vekil kopyası (.env): yüz tespiti ve kare farkı 480p'de yeterli; sabit kare hızı (CFR)
+# ilerleme oranını ve zaman damgalarını güvenilir kılar. H.264 "fastdecode" ayarı (CABAC ve blok giderme
+# kapalı) dosyayı biraz büyütür ama çözmeyi hızlandırır; MP4 (faststart) tarayıcıda doğrudan oynatılır.
+PROXY_ENABLED = os.getenv("ANALYSIS_PROXY", "1") == "1"
+PROXY_HEIGHT = int(os.getenv("PROXY_HEIGHT", "480"))
+PROXY_FPS = int(os.getenv("PROXY_FPS", "30"))
+PROXY_CRF = int(os.getenv("PROXY_CRF", "28"))
+# 0: analiz bittikten sonra orijinal yükleme silinir, yalnızca vekil kopya saklanır
+PROXY_KEEP_ORIGINAL = os.getenv("PROXY_KEEP_ORIGINAL", "1") == "1"
+
+
+def get_ffmpeg_binary():
+    """.env: FFMPEG_BINARY; yoksa imageio-ffmpeg paketinin ikilisi, o da yoksa PATH'teki ffmpeg."""
+    binary = os.getenv("FFMPEG_BINARY")
+    if binary:
+        return binary
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return "ffmpeg"
+
+
+def probe_video(video_path) -> Dict:
+    """
+    Konteyner başlığından çözünürlük, kare sayısı ve süre (kareler çözülmez).
+    Tarayıcı webm kayıtlarında kare sayısı/FPS güvenilir değil; o zaman frame_count ve duration_sec None olur.
+    """
+    cap = cv2.VideoCapture(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    reliable = frame_count > 0 and 0 < fps <= 240
+    return {
+        "width": width or None,
+        "height": height or None,
+        "fps": round(fps, 3) if reliable else None,
+        "frame_count": frame_count if reliable else None,
+        "duration_sec": round(frame_count / fps, 2) if reliable else None
+    }
+
+
+def proxy_path_for(video_path):
+    """Vekil kopya orijinalin yanında tutulur."""
+    return os.path.splitext(video_path)[0] + "_proxy.mp4"
+
+
+def proxy_spec() -> str:
+    """Vekil kopya ayarları; analiz önbellek anahtarına katılır (ayar değişince eski sonuçlar kullanılmaz)."""
+    return f"h264-fastdecode-{PROXY_HEIGHT}p-{PROXY_FPS}fps-crf{PROXY_CRF}"
+
+
+def needs_proxy(media: Dict) -> bool:
+    """Zaten küçük ve sabit kare hızlı videolar için vekil üretilmez (kazanç yok, yalnızca kodlama maliyeti)."""
+    if not PROXY_ENABLED:
+        return False
+    height = media.get("height") or 0
+    fps = media.get("fps")
+    return height > PROXY_HEIGHT or fps is None or fps > PROXY_FPS
+
 
 class VideoProcessor:
+    # Ses izi boru üzerinden bu boyutta bloklarla okunur (stereo f32, 16 kHz'de ~4 sn)
+    AUDIO_READ_BYTES = 1 << 19
+
     def __init__(self, video_path):
         self.video_path = video_path
-        # Ses dosyası yolunu oluştur (video ile aynı yerde .wav olarak)
-        self.audio_path = os.path.splitext(video_path)[0] + ".wav"
 
-    def extract_audio(self):
+    def extract_audio_samples(self, sample_rate: int = ANALYSIS_SAMPLE_RATE) -> Optional[AudioBuffer]:
         """
-        Videodan sesi ayıklar ve kaydeder.
+        Ses izini doğrudan analiz hızında float örneklere çözer, mono olarak bellekte döner.
+        ffmpeg çıktısı boru (pipe) ile bloklar halinde okunup blok blok monoya indirilir; diske ara
+        .wav dosyası yazılmaz ve stereo çıktının tamamı bellekte tutulmaz.
         """
-        try:
-            video = VideoFileClip(self.video_path)
-            if video.audio is None:
+        command = [
+            get_ffmpeg_binary(), "-nostdin", "-v", "error",
+            "-i", self.video_path,
+            "-vn", "-ac", "2", "-ar", str(sample_rate),
+            "-f", "f32le", "pipe:1"
+        ]
+        # Hata çıktısı dosyaya yazılır: bozuk bir akışta uzayan stderr borusu stdout okunurken dolup kilitlenmesin
+        with tempfile.TemporaryFile() as stderr:
+            try:
+                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+            except OSError as e:
+                print(f"❌ Ses ayıklama hatası: {e}")
+                return None
+
+            # Mono örnekler büyüyen tek bir diziye yazılır (resize yerinde genişler, parça listesi birleştirilmez)
+            samples = np.empty(sample_rate * 60, dtype=np.float32)
+            count = 0
+            with process.stdout:
+                while True:
+                    block = process.stdout.read(self.AUDIO_READ_BYTES)
+                    if not block:
+                        break
+                    # Kanallar eski akıştaki gibi (stereo WAV + librosa ortalaması) birleştirilir: tarayıcıların
+                    # mono kayıtları stereoya -3 dB ile açıldığından enerji ölçeği ve skorlar geçmişle uyumlu kalır
+                    usable = len(block) - len(block) % 8
+                    mono = np.frombuffer(block, dtype="<f4", count=usable // 4).reshape(-1, 2).mean(axis=1)
+                    if count + len(mono) > len(samples):
+                        samples.resize(max(len(samples) * 2, count + len(mono)), refcheck=False)
+                    samples[count:count + len(mono)] = mono
+                    count += len(mono)
+            returncode = process.wait()
+
+            # Ses izi olmayan videolarda ffmpeg hata verir veya boş çıktı üretir
+            if returncode != 0 or count == 0:
+                stderr.seek(0)
+                message = stderr.read().decode(errors="ignore").strip().splitlines()
+                print(f"❌ Ses ayıklama hatası: {message[-1] if message else 'ses izi yok'}")
                 return None
-                
-            # Librosa uyumlu format (16kHz, mono önerilir ama default da çalışır)
-            video.audio.write_audiofile(self.audio_path, codec='pcm_s16le', logger=None)
-            video.close()
-            return self.audio_path
-        except Exception as e:
-            print(f"❌ Ses ayıklama hatası: {e}")
-            return None
 
-    def cleanup(self):
-        """İşlem bitince geçici ses dosyasını siler"""
-        if os.path.exists(self.audio_path):
-            os.remove(self.audio_path)
\ No newline at end of file
+        samples.resize(count, refcheck=False)
+        return AudioBuffer(samples, sample_rate)
+
+    def create_proxy(self, proxy_path: str = None) -> Optional[str]:
+        """
+        Düşük çözünürlüklü, sabit kare hızlı vekil kopya üretir (en fazla PROXY_HEIGHT, büyütme yapılmaz).
+        Ses izi AAC olarak korunur; orijinal silinse de analiz ve oynatım vekilden yapılabilir.
+        Başarısız olursa None döner (çağıran orijinalle devam eder).
+        """
+        proxy_path = proxy_path or proxy_path_for(self.video_path)
+        temp_path = proxy_path + ".tmp.mp4"
+        command = [
+            get_ffmpeg_binary(), "-nostdin", "-v", "error", "-y",
+            "-i", self.video_path,
+            "-map", "0:v:0", "-map", "0:a:0?",
+            # Yükseklik çift sayıya yuvarlanır (yuv420p şartı); genişlik en-boy oranından
+            "-vf", f"scale=-2:'min({PROXY_HEIGHT},trunc(ih/2)*2)',fps={PROXY_FPS}",
+            "-c:v", "libx264", "-preset", "veryfast", "-tune", "fastdecode", "-crf", str(PROXY_CRF),
+            "-pix_fmt", "yuv420p", "-g", str(PROXY_FPS * 2),
+            "-c:a", "aac", "-b:a", "128k",
+            "-movflags", "+faststart",
+            temp_path
+        ]
+        try:
+            process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            print(f"❌ Vekil video hatası: {e}")
+            return None
+        if process.returncode != 0 or not os.path.exists(temp_path):
+            message = process.stderr.decode(errors="ignore").strip().splitlines()
+            print(f"❌ Vekil video hatası: {message[-1] if message else 'bilinmeyen hata'}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+        os.replace(temp_path, proxy_path)
+        return proxy_path
@@ -0,0 +1,229 @@
+"""
+Bir klasördeki (veya listedeki) videoları veritabanı ve oturum açmadan toplu olarak analiz eder.
+Dosyalar süreç havuzuna dağıtılır; her işçi süreç kendi CombinedAnalyzer'ını bir kez yükleyip
+sırayla dosya işler. Sonuçlar bittikçe JSONL olarak (dosya başına bir satır) yazılır.
+
+Kullanım (backend klasöründen):
+    python batch_analyze.py kayitlar/ --output sonuclar.jsonl --workers 4
+    python batch_analyze.py liste.txt --output sonuclar.jsonl --retry-errors
+    python batch_analyze.py kayitlar/ --recursive --summary-only
+
+Girdi bir klasör ya da her satırında bir video yolu olan liste dosyası (manifest) olabilir.
+Çıktı dosyası zaten varsa içindeki dosyalar atlanır; yarıda kesilen iş aynı komutla kaldığı yerden sürer.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# App klasörünü bulmak için
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+VIDEO_EXTENSIONS = (".webm", ".mp4", ".mov", ".mkv", ".avi", ".m4v")
+
+# İşçi süreç başına bir kez yüklenen analizör
+_analyzer = None
+
+
+def collect_inputs(source, recursive=False):
+    """Klasördeki videoları veya liste dosyasındaki yolları (boş satır ve # yorumları hariç) döner."""
+    if os.path.isdir(source):
+        paths = []
+        for root, dirs, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(VIDEO_EXTENSIONS))
+            if not recursive:
+                break
+        return sorted(os.path.abspath(p) for p in paths)
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                # Göreli yollar liste dosyasının bulunduğu klasöre göre çözülür
+                paths.append(os.path.abspath(os.path.join(base, line)))
+    return paths
+
+
+def load_done(output_path, retry_errors=False):
+    """Çıktıda zaten yer alan dosyalar (retry_errors ile yalnızca başarılı olanlar)."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Kesinti anında yarım yazılmış son satır
+                continue
+            if retry_errors and record.get("status") != "ok":
+                continue
+            done.add(record.get("path"))
+    return done
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _init_worker(quiet, stage_cache):
+    """İşçi süreç başlangıcı: analizör bir kez yüklenip ısıtılır."""
+    global _analyzer
+    if quiet:
+        # Analiz modüllerinin ilerleme çıktıları ana süreçteki ilerleme satırlarına karışmasın
+        sys.stdout = open(os.devnull, "w")
+    if not stage_cache:
+        os.environ["ARTIFACT_CACHE_MAX_MB"] = "0"
+
+    from app.analysis_models.combined_analyzer import CombinedAnalyzer
+    # Paralellik dosyalar arasında; segment bazlı iç süreç havuzu kapatılır
+    _analyzer = CombinedAnalyzer(workers=1)
+    _analyzer.warm_up()
+
+
+def analyze_file(path, summary_only=False):
+    """İşçi süreçte tek dosyayı analiz eder; hata dahil her durumda bir kayıt döner."""
+    from app.utils.video_processor import VideoProcessor
+
+    record = {"path": path, "status": "ok", "worker_pid": os.getpid()}
+    start = time.perf_counter()
+    try:
+        record["size"] = os.path.getsize(path)
+        hash_start = time.perf_counter()
+        content_hash = file_sha256(path)
+        record["sha256"] = content_hash
+        hash_sec = time.perf_counter() - hash_start
+
+        results = _analyzer.analyze_session(path, VideoProcessor(path).extract_audio_samples,
+                                            content_hash=content_hash)
+        # Analizör çözülemeyen videoda hata vermeden boş skor üretir; toplu çıktıda hata olarak işaretlenir
+        if not (results.get("features") or {}).get("total_frames"):
+            raise ValueError("Videodan hiç kare okunamadı")
+        timings = dict(results.pop("timings", {}), hash_sec=round(hash_sec, 3))
+        record["timings"] = timings
+        if summary_only:
+            speech = results.get("speech_data", {})
+            results = {
+                "eye_score": results.get("eye_score"),
+                "body_score": results.get("body_score"),
+                "overall_score": results.get("overall_score"),
+                "monotony_score": speech.get("audio_features", {}).get("monotony_score", 0),
+                "wpm": speech.get("speaking_rate", {}).get("words_per_minute", 0),
+                "filler_count": speech.get("filler_words", {}).get("count", 0),
+                "features": results.get("features"),
+                "stages": results.get("stages")
+            }
+        record["results"] = results
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+        record["traceback"] = traceback.format_exc(limit=5)
+    record["wall_sec"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def make_pool(args):
+    # 'spawn': OpenCV/ffmpeg durumunu kopyalamadan temiz işçi süreçleri
+    return ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(not args.verbose, not args.no_stage_cache))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Videoları veritabanı olmadan toplu analiz eder (JSONL çıktı)")
+    parser.add_argument("source", help="Video klasörü veya her satırında bir yol olan liste dosyası")
+    parser.add_argument("--output", default="batch_results.jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--recursive", action="store_true", help="Alt klasörleri de tara")
+    parser.add_argument("--retry-errors", action="store_true", help="Çıktıda hatalı görünen dosyaları yeniden dene")
+    parser.add_argument("--summary-only", action="store_true", help="Transkript yerine yalnızca skor ve özellikleri yaz")
+    parser.add_argument("--no-stage-cache", action="store_true", help="Aşama önbelleğini (cache/stages) kullanma")
+    parser.add_argument("--verbose", action="store_true", help="İşçi süreçlerin analiz çıktısını göster")
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.source, args.recursive)
+    done = load_done(args.output, args.retry_errors)
+    pending = [p for p in dict.fromkeys(paths) if p not in done]
+    print(f"📂 {len(paths)} dosya bulundu, {len(paths) - len(pending)} zaten çıktıda, "
+          f"{len(pending)} analiz edilecek ({args.workers} işçi)")
+    if not pending:
+        return
+
+    start = time.perf_counter()
+    ok = failed = 0
+    queue = list(reversed(pending))
+    # Bir işçi çöktüğünde o an işlenen dosyaların hangisinin sebep olduğu bilinemez; bunlar şüpheli olarak
+    # tek tek (havuzda başka iş yokken) yeniden denenir. Tek başına çalışırken de çöken dosya hatalı sayılır.
+    suspects = []
+    isolated = False
+    pool = make_pool(args)
+    in_flight = {}
+    with open(args.output, "a", encoding="utf-8") as out:
+        def emit(record):
+            nonlocal ok, failed
+            # Her satır hemen diske yazılır; kesinti olursa en fazla bu dosya yeniden işlenir
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if record["status"] == "ok":
+                ok += 1
+                summary = f"skor={record['results'].get('overall_score')} ({record['wall_sec']} sn)"
+            else:
+                failed += 1
+                summary = f"❌ {record['error']}"
+            print(f"[{ok + failed}/{len(pending)}] {os.path.basename(record['path'])}: {summary}")
+
+        try:
+            while queue or suspects or in_flight:
+                if suspects:
+                    if not in_flight:
+                        path = suspects.pop()
+                        in_flight[pool.submit(analyze_file, path, args.summary_only)] = path
+                        isolated = True
+                else:
+                    isolated = False
+                    # Kuyrukta işçi sayısının iki katı kadar dosya tutulur; bellek liste boyundan bağımsız kalır
+                    while queue and len(in_flight) < args.workers * 2:
+                        path = queue.pop()
+                        in_flight[pool.submit(analyze_file, path, args.summary_only)] = path
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in finished:
+                    try:
+                        record = future.result()
+                    except BrokenProcessPool:
+                        # Bir işçi çöktü (Örn: bellek yetmedi); havuzdaki tüm işler geçersiz olur
+                        broken = True
+                        continue
+                    in_flight.pop(future)
+                    emit(record)
+                if broken:
+                    crashed = list(in_flight.values())
+                    in_flight.clear()
+                    pool.shutdown(wait=False)
+                    pool = make_pool(args)
+                    if isolated:
+                        # Tek başına çalışırken çöktü: sebep bu dosya
+                        emit({"path": crashed[0], "status": "error", "error": "Worker process crashed"})
+                    else:
+                        suspects.extend(crashed)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {ok} başarılı, {failed} hatalı; {elapsed:.1f} sn "
+          f"({(ok + failed) / elapsed * 60:.1f} dosya/dk) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,535 @@
+"""
+PitchMate analiz hattı için performans ölçüm betikleri.
+
+Kullanım (backend klasöründen):
+    python benchmark.py frames --video uploads/ornek.webm
+    python benchmark.py frames --synthetic-seconds 120 --height 1080
+    python benchmark.py sampling --video uploads/ornek.webm --policies all every:3 fps:5 adaptive
+    python benchmark.py tracking --video uploads/ornek.webm
+    python benchmark.py pose --video uploads/ornek.webm --batch-sizes 1 8 32
+    python benchmark.py pipeline --video uploads/ornek.webm
+    python benchmark.py segments --synthetic-seconds 600 --height 720 --workers 1 2 4 8 16
+    python benchmark.py audio --minutes 1 10 30
+    python benchmark.py prosody --minutes 1 10 30 --legacy-max-minutes 10
+    python benchmark.py live --video uploads/ornek.webm --url ws://localhost:8000/live/ws --token <JWT>
+    python benchmark.py proxy --video uploads/ornek.webm
+    python benchmark.py proxy --synthetic-seconds 60 --height 2160
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# App klasörünü bulmak için
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.analysis_models.eye_tracker import EyeTracker
+from app.analysis_models.pose_detector import PoseDetector
+from app.analysis_models.frame_context import FrameContext
+from app.analysis_models.frame_sampler import FrameSampler, iter_sampled_frames
+from app.analysis_models.combined_analyzer import CombinedAnalyzer, _borrow_process_pool
+from app.analysis_models.speech_analyzer import SpeechAnalyzer
+from app.analysis_models.prosody_engine import ProsodyEngine
+from app.utils.video_processor import VideoProcessor, probe_video, proxy_spec
+from app.utils.audio_buffer import AudioBuffer
+
+
+def make_synthetic_video(seconds, height, fps=30):
+    """Hareketli bir kutu içeren sentetik test videosu üretir (uzun klip ölçümleri için)."""
+    width = int(height * 16 / 9)
+    path = os.path.join(tempfile.gettempdir(), f"pitchmate_bench_{height}p_{seconds}s.mp4")
+    if os.path.exists(path):
+        return path
+
+    print(f"🎬 Sentetik video üretiliyor: {width}x{height}, {seconds} sn...")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+    for i in range(seconds * fps):
+        frame = background.copy()
+        x = int((width - height // 3) * (0.5 + 0.4 * np.sin(i / 45)))
+        cv2.rectangle(frame, (x, height // 4), (x + height // 3, height // 4 + height // 3), (200, 180, 160), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def resolve_video(args):
+    if args.video:
+        return args.video
+    return make_synthetic_video(args.synthetic_seconds, args.height)
+
+
+def read_frames(video_path):
+    cap = cv2.VideoCapture(video_path)
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret: break
+        yield frame
+    cap.release()
+
+
+# -------------------------------------------------
+# frames: Ortak FrameContext öncesi / sonrası
+# -------------------------------------------------
+def bench_frames(args):
+    video_path = resolve_video(args)
+
+    def run(shared):
+        eye, pose = EyeTracker(), PoseDetector()
+        count = 0
+        start = time.perf_counter()
+        for i, frame in enumerate(read_frames(video_path)):
+            if shared:
+                ctx = FrameContext(frame, i)
+                eye.analyze_frame(ctx)
+                pose.analyze_frame(ctx)
+            else:
+                # Eski yol: her analizör kendi cvtColor çağrısını yapar
+                eye.analyze_frame(frame)
+                pose.analyze_frame(frame)
+            count += 1
+        elapsed = time.perf_counter() - start
+        return count, elapsed
+
+    for label, shared in (("Önce (kare başına ayrı dönüşüm)", False), ("Sonra (ortak FrameContext)", True)):
+        count, elapsed = run(shared)
+        print(f"📊 {label}: {count} kare, {elapsed:.2f} sn, {count / elapsed:.1f} kare/sn")
+
+
+# -------------------------------------------------
+# sampling: Örnekleme politikalarının skor sapması
+# -------------------------------------------------
+def run_vision(video_path, sampler):
+    """Göz ve beden analizini verilen örnekleyiciyle çalıştırıp skorları döndürür."""
+    eye, pose = EyeTracker(), PoseDetector()
+    sampler.reset()
+    cap = cv2.VideoCapture(video_path)
+    start = time.perf_counter()
+    for ctx in iter_sampled_frames(cap, sampler):
+        frame_metrics = {}
+        for analyzer in (eye, pose):
+            frame_metrics.update(analyzer.analyze_frame(ctx)[1])
+        sampler.observe(ctx.index, frame_metrics)
+    cap.release()
+    elapsed = time.perf_counter() - start
+    return (eye.get_summary()["overall_eye_contact_score"],
+            pose.get_summary()["overall_body_language_score"],
+            elapsed)
+
+
+def bench_sampling(args):
+    video_path = resolve_video(args)
+
+    baseline = FrameSampler("all")
+    base_eye, base_body, base_time = run_vision(video_path, baseline)
+    print(f"📏 Tam hız referansı: {baseline.frames_analyzed} kare, göz={base_eye}, beden={base_body}, {base_time:.2f} sn")
+    print(f"{'Politika':<16}{'Kare':>8}{'Süre(sn)':>10}{'Hız':>8}{'Göz':>8}{'ΔGöz':>8}{'Beden':>8}{'ΔBeden':>8}")
+
+    for spec in args.policies:
+        sampler = FrameSampler.from_spec(spec)
+        eye, body, elapsed = run_vision(video_path, sampler)
+        speedup = base_time / elapsed if elapsed > 0 else 0
+        print(f"{sampler.spec:<16}{sampler.frames_analyzed:>8}{elapsed:>10.2f}{speedup:>7.1f}x"
+              f"{eye:>8.1f}{eye - base_eye:>+8.1f}{body:>8.1f}{body - base_body:>+8.1f}")
+
+
+# -------------------------------------------------
+# tracking: Kare başına dedektör vs yüz takibi
+# -------------------------------------------------
+def bench_tracking(args):
+    video_path = resolve_video(args)
+    configs = [("Kare başına tam tespit", {})]
+    for scale in args.scales:
+        for interval in args.intervals:
+            configs.append((f"Takip ölçek={scale} N={interval}",
+                            {"tracking": True, "detect_scale": scale, "redetect_interval": interval}))
+
+    base_score = None
+    for label, kwargs in configs:
+        eye = EyeTracker(**kwargs)
+        count = 0
+        start = time.perf_counter()
+        for i, frame in enumerate(read_frames(video_path)):
+            eye.analyze_frame(FrameContext(frame, i))
+            count += 1
+        elapsed = time.perf_counter() - start
+
+        score = eye.get_summary()["overall_eye_contact_score"]
+        detected = eye.metrics["face_detected_frames"] / max(1, count) * 100
+        if base_score is None:
+            base_score = score
+        print(f"📊 {label:<28} {count / elapsed:7.1f} kare/sn | skor={score:5.1f} (Δ{score - base_score:+.1f}) "
+              f"| yüz bulunan kare=%{detected:.1f}")
+
+
+# -------------------------------------------------
+# pose: Kare kare vs bloklu (vektörel) hareket analizi
+# -------------------------------------------------
+def bench_pose(args):
+    video_path = resolve_video(args)
+    frames = list(read_frames(video_path))
+    print(f"🎞️ {len(frames)} kare belleğe alındı (çözme süresi ölçüme dahil değil)")
+
+    for scale in args.scales:
+        for batch_size in args.batch_sizes:
+            pose = PoseDetector(scale=scale)
+            ctxs = [FrameContext(f, i) for i, f in enumerate(frames)]
+            start = time.perf_counter()
+            for i in range(0, len(ctxs), batch_size):
+                pose.analyze_batch(ctxs[i:i + batch_size])
+            elapsed = time.perf_counter() - start
+            summary = pose.get_summary()
+            print(f"📊 ölçek={scale} K={batch_size:<3} {len(frames) / elapsed:8.1f} kare/sn | "
+                  f"skor={summary['overall_body_language_score']} ort. hareket={summary['avg_movement_ratio']}")
+
+
+# -------------------------------------------------
+# pipeline: Seri döngü vs iş parçacıklı aşama boru hattı
+# -------------------------------------------------
+def bench_pipeline(args):
+    video_path = resolve_video(args)
+    for label, pipelined in (("Seri döngü", False), ("Boru hattı", True)):
+        analyzer = CombinedAnalyzer()
+        analyzer.pipelined = pipelined
+        start = time.perf_counter()
+        session = analyzer.analyze_vision(video_path)
+        elapsed = time.perf_counter() - start
+        frames = session.sampler.frames_analyzed
+        print(f"📊 {label:<12} {elapsed:7.2f} sn, {frames / elapsed:6.1f} kare/sn | "
+              f"göz={analyzer.eye_tracker.get_summary(session.eye)['overall_eye_contact_score']} "
+              f"beden={analyzer.pose_detector.get_summary(session.pose)['overall_body_language_score']}")
+
+        if session.stage_report:
+            for name, stage in session.stage_report["stages"].items():
+                print(f"   └── {name:<8} doluluk=%{stage['utilization'] * 100:5.1f} iş={stage['busy_sec']:.2f}sn "
+                      f"girdi bekleme={stage['wait_in_sec']:.2f}sn çıktı bekleme={stage['wait_out_sec']:.2f}sn")
+            print(f"   🔎 Darboğaz: {session.stage_report['bottleneck']}")
+
+
+# -------------------------------------------------
+# segments: Segment bazlı paralel analizde işçi sayısı ölçeklemesi
+# -------------------------------------------------
+def bench_segments(args):
+    video_path = resolve_video(args)
+    base_time = None
+    for workers in args.workers:
+        analyzer = CombinedAnalyzer(workers=workers)
+        if workers > 1:
+            # Süreç havuzunun açılış maliyeti ölçüme karışmasın
+            with _borrow_process_pool(workers) as pool:
+                list(pool.map(abs, range(workers)))
+        start = time.perf_counter()
+        session = analyzer.analyze_vision(video_path)
+        elapsed = time.perf_counter() - start
+        base_time = base_time or elapsed
+
+        eye = analyzer.eye_tracker.get_summary(session.eye)["overall_eye_contact_score"]
+        body = analyzer.pose_detector.get_summary(session.pose)["overall_body_language_score"]
+        print(f"📊 {workers:>2} işçi: {elapsed:7.2f} sn (hızlanma {base_time / elapsed:4.1f}x) | göz={eye} beden={body}")
+
+
+# -------------------------------------------------
+# audio: Ses bir kez çözülüp paylaşıldığında disk okuması ve süre
+# -------------------------------------------------
+def make_synthetic_wav(minutes, sample_rate=44100):
+    """moviepy çıktısına benzer (44.1 kHz, stereo, 16-bit) konuşma benzeri sentetik WAV üretir."""
+    import soundfile as sf
+
+    path = os.path.join(tempfile.gettempdir(), f"pitchmate_bench_{minutes}min.wav")
+    if os.path.exists(path):
+        return path
+
+    print(f"🎙️ Sentetik ses üretiliyor: {minutes} dk...")
+    block = sample_rate * 10
+    with sf.SoundFile(path, "w", sample_rate, channels=2, subtype="PCM_16") as out:
+        for start in range(0, minutes * 60 * sample_rate, block):
+            t = np.arange(start, start + block) / sample_rate
+            # 100-250 Hz arası gezinen perde, hece ritminde genlik
+            pitch = 170 + 70 * np.sin(2 * np.pi * 0.2 * t)
+            phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+            envelope = 0.3 * (0.55 + 0.45 * np.sin(2 * np.pi * 3 * t))
+            mono = (envelope * np.sin(phase)).astype(np.float32)
+            out.write(np.stack([mono, mono], axis=1))
+    return path
+
+
+def read_bytes():
+    """Bu sürecin şimdiye kadar okuduğu bayt (Linux /proc/self/io, yoksa None)."""
+    try:
+        with open("/proc/self/io") as f:
+            return int(next(line for line in f if line.startswith("rchar")).split()[1])
+    except (OSError, StopIteration):
+        return None
+
+
+def bench_audio(args):
+    import librosa
+    import speech_recognition as sr
+
+    def legacy(path):
+        # Eski akış: transkripsiyon, süre ve sinyal analizi için dosya üç kez okunurdu
+        with sr.AudioFile(path) as source:
+            recognizer = sr.Recognizer()
+            recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            recognizer.record(source)
+        librosa.get_duration(path=path)
+        librosa.load(path, sr=None)
+
+    def shared(path):
+        audio = AudioBuffer.from_file(path)
+        audio.to_audio_data(min(audio.sample_rate, SpeechAnalyzer.TRANSCRIBE_RATE))
+        audio.duration
+
+    # İlk çağrıdaki import/önbellek maliyeti ölçüme karışmasın
+    warm_path = make_synthetic_wav(1)
+    legacy(warm_path)
+    shared(warm_path)
+
+    for minutes in args.minutes:
+        path = make_synthetic_wav(minutes)
+        size_mb = os.path.getsize(path) / 1e6
+        # Transkripsiyon ağ çağrısı ölçüme katılmaz; sadece çözme/okuma aşamaları karşılaştırılır
+        for label, fn in (("3 ayrı okuma", legacy), ("Tek tampon", shared)):
+            before = read_bytes()
+            start = time.perf_counter()
+            fn(path)
+            elapsed = time.perf_counter() - start
+            after = read_bytes()
+            read_mb = f"{(after - before) / 1e6:8.1f} MB" if before is not None else "     n/a"
+            print(f"📊 {minutes:>3} dk ({size_mb:6.0f} MB) {label:<13} okunan={read_mb} süre={elapsed:6.2f} sn")
+
+
+# -------------------------------------------------
+# prosody: Bloklu enerji/perde motoru, tepe bellek ve eski hesapla fark
+# -------------------------------------------------
+def bench_prosody(args):
+    import tracemalloc
+    import librosa
+    import soundfile as sf
+
+    def monotony(energy_std, pitch_std):
+        return 100 - np.clip(energy_std / 0.08 * 50, 0, 50) - np.clip(pitch_std / 40 * 50, 0, 50)
+
+    # librosa'nın ilk çağrı (JIT/önbellek) maliyeti ölçüme karışmasın
+    warm = ProsodyEngine()
+    warm.push(np.zeros(44100, dtype=np.float32), 44100)
+    warm.finish()
+
+    for minutes in args.minutes:
+        path = make_synthetic_wav(minutes)
+        info = sf.info(path)
+
+        # Dosya blok blok okunur; motorun belleği kayıt uzunluğundan bağımsız kalmalı
+        tracemalloc.start()
+        start = time.perf_counter()
+        engine = ProsodyEngine()
+        engine.push_blocks((block.mean(axis=1) for block in sf.blocks(path, blocksize=info.samplerate * 10,
+                                                                     dtype="float32")), info.samplerate)
+        stats = engine.finish()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        print(f"📊 {minutes:>3} dk Bloklu motor  tepe={peak:8.1f} MB süre={elapsed:6.2f} sn "
+              f"monotonluk={monotony(stats['energy_std'], stats['pitch_std']):5.1f}")
+
+        if minutes > args.legacy_max_minutes:
+            continue
+        tracemalloc.start()
+        start = time.perf_counter()
+        y, sr_lib = librosa.load(path, sr=None)
+        rms = librosa.feature.rms(y=y)[0]
+        f0 = librosa.yin(y, fmin=80, fmax=300, sr=sr_lib)
+        f0 = f0[np.isfinite(f0)]
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        print(f"📊 {minutes:>3} dk Tüm sinyal    tepe={peak:8.1f} MB süre={elapsed:6.2f} sn "
+              f"monotonluk={monotony(float(np.std(rms)), float(np.std(f0))):5.1f}")
+
+
+# -------------------------------------------------
+# live: Canlı prova WebSocket'i için senaryolu istemci ve gecikme ölçümü
+# -------------------------------------------------
+def bench_live(args):
+    import asyncio
+    import json
+    import struct
+    import websockets
+
+    video_path = resolve_video(args)
+    audio = VideoProcessor(video_path).extract_audio_samples()
+
+    async def run():
+        url = f"{args.url}?token={args.token}"
+        async with websockets.connect(url, max_size=None) as ws:
+            await ws.send(json.dumps({"type": "start", "sample_rate": audio.sample_rate if audio else 16000}))
+            print(f"🔌 Bağlandı: {json.loads(await ws.recv())}")
+
+            sent_at = {}
+            latencies = []
+            ticks = []
+            final = {}
+
+            async def reader():
+                async for message in ws:
+                    data = json.loads(message)
+                    if data["type"] == "tick":
+                        ticks.append(data)
+                        if data.get("last_frame_ts") in sent_at:
+                            # Kare gönderiminden, o kareyi içeren göstergenin gelmesine kadar geçen süre
+                            latencies.append((time.perf_counter() - sent_at[data["last_frame_ts"]]) * 1000)
+                    elif data["type"] == "final":
+                        final.update(data["presentation"])
+
+            reader_task = asyncio.create_task(reader())
+            cap = cv2.VideoCapture(video_path)
+            start = time.perf_counter()
+            audio_pos = 0
+            for ctx in iter_sampled_frames(cap, FrameSampler.from_spec(f"fps:{args.fps}")):
+                # Gerçek zamanlı akış: kare kendi zamanı gelene kadar beklenir
+                delay = ctx.timestamp_ms / 1000.0 / args.speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                if audio is not None:
+                    audio_end = min(len(audio.samples), int(ctx.timestamp_ms / 1000.0 * audio.sample_rate))
+                    if audio_end > audio_pos:
+                        await ws.send(bytes([2]) + audio.samples[audio_pos:audio_end].astype("<f4").tobytes())
+                        audio_pos = audio_end
+
+                frame = ctx.frame
+                if frame.shape[1] > args.width:
+                    frame = cv2.resize(frame, (args.width, int(frame.shape[0] * args.width / frame.shape[1])))
+                _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+                sent_at[ctx.timestamp_ms] = time.perf_counter()
+                await ws.send(bytes([1]) + struct.pack("<d", ctx.timestamp_ms) + jpeg.tobytes())
+            cap.release()
+
+            await ws.send(json.dumps({"type": "stop"}))
+            await reader_task
+            return latencies, ticks, final
+
+    latencies, ticks, final = asyncio.run(run())
+    if latencies:
+        print(f"📊 Gösterge gecikmesi: p50={np.percentile(latencies, 50):.1f} ms "
+              f"p90={np.percentile(latencies, 90):.1f} ms max={max(latencies):.1f} ms ({len(ticks)} gösterge)")
+    if ticks:
+        print(f"   └── atlanan kare={ticks[-1]['dropped_frames']} sunucu işi/sn p50="
+              f"{np.percentile([t['busy_ms'] for t in ticks], 50):.1f} ms")
+    print(f"💾 Sunum kaydı: id={final.get('id')} skor={final.get('overall_score')}")
+
+
+# -------------------------------------------------
+# proxy: Orijinal vs düşük çözünürlüklü vekil kopya (boyut, çözme hızı, analiz süresi ve skor farkı)
+# -------------------------------------------------
+def bench_proxy(args):
+    video_path = resolve_video(args)
+    proxy_path = os.path.join(tempfile.gettempdir(), "pitchmate_bench_proxy.mp4")
+
+    start = time.perf_counter()
+    if not VideoProcessor(video_path).create_proxy(proxy_path):
+        return
+    encode_sec = time.perf_counter() - start
+    source_media = probe_video(video_path)
+    print(f"🎞️ Vekil: {proxy_spec()} | kodlama {encode_sec:.2f} sn")
+
+    rows = []
+    for label, path in (("Orijinal", video_path), ("Vekil", proxy_path)):
+        media = probe_video(path)
+        start = time.perf_counter()
+        frames = sum(1 for _ in read_frames(path))
+        decode_sec = time.perf_counter() - start
+        eye, body, vision_sec = run_vision(path, FrameSampler("all"))
+        rows.append((label, media, os.path.getsize(path), frames, decode_sec, vision_sec, eye, body))
+
+    print(f"{'':<10}{'Çözünürlük':>12}{'Boyut(MB)':>11}{'Kare':>7}{'Çözme kare/sn':>15}{'Analiz(sn)':>12}"
+          f"{'Göz':>7}{'Beden':>7}")
+    for label, media, size, frames, decode_sec, vision_sec, eye, body in rows:
+        print(f"{label:<10}{media['width']:>6}x{media['height']:<5}{size / 1024 ** 2:>11.2f}{frames:>7}"
+              f"{frames / decode_sec:>15.1f}{vision_sec:>12.2f}{eye:>7.1f}{body:>7.1f}")
+
+    original, proxy = rows
+    print(f"📊 Boyut x{original[2] / proxy[2]:.1f} küçük | çözme x{(proxy[3] / proxy[4]) / (original[3] / original[4]):.1f} "
+          f"hızlı | analiz x{original[5] / proxy[5]:.1f} hızlı | Δgöz={proxy[6] - original[6]:+.1f} "
+          f"Δbeden={proxy[7] - original[7]:+.1f}")
+    if source_media.get("fps") is None:
+        print("   └── Orijinalin kare hızı güvenilir değil (VFR / tarayıcı webm); vekil sabit kare hızlıdır")
+    os.remove(proxy_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PitchMate analiz performans ölçümleri")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def video_args(p):
+        p.add_argument("--video", help="Ölçülecek video (verilmezse sentetik klip üretilir)")
+        p.add_argument("--synthetic-seconds", type=int, default=120)
+        p.add_argument("--height", type=int, default=1080)
+
+    p = sub.add_parser("frames", help="Kare başına ortak bağlam (FrameContext) kazancı")
+    video_args(p)
+    p.set_defaults(func=bench_frames)
+
+    p = sub.add_parser("sampling", help="Örnekleme politikalarının tam hıza göre skor sapması")
+    video_args(p)
+    p.add_argument("--policies", nargs="+",
+                   default=["every:2", "every:5", "fps:10", "fps:5", "fps:2", "adaptive", "adaptive:2-15"])
+    p.set_defaults(func=bench_sampling)
+
+    p = sub.add_parser("tracking", help="EyeTracker takip modu throughput ve skor karşılaştırması")
+    video_args(p)
+    p.add_argument("--scales", nargs="+", type=float, default=[0.5, 0.35])
+    p.add_argument("--intervals", nargs="+", type=int, default=[15, 30])
+    p.set_defaults(func=bench_tracking)
+
+    p = sub.add_parser("pose", help="PoseDetector bloklu vektörel motor throughput ve skor karşılaştırması")
+    video_args(p)
+    p.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32])
+    p.add_argument("--scales", nargs="+", type=float, default=[1.0, 0.5])
+    p.set_defaults(func=bench_pose)
+
+    p = sub.add_parser("audio", help="Tek çözülmüş ses tamponu ile disk okuması ve süre")
+    p.add_argument("--minutes", nargs="+", type=int, default=[1, 10, 30])
+    p.set_defaults(func=bench_audio)
+
+    p = sub.add_parser("prosody", help="Bloklu prosodi motoru tepe bellek ve skor farkı")
+    p.add_argument("--minutes", nargs="+", type=int, default=[1, 10, 30])
+    p.add_argument("--legacy-max-minutes", type=int, default=10,
+                   help="Eski tüm-sinyal hesabının çalıştırılacağı en uzun kayıt (bellek yetmeyebilir)")
+    p.set_defaults(func=bench_prosody)
+
+    p = sub.add_parser("live", help="Canlı prova WebSocket gecikmesi (senaryolu yerel istemci)")
+    video_args(p)
+    p.add_argument("--url", default="ws://localhost:8000/live/ws")
+    p.add_argument("--token", required=True, help="/auth/login ile alınan JWT")
+    p.add_argument("--fps", type=float, default=10)
+    p.add_argument("--width", type=int, default=640)
+    p.add_argument("--speed", type=float, default=1.0,
+                   help="Gerçek zamana göre akış hızı çarpanı (sunucu kare zamanlarını kendi saatiyle sınırlar; "
+                        "1'den büyük değerler yalnızca yük testi içindir)")
+    p.set_defaults(func=bench_live)
+
+    p = sub.add_parser("proxy", help="Orijinal vs vekil kopya: boyut, çözme hızı, analiz süresi ve skor farkı")
+    video_args(p)
+    p.set_defaults(func=bench_proxy)
+
+    p = sub.add_parser("pipeline", help="İş parçacıklı boru hattı ve aşama doluluk oranları")
+    video_args(p)
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser("segments", help="Segment bazlı paralel analizde duvar saati süresi")
+    video_args(p)
+    p.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, 8])
+    p.set_defaults(func=bench_segments)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Kayıtlı sunumların skorlarını, analysis_json içindeki ham özelliklerden (medyaya dokunmadan)
+güncel puanlama yapılandırmasıyla toplu olarak yeniden hesaplar.
+
+Kullanım (backend klasöründen):
+    python rescore.py --dry-run
+    python rescore.py --config scoring_v2.json --project-id 12
+    python rescore.py --user-id 3 --since 2026-01-01 --batch-size 5000
+
+--config verilmezse .env: SCORING_CONFIG kullanılır. Ham özelliği olmayan (eski) kayıtlar atlanır.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+# App klasörünü bulmak için
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import database, models
+from app.analysis_models.scoring import FEATURE_KEYS, ScoringEngine, load_scoring_config
+
+# Presentation sütunu -> ScoringEngine.rescore çıktısı
+SCORE_COLUMNS = {
+    "eye_contact_score": "eye_score",
+    "body_language_score": "body_score",
+    "monotony_score": "monotony_score",
+    "overall_score": "overall_score",
+}
+
+
+def iter_batches(db, args):
+    """Kayıtları kimlik sırasıyla sayfalar halinde okur (tüm tablo belleğe alınmaz)."""
+    query = db.query(models.Presentation.id, models.Presentation.analysis_json,
+                     *[getattr(models.Presentation, column) for column in SCORE_COLUMNS])
+    if args.user_id is not None:
+        query = query.filter(models.Presentation.user_id == args.user_id)
+    if args.project_id is not None:
+        query = query.filter(models.Presentation.project_id == args.project_id)
+    if args.since:
+        query = query.filter(models.Presentation.created_at >= datetime.fromisoformat(args.since))
+
+    last_id = 0
+    while True:
+        rows = query.filter(models.Presentation.id > last_id)\
+            .order_by(models.Presentation.id)\
+            .limit(args.batch_size).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def parse_features(rows):
+    """analysis_json'lardan özellik dizileri; ham özelliği olmayan kayıtlar ayıklanır."""
+    kept, details = [], []
+    for row in rows:
+        try:
+            data = json.loads(row.analysis_json or "{}")
+        except ValueError:
+            continue
+        if data.get("features"):
+            kept.append(row)
+            details.append(data)
+
+    features = {}
+    for key in FEATURE_KEYS:
+        # Ölçülemeyen (None) değerler NaN olur; ses skoru o kayıtta 0 sayılır
+        features[key] = np.array([np.nan if d["features"].get(key) is None else d["features"][key]
+                                  for d in details], dtype=np.float64)
+    return kept, details, features
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sunum skorlarını kayıtlı özelliklerden yeniden hesaplar")
+    parser.add_argument("--config", default=os.getenv("SCORING_CONFIG"), help="Puanlama yapılandırması (JSON)")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--project-id", type=int)
+    parser.add_argument("--since", help="Bu tarihten (YYYY-MM-DD) sonra oluşturulan kayıtlar")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--dry-run", action="store_true", help="Değişiklikleri yazmadan sadece raporla")
+    args = parser.parse_args()
+
+    engine = ScoringEngine(load_scoring_config(args.config))
+    print(f"🧮 Puanlama yapılandırması: {engine.fingerprint}{' (deneme)' if args.dry_run else ''}")
+
+    start = time.perf_counter()
+    seen = rescored = changed = 0
+    deltas = []
+    db = database.SessionLocal()
+    try:
+        for rows in iter_batches(db, args):
+            seen += len(rows)
+            kept, details, features = parse_features(rows)
+            if not kept:
+                continue
+            # Tüm sayfa tek vektörel çağrıyla puanlanır
+            scores = engine.rescore(features)
+
+            old_overall = np.array([row.overall_score or 0.0 for row in kept])
+            differs = np.zeros(len(kept), dtype=bool)
+            for column, key in SCORE_COLUMNS.items():
+                old = np.array([getattr(row, column) or 0.0 for row in kept])
+                differs |= ~np.isclose(old, scores[key], atol=0.05)
+            deltas.append(scores["overall_score"] - old_overall)
+            rescored += len(kept)
+            changed += int(differs.sum())
+
+            if not args.dry_run:
+                updates = []
+                for i, (row, data) in enumerate(zip(kept, details)):
+                    # Skoru ve yapılandırması zaten güncel olan kayıtlar yeniden yazılmaz
+                    if not differs[i] and data.get("scoring") == engine.fingerprint:
+                        continue
+                    data["scoring"] = engine.fingerprint
+                    update = {"id": row.id, "analysis_json": json.dumps(data, ensure_ascii=False, separators=(",", ":"))}
+                    update.update({column: float(scores[key][i]) for column, key in SCORE_COLUMNS.items()})
+                    updates.append(update)
+                if updates:
+                    db.bulk_update_mappings(models.Presentation, updates)
+                    db.commit()
+    finally:
+        db.close()
+
+    delta = np.concatenate(deltas) if deltas else np.empty(0)
+    print(f"📊 {seen} kayıt okundu, {rescored} yeniden puanlandı, {seen - rescored} atlandı (ham özellik yok)")
+    if len(delta):
+        print(f"   └── {changed} kayıtta skor değişti; genel skor farkı ort={delta.mean():+.2f} "
+              f"min={delta.min():+.1f} max={delta.max():+.1f}")
+    print(f"⏱️ {time.perf_counter() - start:.2f} sn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Parçalı transkripsiyonu ağ ve veritabanı olmadan, çevrimdışı yedek servisle test eder.
+
+Kullanım (backend klasöründen):
+    python test_transcription.py
+"""
+import sys
+import os
+import io
+
+import numpy as np
+import speech_recognition as sr
+
+# App klasörünü bulmak için
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.analysis_models.transcription import (ChunkedTranscriber, OfflineTranscriber, TranscriptionBackend,
+                                               TranscriptionError, calibrate_energy_threshold, split_on_silence)
+from app.utils.audio_buffer import AudioBuffer
+
+SAMPLE_RATE = 16000
+
+
+def make_audio(seconds, silences=()):
+    """Sabit genlikli ses; verilen (başlangıç, bitiş) saniye aralıkları sessiz bırakılır."""
+    samples = np.full(int(seconds * SAMPLE_RATE), 0.5, dtype=np.float32)
+    for start, end in silences:
+        samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0.0
+    return AudioBuffer(samples, SAMPLE_RATE)
+
+
+class FlakyTranscriber(OfflineTranscriber):
+    """Belirli saniyeden başlayan parçada hata veren çevrimdışı servis."""
+
+    name = "flaky"
+
+    def __init__(self, fail_offset, error):
+        super().__init__()
+        self.fail_offset = fail_offset
+        self.error = error
+
+    def transcribe(self, audio, language, offset=0.0):
+        if abs(offset - self.fail_offset) < 0.5:
+            raise self.error
+        return super().transcribe(audio, language, offset)
+
+
+def test_split_on_silence():
+    print("✂️ Sessizlik noktasından bölme test ediliyor...")
+    audio = make_audio(70, silences=[(24, 25), (52, 53)])
+    chunks = split_on_silence(audio, max_chunk_seconds=30)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(audio.samples)
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:])), "Parçalar arasında boşluk olmamalı"
+    for start, end in chunks[:-1]:
+        cut = end / SAMPLE_RATE
+        assert 24 <= cut <= 25 or 52 <= cut <= 53, f"Kesim sessizlikte değil: {cut} sn"
+    print(f"   ✅ {len(chunks)} parça, kesimler: {[round(e / SAMPLE_RATE, 2) for _, e in chunks[:-1]]}")
+
+
+def test_offline_matches_serial():
+    print("🔁 Paralel ve tek istekli transkript karşılaştırılıyor...")
+    audio = make_audio(95, silences=[(28, 29), (57, 58), (86, 87)])
+    parallel = ChunkedTranscriber(OfflineTranscriber(), max_workers=4, max_chunk_seconds=30).transcribe(audio)
+    serial = ChunkedTranscriber(OfflineTranscriber(), max_workers=1, max_chunk_seconds=30).transcribe(audio)
+    assert parallel["text"] == serial["text"]
+    assert parallel["failed_chunks"] == 0 and len(parallel["segments"]) > 1
+    print(f"   ✅ {len(parallel['segments'])} parça, {len(parallel['text'].split())} kelime")
+
+
+def test_failed_chunk_keeps_rest():
+    print("🧩 Başarısız parça testi...")
+    audio = make_audio(70, silences=[(24, 25), (52, 53)])
+    chunks = split_on_silence(audio, max_chunk_seconds=30)
+    fail_offset = chunks[1][0] / SAMPLE_RATE
+
+    for error in (TranscriptionError("servis yanıt vermedi"), RuntimeError("beklenmeyen hata")):
+        result = ChunkedTranscriber(FlakyTranscriber(fail_offset, error), max_chunk_seconds=30).transcribe(audio)
+        statuses = [s["status"] for s in result["segments"]]
+        assert statuses == ["ok", "failed", "ok"], statuses
+        assert result["failed_chunks"] == 1 and result["text"]
+        print(f"   ✅ {type(error).__name__}: yalnızca bir parça boş kaldı")
+
+
+def test_energy_calibration_matches_file_flow():
+    print("🎚️ Gürültü kalibrasyonu eski dosya akışıyla karşılaştırılıyor...")
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(SAMPLE_RATE * 2) * np.linspace(0.01, 0.3, SAMPLE_RATE * 2)).astype(np.float32)
+    audio = AudioBuffer(samples, SAMPLE_RATE)
+
+    # Önce: sesin WAV dosyası olarak açılıp adjust_for_ambient_noise ile kalibre edildiği eski akış
+    before = sr.Recognizer()
+    with sr.AudioFile(io.BytesIO(audio.to_audio_data().get_wav_data())) as source:
+        before.adjust_for_ambient_noise(source, duration=0.5)
+
+    # Sonra: aynı tamponun bellekte kalibrasyonu
+    after = calibrate_energy_threshold(sr.Recognizer(), audio, duration=0.5)
+    assert abs(before.energy_threshold - after) < 1e-6, (before.energy_threshold, after)
+    assert after != sr.Recognizer().energy_threshold, "Eşik varsayılanda kalmamalı"
+    print(f"   ✅ energy_threshold: {after:.1f} (varsayılan {sr.Recognizer().energy_threshold})")
+
+
+def test_backend_interface():
+    assert issubclass(OfflineTranscriber, TranscriptionBackend)
+
+
+if __name__ == "__main__":
+    test_backend_interface()
+    test_split_on_silence()
+    test_offline_matches_serial()
+    test_failed_chunk_keeps_rest()
+    test_energy_calibration_matches_file_flow()
+    print("\n🎉 Transkripsiyon testleri başarılı.")
@@ -196,6 +196,18 @@ const AnalysisResult = () => {
           </div>
         </div>
 
+        {/* KAYIT OYNATIMI: sunucudaki düşük çözünürlüklü vekil kopya (canlı provalarda video kaydı yoktur) */}
+        {/\.(mp4|webm)$/i.test(result.video_filename || "") && (
+          <div className="bg-[#121217] border border-white/10 rounded-[2rem] p-4 mb-8 shadow-xl">
+            <video
+              src={`http://localhost:8000/${result.video_filename}`}
+              controls
+              preload="metadata"
+              className="w-full rounded-2xl bg-black"
+            />
+          </div>
+        )}
+
         {/* 2. ANALİZ SKORLARI */}
         <div className="grid grid-cols-1 lg:grid-cols-3 gap-6">
           {/* Genel Skor Kartı */}
@@ -16,6 +16,19 @@ import {
   FiList,
 } from "react-icons/fi";
 
+// Arka plandaki analiz işinin aşamaları (backend: /analysis/jobs/{id})
+const STAGE_LABELS = {
+  uploading: "Video yükleniyor...",
+  server_busy: "Sunucu yoğun, birazdan otomatik olarak tekrar denenecek...",
+  queued: "Sırada bekliyor...",
+  transcoding: "Video analiz için hazırlanıyor...",
+  waiting_analyzer: "Sırada bekliyor...",
+  analyzing: "Görüntü ve ses analiz ediliyor",
+  feedback: "AI mentor yorumu hazırlanıyor...",
+  cache_hit: "Önceki analiz sonucu kullanılıyor...",
+  saving: "Sonuçlar kaydediliyor...",
+};
+
 const PracticeRoom = () => {
   const { id } = useParams();
   const navigate = useNavigate();
@@ -23,6 +36,7 @@ const PracticeRoom = () => {
   const [recording, setRecording] = useState(false);
   const [videoBlob, setVideoBlob] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [jobStatus, setJobStatus] = useState(null);
   const [timer, setTimer] = useState(0);
 
   // --- PROJE BİLGİLERİ STATE'LERİ ---
@@ -131,7 +145,7 @@ const PracticeRoom = () => {
     });
 
     try {
-      const result = await uploadVideo(file, id);
+      const result = await uploadVideo(file, id, setJobStatus);
       toast.success("Analiz Başarılı! 🚀");
       navigate("/analysis/result", { state: { analysis_results: result } });
     } catch (error) {
@@ -139,6 +153,7 @@ const PracticeRoom = () => {
       toast.error("Yükleme hatası oluştu.");
     } finally {
       setLoading(false);
+      setJobStatus(null);
     }
   };
 
@@ -296,7 +311,11 @@ const PracticeRoom = () => {
                       Yapay Zeka Çalışıyor...
                     </p>
                     <p className="text-xs text-gray-500">
-                      Video işleniyor, lütfen bekle.
+                      {STAGE_LABELS[jobStatus?.stage] || "Video işleniyor, lütfen bekle."}
+                      {jobStatus?.upload &&
+                        ` %${Math.round((jobStatus.upload.offset / jobStatus.upload.size) * 100)}`}
+                      {jobStatus?.progress?.frames_processed > 0 &&
+                        ` (${jobStatus.progress.frames_processed} kare)`}
                     </p>
                   </div>
                 </div>
@@ -76,19 +76,88 @@ export const deleteProject = async (projectId) => {
 
 // --- 📊 ANALİZ VE VİDEO İŞLEMLERİ ---
 
-export const uploadVideo = async (file, projectId) => {
-  const formData = new FormData();
-  formData.append("file", file);
-  const url = projectId
-    ? `/analysis/upload?project_id=${projectId}`
-    : `/analysis/upload`;
+// Video parça parça yüklenir; bağlantı koparsa sunucudaki offset'ten devam edilir
+const UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024;
+const UPLOAD_MAX_RETRIES = 5;
+const ADMISSION_MAX_RETRIES = 10;
+
+// Sunucu yoğunken 503 + Retry-After döner; belirtilen süre beklenip istek yeniden denenir
+const withAdmissionRetry = async (request, onProgress) => {
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await request();
+    } catch (error) {
+      if (error.response?.status !== 503 || attempt >= ADMISSION_MAX_RETRIES) throw error;
+      const retryAfter = Number(error.response.headers["retry-after"]) || 10;
+      if (onProgress) onProgress({ stage: "server_busy", retry_after: retryAfter });
+      await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+    }
+  }
+};
 
-  const response = await api.post(url, formData, {
-    headers: { "Content-Type": "multipart/form-data" },
-  });
+export const uploadVideo = async (file, projectId, onProgress) => {
+  const { data: upload } = await withAdmissionRetry(
+    () =>
+      api.post("/analysis/uploads", {
+        filename: file.name,
+        size: file.size,
+        project_id: projectId || null,
+      }),
+    onProgress
+  );
+
+  let offset = upload.offset;
+  let retries = 0;
+  while (offset < file.size) {
+    try {
+      const response = await api.patch(
+        `/analysis/uploads/${upload.upload_id}`,
+        file.slice(offset, offset + UPLOAD_CHUNK_BYTES),
+        {
+          headers: {
+            "Content-Type": "application/offset+octet-stream",
+            "Upload-Offset": offset,
+          },
+        }
+      );
+      offset = response.data.offset;
+      retries = 0;
+      if (onProgress) onProgress({ stage: "uploading", upload: { offset, size: file.size } });
+    } catch (error) {
+      if (++retries > UPLOAD_MAX_RETRIES || error.response?.status === 413) throw error;
+      await new Promise((resolve) => setTimeout(resolve, 1000 * retries));
+      // Yarıda kalan parçanın ne kadarı yazıldıysa oradan devam et
+      const { data: status } = await api.get(`/analysis/uploads/${upload.upload_id}`);
+      offset = status.offset;
+    }
+  }
+
+  // Yükleme sunucuda korunur; yoğunlukta yalnızca tamamlama isteği tekrarlanır
+  const response = await withAdmissionRetry(
+    () => api.post(`/analysis/uploads/${upload.upload_id}/complete`),
+    onProgress
+  );
+
+  // Analiz arka planda çalışır; iş bitene kadar durumu sorgula
+  const job = await waitForAnalysisJob(response.data.job_id, onProgress);
+  return job.presentation;
+};
+
+export const getAnalysisJob = async (jobId) => {
+  const response = await api.get(`/analysis/jobs/${jobId}`);
   return response.data;
 };
 
+export const waitForAnalysisJob = async (jobId, onProgress, intervalMs = 1500) => {
+  for (;;) {
+    const job = await getAnalysisJob(jobId);
+    if (onProgress) onProgress(job);
+    if (job.status === "done") return job;
+    if (job.status === "failed") throw new Error(job.error || "Analiz başarısız oldu.");
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
 export const getAnalysisHistory = async () => {
   const response = await api.get("/analysis/history");
   return response.data;